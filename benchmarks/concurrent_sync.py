@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+""" Benchmark the concurrent mode of is_bookiesports_in_sync()
+
+    Starts a local JSON-RPC stand-in (HTTP) that serves the objects of
+    ``tests/fixtures.yaml`` and delays every response by ``--latency``
+    seconds. Then, the unittests bookiesports are checked against it
+    sequentially and with ``--workers`` threads.
+
+    Usage::
+
+        python benchmarks/concurrent_sync.py --latency 0.05 --workers 8
+"""
+import os
+import json
+import time
+import yaml
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from peerplays import PeerPlays
+from peerplays.instance import set_shared_peerplays_instance
+
+from bookied_sync.lookup import Lookup
+from bookied_sync.utils import dList2Dict
+
+BASE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "tests")
+SPORTS_FOLDER = os.path.join(BASE, "bookiesports")
+CHAIN_ID = "195d4e865e3a27d2b204de759341e4738f778dd5c4e21860c7e8bf1bd9c79203"
+
+
+def load_objects():
+    """ Objects of the fixtures indexed by id
+    """
+    with open(os.path.join(BASE, "fixtures.yaml")) as fid:
+        data = yaml.safe_load(fid)
+    objects = dict()
+    for kind in ["sports", "eventgroups", "events", "rules"]:
+        for obj in data.get(kind, []):
+            objects[obj["id"]] = obj
+    objects["2.1.0"] = {
+        "id": "2.1.0",
+        "head_block_number": 1000,
+        "head_block_id": "000003e8" + "00" * 16,
+        "time": "2018-05-29T10:00:00",
+        "next_maintenance_time": "2018-05-29T11:00:00",
+    }
+    return objects
+
+
+class StandIn(ThreadingHTTPServer):
+    """ JSON-RPC stand-in that answers from memory with injected latency
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.objects = load_objects()
+        self.calls = 0
+        super().__init__(("127.0.0.1", 0), Handler)
+
+    def handle_call(self, method, args):
+        self.calls += 1
+        time.sleep(self.latency)
+        if method == "get_chain_properties":
+            return {"id": "2.11.0", "chain_id": CHAIN_ID}
+        if method == "get_dynamic_global_properties":
+            return self.objects["2.1.0"]
+        if method == "get_objects":
+            return [self.objects.get(x) for x in args[0]]
+        if method == "get_object":
+            return self.objects.get(args[0])
+        return None
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        _, method, args = payload["params"]
+        body = json.dumps(
+            {
+                "id": payload["id"],
+                "jsonrpc": "2.0",
+                "result": self.server.handle_call(method, args),
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def assign_ids(objects):
+    """ Store the ids of the fixtures in the lookup so that is_synced()
+        fetches the objects from the stand-in
+    """
+    names = dict()
+    for obj in objects.values():
+        name = dList2Dict(obj.get("name", []))
+        names[name.get("identifier", name.get("en"))] = obj["id"]
+    for sport in Lookup.data["sports"].values():
+        sport["id"] = names.get(sport["identifier"])
+        for evg in sport["eventgroups"].values():
+            evg["id"] = names.get(evg["identifier"])
+        for rule in sport["rules"].values():
+            rule["id"] = names.get(rule["identifier"])
+
+
+def measure(lookup, peerplays, workers):
+    peerplays.clear_cache()
+    start = time.perf_counter()
+    lookup.is_bookiesports_in_sync(workers=workers)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    logging.getLogger("bookied_sync").setLevel(logging.ERROR)
+
+    server = StandIn(args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    node = "http://127.0.0.1:{}".format(server.server_address[1])
+
+    peerplays = PeerPlays(node, nobroadcast=True, num_retries=1)
+    set_shared_peerplays_instance(peerplays)
+    lookup = Lookup(
+        network="unittests",
+        sports_folder=SPORTS_FOLDER,
+        blockchain_instance=peerplays,
+    )
+    assign_ids(server.objects)
+
+    server.calls = 0
+    before = measure(lookup, peerplays, 1)
+    print("sequential: {:.3f}s ({} calls)".format(before, server.calls))
+
+    server.calls = 0
+    after = measure(lookup, peerplays, args.workers)
+    print(
+        "concurrent: {:.3f}s ({} calls, {} workers)".format(
+            after, server.calls, args.workers
+        )
+    )
+    print("speedup: {:.1f}x".format(before / after))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
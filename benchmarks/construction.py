@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+""" Benchmark the construction cost of lookup nodes
+
+    Builds a tree with (by default) 10k betting markets below a single
+    event and reports the average construction time per node, once with
+    the full ``Lookup.__init__`` for every node and once within a
+    :class:`bookied_sync.context.SyncContext`.
+
+    Usage::
+
+        python benchmarks/construction.py --node wss://node.example.com
+"""
+import os
+import time
+import argparse
+from datetime import datetime
+
+from peerplays import PeerPlays
+from peerplays.instance import set_shared_peerplays_instance
+
+from bookied_sync.lookup import Lookup
+from bookied_sync.context import SyncContext
+from bookied_sync.event import LookupEvent
+from bookied_sync.bettingmarketgroup import LookupBettingMarketGroup
+
+SPORTS_FOLDER = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "..", "tests", "bookiesports"
+)
+
+
+def build_tree(num_markets):
+    """ Construct betting market groups and betting markets until
+        ``num_markets`` betting markets have been created. Returns the
+        number of constructed nodes.
+    """
+    event = LookupEvent(
+        teams=["Atlanta Hawks", "Boston Celtics"],
+        eventgroup_identifier="NBA",
+        sport_identifier="Basketball",
+        season={"en": "2017-00-00"},
+        start_time=datetime(2022, 10, 16),
+    )
+    bmgs = list(event.lookup_bettingmarketgroups())
+    nodes = 1
+    markets = 0
+    while markets < num_markets:
+        for data in bmgs:
+            bmg = LookupBettingMarketGroup(data, event=event)
+            nodes += 1
+            for _ in bmg.bettingmarkets:
+                nodes += 1
+                markets += 1
+    return nodes
+
+
+def measure(num_markets):
+    start = time.perf_counter()
+    nodes = build_tree(num_markets)
+    return nodes, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--node", default="wss://api.ppy-beatrice.blckchnd.com")
+    parser.add_argument("--markets", type=int, default=10000)
+    args = parser.parse_args()
+
+    peerplays = PeerPlays(args.node, nobroadcast=True, num_retries=1)
+    set_shared_peerplays_instance(peerplays)
+    kwargs = dict(
+        network="unittests",
+        sports_folder=SPORTS_FOLDER,
+        proposing_account="init0",
+        approving_account="init0",
+        blockchain_instance=peerplays,
+    )
+
+    Lookup(**kwargs)
+    nodes, before = measure(args.markets)
+    print(
+        "without context: {} nodes in {:.3f}s ({:.1f} us/node)".format(
+            nodes, before, before / nodes * 1e6
+        )
+    )
+
+    with SyncContext(**kwargs):
+        nodes, after = measure(args.markets)
+    print(
+        "with context:    {} nodes in {:.3f}s ({:.1f} us/node)".format(
+            nodes, after, after / nodes * 1e6
+        )
+    )
+    print("speedup: {:.1f}x".format(before / after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+""" Benchmark loading of the bookiesports data at startup
+
+    Compares parsing the YAML files of a sports folder with loading a
+    compiled snapshot (see :mod:`bookied_sync.snapshot`). Each
+    measurement is run in a fresh interpreter to reflect cold starts.
+
+    Usage::
+
+        python benchmarks/startup.py [--network unittests] [--sports-folder FOLDER]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+SPORTS_FOLDER = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "..", "tests", "bookiesports"
+)
+
+LOAD = """
+import time
+start = time.perf_counter()
+from bookied_sync.snapshot import load_bookiesports
+load_bookiesports(network={network!r}, sports_folder={sports_folder!r}, snapshot_folder={snapshot_folder!r})
+print(time.perf_counter() - start)
+"""
+
+
+def measure(runs, **kwargs):
+    times = []
+    for _ in range(runs):
+        out = subprocess.check_output(
+            [sys.executable, "-c", LOAD.format(**kwargs)], stderr=subprocess.DEVNULL
+        )
+        times.append(float(out.decode().strip().splitlines()[-1]))
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--network", default="unittests")
+    parser.add_argument("--sports-folder", default=SPORTS_FOLDER)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as snapshot_folder:
+        kwargs = dict(network=args.network, sports_folder=args.sports_folder)
+        parse = measure(args.runs, snapshot_folder=None, **kwargs)
+        print("parse yaml:    {:.3f}s".format(parse))
+
+        # Compile the snapshot once
+        measure(1, snapshot_folder=snapshot_folder, **kwargs)
+        load = measure(args.runs, snapshot_folder=snapshot_folder, **kwargs)
+        print("load snapshot: {:.3f}s".format(load))
+        print("speedup: {:.1f}x".format(parse / load))
+
+
+if __name__ == "__main__":
+    main()
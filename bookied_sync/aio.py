@@ -0,0 +1,318 @@
+import json
+import asyncio
+from copy import copy, deepcopy
+from types import MethodType
+from peerplays.account import Account
+from peerplays.proposal import Proposal
+from .lookup import Lookup
+from .instance import current_blockchain_instance, use_blockchain_instance
+from . import log
+
+
+class RpcMiss(BaseException):
+    """ Raised by :class:`ReplayRpc` if a call has not been answered yet
+
+        This derives from ``BaseException`` on purpose so that it passes
+        through the ``except Exception`` handlers in ``Lookup.update()``.
+    """
+
+    def __init__(self, method, params):
+        BaseException.__init__(self, method, params)
+        self.method = method
+        self.params = params
+
+
+class ReplayRpc(object):
+    """ Synchronous stand-in for the RPC of a blockchain instance that only
+        answers calls already fetched by an :class:`AsyncSession`
+
+        Attributes that are not RPC calls (e.g. ``chain_params``) are taken
+        from the original RPC. Methods of the RPC class (e.g.
+        ``get_object()``) are run on this instance, so that the calls they
+        make are replayed as well.
+
+        :param dict responses: Responses by ``AsyncSession.key()``
+        :param rpc: Original (synchronous) RPC
+    """
+
+    def __init__(self, responses, rpc=None):
+        self._responses = responses
+        self._rpc = rpc
+
+    def __getattr__(self, name):
+        if self._rpc is not None:
+            attr = getattr(type(self._rpc), name, None)
+            if callable(attr):
+                # Helpers of the RPC class (e.g. ``get_object()``) run on
+                # the replayed calls
+                return MethodType(attr, self)
+            if attr is not None or name in vars(self._rpc):
+                return getattr(self._rpc, name)
+
+        def call(*args, **kwargs):
+            key = AsyncSession.key(name, args)
+            if key not in self._responses:
+                raise RpcMiss(name, args)
+            return deepcopy(self._responses[key])
+
+        return call
+
+
+class AsyncSession(object):
+    """ Run the lookup API on an asyncio event loop
+
+        The session owns a copy of the blockchain instance whose RPC is a
+        :class:`ReplayRpc`. It is used by the lookups only while they run
+        through the session (see
+        :func:`bookied_sync.instance.use_blockchain_instance`), other
+        threads and callers keep using their instances. The (synchronous)
+        lookup code runs unchanged. If it requires data that has not been
+        fetched yet, the call is aborted, the data is fetched through the
+        async ``rpc`` (e.g. ``grapheneapi.aio.api.Api``) without blocking
+        the event loop, and the call is repeated. Concurrent requests for
+        the same data are merged. Fetched responses are kept until the
+        head block changes (or ``refresh()`` is called).
+
+        ``update()`` is repeated transactionally. Operations that a
+        partial run added to the proposal or direct buffer, as well as
+        changes to the approval map and to the lookup itself, are
+        reverted before it is repeated. Since the lookup code does not
+        yield to the event loop while it runs, buffer writes of concurrent
+        updates never interleave.
+
+        .. code-block:: python
+
+            rpc = grapheneapi.aio.api.Api("wss://node.example.com")
+            await rpc.connect()
+            with AsyncSession(rpc) as session:
+                await asyncio.gather(
+                    *[session.wrap(event).update() for event in events]
+                )
+
+        :param rpc: Async RPC, ``await rpc.<method>(*args)`` performs a call
+        :param peerplays.PeerPlays blockchain_instance: Blockchain instance
+            to copy (defaults to the instance of the sync context or the
+            shared instance)
+        :param bool check_head_block: Drop the fetched responses when the
+            head block changes. If ``False``, they are only dropped by
+            ``refresh()``.
+    """
+
+    def __init__(self, rpc, blockchain_instance=None, check_head_block=True):
+        self.rpc = rpc
+        self.blockchain = blockchain_instance
+        self.check_head_block = check_head_block
+        self.responses = dict()
+        self.instance = None
+        self.calls = 0
+        self.retries = 0
+        self._block = None
+        self._inflight = dict()
+
+    @staticmethod
+    def key(name, args):
+        return name, json.dumps(list(args), sort_keys=True, default=str)
+
+    def __enter__(self):
+        return self.activate()
+
+    def __exit__(self, *args):
+        self.deactivate()
+
+    def activate(self):
+        """ Create the session-owned blockchain instance that answers RPC
+            calls with a :class:`ReplayRpc`
+        """
+        if self.instance is None:
+            instance = self.blockchain
+            if instance is None and Lookup.context is not None:
+                instance = Lookup.context.blockchain
+            if instance is None:
+                instance = current_blockchain_instance()
+            self.instance = copy(instance)
+            self.instance.rpc = ReplayRpc(self.responses, instance.rpc)
+        return self
+
+    def deactivate(self):
+        """ Drop the session-owned blockchain instance
+        """
+        self.instance = None
+
+    def refresh(self):
+        """ Drop all fetched responses
+        """
+        self.responses.clear()
+        self._block = None
+
+    async def fetch(self, name, args):
+        """ Perform an RPC call (once) and store its response
+        """
+        key = self.key(name, args)
+        if key in self.responses:
+            return self.responses[key]
+        result = await self._call(key, name, args)
+        self.responses[key] = result
+        return result
+
+    async def _call(self, key, name, args):
+        if key not in self._inflight:
+            self.calls += 1
+            self._inflight[key] = asyncio.ensure_future(
+                getattr(self.rpc, name)(*args)
+            )
+        try:
+            return await asyncio.shield(self._inflight[key])
+        finally:
+            self._inflight.pop(key, None)
+
+    async def sync_head_block(self):
+        """ Drop the fetched responses if the head block has changed
+
+            The dynamic global properties are fetched (once for concurrent
+            runs) and kept as a response.
+        """
+        if not self.check_head_block:
+            return
+        name = "get_dynamic_global_properties"
+        key = self.key(name, ())
+        dgp = await self._call(key, name, ())
+        block = dgp["head_block_number"]
+        if block != self._block:
+            if self._block is not None:
+                log.debug("New head block {}, dropping responses".format(block))
+            self.responses.clear()
+            self._block = block
+        self.responses[key] = dgp
+
+    async def run(self, func, lookup=None):
+        """ Run ``func()`` with the session-owned blockchain instance until
+            all data it needs has been fetched
+
+            :param callable func: Synchronous function to run
+            :param bookied_sync.lookup.Lookup lookup: If provided, the
+                state of the lookup and the shared buffers is restored
+                before ``func()`` is repeated
+        """
+        self.activate()
+        await self.sync_head_block()
+        state = self._snapshot(lookup) if lookup is not None else None
+        while True:
+            try:
+                with use_blockchain_instance(self.instance):
+                    return func()
+            except RpcMiss as miss:
+                if state is not None:
+                    self._restore(lookup, state)
+                self.retries += 1
+                log.debug("Fetching {}{}".format(miss.method, tuple(miss.params)))
+                await self.fetch(miss.method, miss.params)
+
+    @staticmethod
+    def _snapshot(lookup):
+        buffers = [Lookup.proposal_buffer, Lookup.direct_buffer]
+        return (
+            dict(lookup),
+            dict(lookup.__dict__),
+            [(x, len(x.ops)) for x in buffers if x is not None],
+            deepcopy(Lookup.approval_map),
+        )
+
+    @staticmethod
+    def _restore(lookup, state):
+        items, attributes, buffers, approval_map = state
+        dict.clear(lookup)
+        dict.update(lookup, items)
+        lookup.__dict__.clear()
+        lookup.__dict__.update(attributes)
+        for buffer, length in buffers:
+            if len(buffer.ops) > length:
+                del buffer.ops[length:]
+                # Appending (nothing) has the transaction reconstructed
+                buffer.appendOps([])
+        Lookup.approval_map = deepcopy(approval_map)
+
+    def wrap(self, lookup):
+        """ Return an :class:`AsyncLookup` for ``lookup``
+        """
+        return AsyncLookup(lookup, self)
+
+    async def gather(self, lookups, method="update", limit=None, **kwargs):
+        """ Run ``method`` on all lookups concurrently
+
+            :param list lookups: Lookup objects
+            :param str method: ``update``, ``find_id`` or ``is_synced``
+            :param int limit: Maximal number of concurrent lookups
+        """
+        semaphore = asyncio.Semaphore(limit) if limit else None
+
+        async def one(lookup):
+            if semaphore is None:
+                return await getattr(self.wrap(lookup), method)(**kwargs)
+            async with semaphore:
+                return await getattr(self.wrap(lookup), method)(**kwargs)
+
+        return await asyncio.gather(*[one(x) for x in lookups])
+
+    def stats(self):
+        """ Return the number of RPC calls and repeated runs
+        """
+        return dict(calls=self.calls, retries=self.retries)
+
+
+class AsyncLookup(object):
+    """ Async variant of the API of a lookup object (see
+        :class:`AsyncSession`)
+
+        :param bookied_sync.lookup.Lookup lookup: Lookup object
+        :param AsyncSession session: Active session
+    """
+
+    def __init__(self, lookup, session):
+        self.lookup = lookup
+        self.session = session
+
+    async def find_id(self, **kwargs):
+        return await self.session.run(lambda: self.lookup.find_id(**kwargs))
+
+    async def is_synced(self):
+        return await self.session.run(self.lookup.is_synced)
+
+    async def get_id(self, skip_proposals=False):
+        return await self.session.run(
+            lambda: self.lookup.get_id(skip_proposals=skip_proposals)
+        )
+
+    async def has_pending_new(self, **kwargs):
+        return await self.session.run(
+            lambda: list(self.lookup.has_pending_new(**kwargs))
+        )
+
+    async def has_pending_update(self, **kwargs):
+        return await self.session.run(
+            lambda: list(self.lookup.has_pending_update(**kwargs))
+        )
+
+    def _prefetch(self, **kwargs):
+        """ Touch (read-only) everything that ``update()`` is going to need
+        """
+        lookup = self.lookup
+        instance = lookup.blockchain
+        if lookup.approving_account:
+            Account(lookup.approving_account, blockchain_instance=instance)
+        if lookup.proposing_account:
+            Account(lookup.proposing_account, blockchain_instance=instance)
+        if "id" not in lookup or not lookup["id"]:
+            if not lookup.find_id(**kwargs):
+                for pending in lookup.has_pending_new(**kwargs):
+                    Proposal(pending["pid"], blockchain_instance=instance)
+        elif not lookup.is_synced():
+            for pending in lookup.has_pending_update(**kwargs):
+                Proposal(pending["pid"], blockchain_instance=instance)
+
+    async def update(self, **kwargs):
+        """ Async variant of :meth:`bookied_sync.lookup.Lookup.update`
+        """
+        await self.session.run(lambda: self._prefetch(**kwargs))
+        return await self.session.run(
+            lambda: self.lookup.update(**kwargs), lookup=self.lookup
+        )
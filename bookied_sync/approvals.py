@@ -0,0 +1,326 @@
+from copy import deepcopy
+from peerplays.account import Account
+from peerplays.proposal import Proposal
+from peerplays.utils import parse_time
+from peerplaysbase.objects import Operation
+from peerplaysbase.operationids import getOperationNameForId, operations
+from .chunks import chunk_operations
+from .instance import current_blockchain_instance
+from . import log
+
+
+class ApprovalMap(dict):
+    """ Map of the operations of pending proposals that we approve
+
+        Maps proposal ids to a dictionary that flags, per operation index,
+        whether we agree with the operation (see
+        :meth:`bookied_sync.lookup.Lookup.approve`). Additionally, the
+        number of operations that have not been approved yet is tracked per
+        proposal, so that a proposal that becomes fully approved is
+        detected without inspecting the other proposals.
+
+        Proposals are evicted once they expire (``expire()``), once they
+        disappear from the pending proposals on chain (``retain()``) and,
+        if ``max_size`` is set, the oldest ones are evicted to make room
+        for new ones.
+
+        :param int max_size: Maximal number of proposals (optional)
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.max_size = kwargs.pop("max_size", None)
+        dict.__init__(self, *args, **kwargs)
+        self._unapproved = {
+            pid: sum(1 for x in approvals.values() if not x)
+            for pid, approvals in self.items()
+        }
+        self._expirations = dict()
+        self._sources = dict()
+        self._proposals = dict()
+        self.evicted = dict(expired=0, disappeared=0, size=0)
+
+    def register(self, pid, oids, expiration=None, source=None, proposal=None):
+        """ Add the operations of a proposal (if not known yet)
+
+            :param str pid: Proposal id
+            :param list oids: Operation indices of the proposal
+            :param expiration: Expiration time of the proposal (``datetime``
+                or formatted string)
+            :param str source: Account whose pending proposals contain the
+                proposal (see ``retain()``)
+            :param dict proposal: The proposal on chain (see ``proposal()``)
+        """
+        if pid not in self and self.max_size and len(self) >= self.max_size:
+            oldest = next(iter(self))
+            log.debug("Approval map is full, evicting {}".format(oldest))
+            self._evict(oldest, "size")
+        if expiration:
+            if isinstance(expiration, str):
+                expiration = parse_time(expiration)
+            self._expirations[pid] = expiration
+        if source is not None:
+            self._sources.setdefault(pid, source)
+        if proposal is not None:
+            self._proposals[pid] = proposal
+        approvals = self.setdefault(pid, {})
+        if len(approvals) < len(oids):
+            for oid in oids:
+                if oid not in approvals:
+                    approvals[oid] = False
+                    self._unapproved[pid] = self._unapproved.get(pid, 0) + 1
+        return approvals
+
+    def approve(self, pid, oid):
+        """ Flag an operation of a proposal as approved
+
+            :param str pid: Proposal id
+            :param int oid: Operation index within the proposal
+            :returns: ``True`` if the proposal has just become fully
+                approved
+            :raises KeyError: if the proposal is not known
+        """
+        approvals = self[pid]
+        if approvals.get(oid):
+            return False
+        if oid in approvals:
+            self._unapproved[pid] = self._unapproved.get(pid, 1) - 1
+        approvals[oid] = True
+        return self.unapproved(pid) == 0
+
+    def proposal(self, pid):
+        """ Return the proposal on chain as registered (or ``None``)
+        """
+        return self._proposals.get(pid)
+
+    def unapproved(self, pid):
+        """ Number of operations of a proposal that have not been approved
+        """
+        return self._unapproved.get(pid, 0)
+
+    def progress(self, pid):
+        """ Share of approved operations of a proposal (in percent)
+        """
+        approvals = self[pid]
+        return (len(approvals) - self.unapproved(pid)) / len(approvals) * 100
+
+    def _evict(self, pid, reason):
+        del self[pid]
+        self.evicted[reason] += 1
+
+    def expire(self, now):
+        """ Evict all proposals that have expired at ``now``
+
+            :param datetime.datetime now: Current (chain) time
+            :returns: List of evicted proposal ids
+        """
+        expired = [pid for pid, x in self._expirations.items() if x <= now]
+        for pid in expired:
+            self._evict(pid, "expired")
+        return expired
+
+    def retain(self, pids, source=None):
+        """ Evict all proposals (of ``source``) that are not in ``pids``,
+            e.g. because they have been executed or deleted
+
+            :param list pids: Ids of the proposals that are still pending
+            :param str source: Only consider proposals registered with this
+                source
+            :returns: List of evicted proposal ids
+        """
+        pids = set(pids)
+        gone = [
+            pid
+            for pid in self
+            if pid not in pids and self._sources.get(pid) == source
+        ]
+        for pid in gone:
+            self._evict(pid, "disappeared")
+        return gone
+
+    @property
+    def size(self):
+        """ Number of proposals in the map
+        """
+        return len(self)
+
+    def stats(self):
+        """ Return the size of the map and the number of evicted proposals
+            by reason
+        """
+        return dict(size=self.size, evicted=dict(self.evicted))
+
+    def __delitem__(self, pid):
+        dict.__delitem__(self, pid)
+        self._unapproved.pop(pid, None)
+        self._expirations.pop(pid, None)
+        self._sources.pop(pid, None)
+        self._proposals.pop(pid, None)
+
+    def pop(self, pid, *args):
+        self._unapproved.pop(pid, None)
+        self._expirations.pop(pid, None)
+        self._sources.pop(pid, None)
+        self._proposals.pop(pid, None)
+        return dict.pop(self, pid, *args)
+
+    def clear(self):
+        dict.clear(self)
+        self._unapproved.clear()
+        self._expirations.clear()
+        self._sources.clear()
+        self._proposals.clear()
+
+    def __deepcopy__(self, memo):
+        # The proposals (and their blockchain instance) are shared
+        for proposal in self._proposals.values():
+            memo[id(proposal)] = proposal
+        copied = type(self).__new__(type(self))
+        memo[id(self)] = copied
+        dict.update(copied, deepcopy(dict(self), memo))
+        copied.__dict__.update(deepcopy(self.__dict__, memo))
+        return copied
+
+
+class ApprovalBatch(object):
+    """ Queue of proposals that are to be approved
+
+        If ``Lookup.approval_batch`` carries an instance of this class,
+        :meth:`bookied_sync.lookup.Lookup.approve` queues proposals that
+        became fully approved instead of approving them one by one.
+        ``flush()`` drops approvals that are already part of the direct
+        buffer or already present on chain (``available_active_approvals``)
+        and approves the remaining proposals with as few transactions as
+        ``max_operations`` and ``max_bytes`` allow. The proposals that have
+        not been passed to ``add()`` are fetched with a single call.
+
+        :param int max_operations: Maximal number of approvals per
+            transaction (optional)
+        :param int max_bytes: Maximal serialized size of the approvals per
+            transaction (optional)
+        :param peerplays.PeerPlays blockchain_instance: Blockchain instance
+    """
+
+    def __init__(self, max_operations=None, max_bytes=None, blockchain_instance=None):
+        self.max_operations = max_operations
+        self.max_bytes = max_bytes
+        self.blockchain = blockchain_instance
+        self.queue = dict()
+        self._proposals = dict()
+        self.approved = 0
+        self.skipped = 0
+
+    @property
+    def peerplays(self):
+        return self.blockchain or current_blockchain_instance()
+
+    def add(self, pid, account, proposal=None):
+        """ Queue the approval of proposal ``pid`` by ``account``
+
+            :param dict proposal: The proposal on chain (optional, e.g. from
+                :meth:`ApprovalMap.proposal`)
+        """
+        self.queue[(pid, account)] = True
+        if proposal is not None:
+            self._proposals[pid] = proposal
+
+    def __len__(self):
+        return len(self.queue)
+
+    def clear(self):
+        self.queue = dict()
+        self._proposals = dict()
+
+    @staticmethod
+    def buffered(buffer):
+        """ Return the ``(proposal id, account id)`` pairs that are approved
+            by the operations of a transaction buffer
+        """
+        ret = set()
+        if buffer is None:
+            return ret
+        for op in buffer.ops:
+            op = Operation(op).json()
+            if getOperationNameForId(op[0]) == "proposal_update":
+                for account in op[1].get("active_approvals_to_add", []):
+                    ret.add((op[1]["proposal"], account))
+        return ret
+
+    def proposals(self, pids):
+        """ Return the proposals by id (``None`` if a proposal does not
+            exist anymore)
+        """
+        ret = {pid: self._proposals.get(pid) for pid in pids}
+        missing = [pid for pid, proposal in ret.items() if proposal is None]
+        if missing:
+            for pid, data in zip(missing, self.peerplays.rpc.get_objects(missing)):
+                if data:
+                    ret[pid] = Proposal(data, blockchain_instance=self.peerplays)
+        return ret
+
+    def operations(self, direct_buffer=None):
+        """ Return the approvals that are still required and empty the
+            queue
+
+            :param direct_buffer: Transaction buffer whose approvals are
+                not repeated
+            :returns: Dictionary of approving account names and their
+                ``proposal_update`` operations
+        """
+        queue, self.queue = list(self.queue), dict()
+        buffered = self.buffered(direct_buffer)
+        proposals = self.proposals(set(pid for pid, _ in queue))
+        self._proposals = dict()
+        ret = dict()
+        for pid, name in queue:
+            account = Account(name, blockchain_instance=self.peerplays)
+            proposal = proposals[pid]
+            if proposal is None:
+                log.info("Proposal {} does not exist anymore".format(pid))
+            elif (pid, account["id"]) in buffered:
+                log.info("Proposal {} is already being approved".format(pid))
+            elif account["id"] in proposal["available_active_approvals"]:
+                log.info("Proposal {} has already been approved".format(pid))
+            else:
+                ret.setdefault(account["name"], []).append(
+                    [
+                        operations["proposal_update"],
+                        {
+                            "fee": {"amount": 0, "asset_id": "1.3.0"},
+                            "fee_paying_account": account["id"],
+                            "proposal": pid,
+                            "active_approvals_to_add": [account["id"]],
+                        },
+                    ]
+                )
+                continue
+            self.skipped += 1
+        return ret
+
+    def flush(self, direct_buffer=None):
+        """ Approve the queued proposals
+
+            Without limits, the approvals are appended to ``direct_buffer``
+            so that they are broadcast with a single transaction. Otherwise,
+            they are split into new transactions.
+
+            :returns: List of new transaction buffers
+        """
+        txs = list()
+        for account, ops in self.operations(direct_buffer).items():
+            log.info("Approving {} proposals by {}".format(len(ops), account))
+            self.approved += len(ops)
+            if direct_buffer is not None and not (
+                self.max_operations or self.max_bytes
+            ):
+                targets = [(direct_buffer, ops)]
+            else:
+                targets = list()
+                for chunk in chunk_operations(
+                    ops, max_operations=self.max_operations, max_bytes=self.max_bytes
+                ):
+                    targets.append((self.peerplays.new_tx(), chunk))
+                    txs.append(targets[-1][0])
+            for tx, chunk in targets:
+                tx.appendOps([Operation(op).op for op in chunk])
+                tx.appendSigner(account, "active")
+        return txs
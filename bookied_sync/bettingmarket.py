@@ -17,6 +17,27 @@ class LookupBettingMarket(Lookup, dict):
     operation_update = "betting_market_update"
     operation_create = "betting_market_create"
 
+    #: Comparators of ``test_operation_equal()`` and ``find_id()`` (see
+    #: :class:`bookied_sync.comparators.Comparators`)
+    test_operation_equal_comparators = comparators.Comparators(
+        comparators.cmp_required_keys(
+            ["new_group_id", "new_description", "betting_market_id"],
+            ["group_id", "description", "betting_market_id"],
+        ),
+        comparators.cmp_status(),
+        comparators.cmp_group(),
+        comparators.cmp_asset(),
+        comparators.cmp_all_description(),
+    )
+    find_id_comparators = comparators.Comparators(
+        # We compare only the 'eng' content by default
+        comparators.cmp_description("en"),
+        comparators.cmp_asset(),
+    )
+
+    #: Attributes of the fingerprint (see ``Lookup.fingerprint()``)
+    fingerprint_keys = ("description",)
+
     def __init__(self, description, bmg, extra_data={}):
         Lookup.__init__(self)
         self.identifier = "{}/{}".format(bmg["description"]["en"], description["en"])
@@ -41,18 +62,10 @@ class LookupBettingMarket(Lookup, dict):
         """ This method checks if an object or operation on the blockchain
             has the same content as an object in the  lookup
         """
-        test_operation_equal_search = kwargs.get(
-            "test_operation_equal_search",
-            [
-                comparators.cmp_required_keys(
-                    ["new_group_id", "new_description", "betting_market_id"],
-                    ["group_id", "description", "betting_market_id"],
-                ),
-                comparators.cmp_status(),
-                comparators.cmp_group(),
-                comparators.cmp_asset(),
-                comparators.cmp_all_description(),
-            ],
+        match = self.matcher(
+            "match_equal",
+            self.test_operation_equal_comparators,
+            kwargs.get("test_operation_equal_search"),
         )
 
         """ We need to properly deal with the fact that betting markets
@@ -73,13 +86,7 @@ class LookupBettingMarket(Lookup, dict):
                 ):
                     return False
 
-        if all(
-            [
-                # compare by using 'all' the funcs in find_id_search
-                func(self, bm)
-                for func in test_operation_equal_search
-            ]
-        ):
+        if match(bm):
             return True
         return False
 
@@ -96,32 +103,26 @@ class LookupBettingMarket(Lookup, dict):
         if not self.valid_object_id(parent_id):
             return
 
-        bms = BettingMarkets(self.parent_id, peerplays_instance=self.peerplays)
+        bms = self.find_id_candidates(
+            "bettingmarket",
+            lambda: BettingMarkets(self.parent_id, peerplays_instance=self.peerplays),
+            parent_id=self.parent_id,
+            custom="find_id_search" in kwargs,
+        )
 
-        find_id_search = kwargs.get(
-            "find_id_search",
-            [
-                # We compare only the 'eng' content by default
-                comparators.cmp_description("en"),
-                comparators.cmp_asset()
-            ],
+        match = self.matcher(
+            "match_find", self.find_id_comparators, kwargs.get("find_id_search")
         )
 
         for bm in bms:
-            if all(
-                [
-                    # compare by using 'all' the funcs in find_id_search
-                    func(self, bm)
-                    for func in find_id_search
-                ]
-            ):
+            if match(bm):
                 return bm["id"]
 
     def is_synced(self):
         """ Test if data on chain matches lookup
         """
         if "id" in self and self["id"]:
-            bmg = BettingMarket(self["id"])
+            bmg = self.chain_object(BettingMarket)
             if self.test_operation_equal(bmg):
                 return True
         return False
@@ -9,6 +9,7 @@ from peerplays.asset import Asset
 from peerplays.bettingmarketgroup import BettingMarketGroups, BettingMarketGroup
 from . import log, comparators
 from .substitutions import substitute_bettingmarket_name
+from .dynamic import description_line
 
 
 class LookupBettingMarketGroup(Lookup, dict):
@@ -24,6 +25,34 @@ class LookupBettingMarketGroup(Lookup, dict):
     operation_update = "betting_market_group_update"
     operation_create = "betting_market_group_create"
 
+    invalidating_keys = {"rules": ("rules",)}
+
+    #: Comparators of ``test_operation_equal()`` and ``find_id()`` (see
+    #: :class:`bookied_sync.comparators.Comparators`)
+    test_operation_equal_comparators = comparators.Comparators(
+        comparators.cmp_required_keys(
+            [
+                "betting_market_group_id",
+                "new_description",
+                "new_event_id",
+                "new_rules_id",
+            ],
+            ["betting_market_group_id", "description", "event_id", "rules_id"],
+        ),
+        comparators.cmp_status(),
+        comparators.cmp_event(),
+        comparators.cmp_asset(),
+        comparators.cmp_all_description(),
+    )
+    find_id_comparators = comparators.Comparators(
+        # We compare only the 'eng' content by default
+        comparators.cmp_description("en"),
+        comparators.cmp_asset(),
+    )
+
+    #: Attributes of the fingerprint (see ``Lookup.fingerprint()``)
+    fingerprint_keys = ("description",)
+
     def __init__(self, bmg, event, extra_data={}):
         Lookup.__init__(self)
         self.event = event
@@ -51,30 +80,21 @@ class LookupBettingMarketGroup(Lookup, dict):
     def rules(self):
         """ Return instance of LookupRules for this BMG
         """
-        assert self["rules"] in self.sport["rules"]
-        return LookupRules(self.sport["identifier"], self["rules"])
+
+        def rules():
+            assert self["rules"] in self.sport["rules"]
+            return LookupRules(self.sport["identifier"], self["rules"])
+
+        return self.cached("rules", rules)
 
     def test_operation_equal(self, bmg, **kwargs):
         """ This method checks if an object or operation on the blockchain
             has the same content as an object in the  lookup
         """
-        test_operation_equal_search = kwargs.get(
-            "test_operation_equal_search",
-            [
-                comparators.cmp_required_keys(
-                    [
-                        "betting_market_group_id",
-                        "new_description",
-                        "new_event_id",
-                        "new_rules_id",
-                    ],
-                    ["betting_market_group_id", "description", "event_id", "rules_id"],
-                ),
-                comparators.cmp_status(),
-                comparators.cmp_event(),
-                comparators.cmp_asset(),
-                comparators.cmp_all_description(),
-            ],
+        match = self.matcher(
+            "match_equal",
+            self.test_operation_equal_comparators,
+            kwargs.get("test_operation_equal_search"),
         )
 
         """ We need to properly deal with the fact that betting market groups
@@ -95,13 +115,7 @@ class LookupBettingMarketGroup(Lookup, dict):
                 ):
                     return False
 
-        if all(
-            [
-                # compare by using 'all' the funcs in find_id_search
-                func(self, bmg)
-                for func in test_operation_equal_search
-            ]
-        ):
+        if match(bmg):
             """ This is special!
 
                 Since we allow fuzzy logic for matching dynamic parameters, we
@@ -128,25 +142,29 @@ class LookupBettingMarketGroup(Lookup, dict):
         if not self.valid_object_id(parent_id):
             return
 
-        bmgs = BettingMarketGroups(self.parent_id, peerplays_instance=self.peerplays)
+        search = comparators.Comparators.compile(
+            kwargs.get("find_id_search", self.find_id_comparators)
+        )
+        query = self.dynamic_query(search)
+        if query is not None and Lookup.chain_state is not None:
+            # Fuzzy search for a dynamic BMG: only those within the spread
+            bmgs = Lookup.chain_state.find_dynamic(self.parent_id, *query)
+        else:
+            bmgs = self.find_id_candidates(
+                "bettingmarketgroup",
+                lambda: BettingMarketGroups(
+                    self.parent_id, peerplays_instance=self.peerplays
+                ),
+                parent_id=self.parent_id,
+                custom="find_id_search" in kwargs,
+            )
 
-        find_id_search = kwargs.get(
-            "find_id_search",
-            [
-                # We compare only the 'eng' content by default
-                comparators.cmp_description("en"),
-                comparators.cmp_asset()
-            ],
+        match = self.matcher(
+            "match_find", self.find_id_comparators, kwargs.get("find_id_search")
         )
 
         for bmg in bmgs:
-            if all(
-                [
-                    # compare by using 'all' the funcs in find_id_search
-                    func(self, bmg)
-                    for func in find_id_search
-                ]
-            ):
+            if match(bmg):
                 """ This is special!
 
                     Since we allow fuzzy logic for matching dynamic parameters, we
@@ -159,11 +177,43 @@ class LookupBettingMarketGroup(Lookup, dict):
                     self.set_dynamic(bmg)
                 return bmg["id"]
 
+    def dynamic_query(self, search):
+        """ Return the dynamic type, line value and spread to look up
+            candidates in a :class:`bookied_sync.dynamic.DynamicIndex` if
+            ``search`` compares dynamic BMGs fuzzily (or ``None``)
+
+            :param bookied_sync.comparators.Comparators search: Comparators
+        """
+        spread = search.spread
+        if spread is None or not self.get("dynamic"):
+            return
+        try:
+            line = description_line(dList2Dict(self.description))
+        except (TypeError, ValueError, KeyError):
+            # Lines have not been set, compare with all candidates
+            return
+        if line is not None:
+            return line[0].lower(), line[1], spread
+
+    def _pending_candidates(self, name, **kwargs):
+        search = kwargs.get("test_operation_equal_search")
+        if search is None:
+            return Lookup._pending_candidates(self, name, **kwargs)
+        search = comparators.Comparators.compile(search)
+        query = self.dynamic_query(search)
+        if query is None:
+            return Lookup._pending_candidates(self, name, **kwargs)
+        event_id = None
+        if search.compares_parent("event_id") and self.valid_object_id(self.parent_id):
+            event_id = self.parent_id
+        pending = self.get_pending_operations(**kwargs)
+        return pending.dynamic(name).find(*query, event_id=event_id)
+
     def is_synced(self):
         """ Test if data on chain matches lookup
         """
         if "id" in self and self["id"]:
-            bmg = BettingMarketGroup(self["id"])
+            bmg = self.chain_object(BettingMarketGroup)
             if self.test_operation_equal(bmg):
                 return True
         return False
@@ -0,0 +1,449 @@
+import time
+from itertools import takewhile
+from peerplays.sport import Sports
+from peerplays.eventgroup import EventGroups
+from peerplays.event import Events
+from peerplays.bettingmarketgroup import BettingMarketGroups
+from peerplays.bettingmarket import BettingMarkets
+from peerplays.rule import Rules
+from peerplays.utils import formatTime
+from .utils import dList2Dict, canonicalize
+from .dynamic import DynamicIndex
+from .instance import current_blockchain_instance
+from . import log
+
+
+class ChainState(object):
+    """ In-memory index of the sports, event groups, events, betting
+        market groups, betting markets and rules on chain
+
+        Objects are bulk-loaded once per kind and parent (e.g. all events of
+        an event group) and indexed by the attributes that the default
+        ``find_id_search`` comparators use (English name, identifier or
+        description, parent id). Events are indexed by every language of
+        their name together with their start time. Hence, ``find_id()`` of
+        the lookup classes only needs a dictionary lookup and runs the
+        comparators on the (few) candidates.
+
+        The index is only used by :class:`bookied_sync.lookup.Lookup` if
+        ``Lookup.chain_state`` carries an instance of this class. Since the
+        index does not refresh itself, ``refresh()`` or ``invalidate()``
+        need to be called whenever the chain content changes. Objects that
+        we create ourselves can be announced with ``expect()``. Until they
+        show up (or their proposal expires), searches of that kind fetch the
+        objects that have been created since the index was loaded (see
+        ``fetch_new()``), at most once per ``fetch_interval``.
+
+        :param peerplays.PeerPlays blockchain_instance: Blockchain instance
+    """
+
+    #: Per kind: List class and the attribute that carries the parent id
+    lists = {
+        "sport": (Sports, None),
+        "eventgroup": (EventGroups, "sport_id"),
+        "event": (Events, "event_group_id"),
+        "bettingmarketgroup": (BettingMarketGroups, "event_id"),
+        "bettingmarket": (BettingMarkets, "group_id"),
+        "rule": (Rules, None),
+    }
+
+    #: Per kind: Kind of the parent object
+    parents = {
+        "eventgroup": "sport",
+        "event": "eventgroup",
+        "bettingmarketgroup": "event",
+        "bettingmarket": "bettingmarketgroup",
+    }
+
+    #: Per kind: Object id space
+    spaces = {
+        "sport": "1.20",
+        "eventgroup": "1.21",
+        "event": "1.22",
+        "rule": "1.23",
+        "bettingmarketgroup": "1.24",
+        "bettingmarket": "1.25",
+    }
+
+    #: Per kind: Attribute and language the objects are indexed by
+    keys = {
+        "sport": ("name", "identifier"),
+        "eventgroup": ("name", "identifier"),
+        "event": ("name", "en"),
+        "bettingmarketgroup": ("description", "en"),
+        "bettingmarket": ("description", "en"),
+        "rule": ("name", "en"),
+    }
+
+    #: Number of objects requested at once by ``fetch_new()``
+    batch_size = 100
+
+    #: Seconds after which an expected object is no longer looked for,
+    #: unless ``expect()`` is told the expiration of its proposal
+    expectation_lifetime = 6 * 60 * 60
+
+    #: Minimal number of seconds between two ``fetch_new()`` of a kind on
+    #: behalf of ``objects()`` and ``find()`` (one block interval)
+    fetch_interval = 3
+
+    def __init__(self, blockchain_instance=None):
+        self.blockchain = blockchain_instance
+        self._objects = dict()
+        self._index = dict()
+        self._ids = dict()
+        self._dynamic = dict()
+        self._last = dict()
+        self._expected = dict()
+        self._fetched = dict()
+        #: Pending proposals by account id and proposal id, ``None`` unless
+        #: they are maintained (see :class:`bookied_sync.stream.OperationStream`)
+        self.proposals = None
+        #: Ids of the accounts whose proposals are maintained, by name and id
+        self.proposal_accounts = dict()
+
+    @property
+    def peerplays(self):
+        return self.blockchain or current_blockchain_instance()
+
+    def _list(self, kind, parent_id=None, refresh=False):
+        cls, parent_attr = self.lists[kind]
+        args = [parent_id] if parent_attr else []
+        kwargs = dict(peerplays_instance=self.peerplays)
+        objects = cls(*args, **kwargs)
+        if refresh:
+            objects.refresh()
+            objects = cls(*args, **kwargs)
+        return list(objects)
+
+    @staticmethod
+    def instance(id):
+        return int(id.split(".")[2])
+
+    @staticmethod
+    def event_key(lang, name, start_time):
+        """ Index key of an event
+
+            :param str lang: Language
+            :param str name: Name in that language
+            :param start_time: Start time (``datetime`` or formatted
+                string)
+        """
+        if not isinstance(start_time, str):
+            start_time = formatTime(start_time)
+        return (lang, name, start_time)
+
+    @classmethod
+    def index_keys(cls, kind, obj):
+        """ Obtain all index keys of an object on chain or an operation
+        """
+        attr, lang = cls.keys[kind]
+        value = obj.get(attr, obj.get("new_{}".format(attr))) or []
+        if kind == "event":
+            start_time = obj.get("start_time", obj.get("new_start_time"))
+            if not start_time:
+                return []
+            return [cls.event_key(k, v, start_time) for k, v in value]
+        key = dList2Dict(value).get(lang)
+        return [key] if key is not None else []
+
+    @classmethod
+    def lookup_key(cls, kind, lookup):
+        """ Obtain the index key of a lookup object
+
+            Returns ``None`` if the lookup does not carry the indexed
+            attributes.
+        """
+        attr, lang = cls.keys[kind]
+        name = dList2Dict(getattr(lookup, attr) or []).get(lang)
+        if kind == "event":
+            if name is None or not lookup.get("start_time"):
+                return
+            return cls.event_key(lang, name, lookup["start_time"])
+        return name
+
+    def load(self, kind, parent_id=None, refresh=False):
+        """ Bulk-load all objects of a kind (and parent) into the index
+
+            :param str kind: One of the keys in ``ChainState.lists``
+            :param str parent_id: Id of the parent object (if required)
+            :param bool refresh: Fetch from the blockchain even if cached
+        """
+        log.debug("Loading chain state for {} {}".format(kind, parent_id or ""))
+        objects = self._list(kind, parent_id, refresh=refresh)
+        self._objects[(kind, parent_id)] = list()
+        self._index[(kind, parent_id)] = dict()
+        self._dynamic.pop((kind, parent_id), None)
+        for obj in objects:
+            self._insert(kind, parent_id, obj)
+        return objects
+
+    def _insert(self, kind, parent_id, obj):
+        obj = canonicalize(obj)
+        self._objects[(kind, parent_id)].append(obj)
+        index = self._index[(kind, parent_id)]
+        for key in self.index_keys(kind, obj):
+            index.setdefault(key, []).append(obj)
+        if (kind, parent_id) in self._dynamic:
+            self._dynamic[(kind, parent_id)].add(obj)
+        if obj.get("id"):
+            self._ids[obj["id"]] = obj
+            instance = self.instance(obj["id"])
+            if instance > self._last.get(kind, -1):
+                self._last[kind] = instance
+
+    def add(self, kind, obj):
+        """ Add a single object (e.g. one that we have just created) to the
+            index
+
+            The object is only added if the objects of its parent have
+            been loaded already. Otherwise, it will be part of the next
+            ``load()``.
+
+            :param str kind: One of the keys in ``ChainState.lists``
+            :param dict obj: Object as returned by the blockchain
+        """
+        parent_attr = self.lists[kind][1]
+        parent_id = obj.get(parent_attr) if parent_attr else None
+        if (kind, parent_id) not in self._objects:
+            return False
+        ids = [x.get("id") for x in self._objects[(kind, parent_id)]]
+        if obj.get("id") in ids:
+            return False
+        self._insert(kind, parent_id, obj)
+        return True
+
+    def add_new(self, kind, obj):
+        """ Add an object that has just been created
+
+            In contrast to ``add()``, the (so far empty) lists of its
+            children are marked as loaded, so that looking for them does
+            not require a request.
+        """
+        if not self.add(kind, obj):
+            return False
+        for child, parent in self.parents.items():
+            if parent == kind and (child, obj["id"]) not in self._objects:
+                self._objects[(child, obj["id"])] = list()
+                self._index[(child, obj["id"])] = dict()
+        return True
+
+    def remove(self, id):
+        """ Remove the object with id ``id`` from the index
+
+            :returns: The removed object or ``None``
+        """
+        obj = self._ids.pop(id, None)
+        if obj is None:
+            return
+        for (kind, parent_id), objects in self._objects.items():
+            if any(x is obj for x in objects):
+                objects[:] = [x for x in objects if x is not obj]
+                index = self._index[(kind, parent_id)]
+                for key in self.index_keys(kind, obj):
+                    index[key] = [x for x in index.get(key, []) if x is not obj]
+                if (kind, parent_id) in self._dynamic:
+                    self._dynamic[(kind, parent_id)].remove(obj)
+        return obj
+
+    def replace(self, kind, obj):
+        """ Replace an object in the index by a new version of it (e.g.
+            after an update operation), which is re-indexed
+        """
+        self.remove(obj["id"])
+        return self.add(kind, obj)
+
+    def track_proposals(self, account, proposals):
+        """ Maintain the pending proposals that require the approval of
+            ``account``
+
+            :param dict account: Account (with ``id`` and ``name``)
+            :param list proposals: Its pending proposals
+        """
+        if self.proposals is None:
+            self.proposals = dict()
+        self.proposal_accounts[account["name"]] = account["id"]
+        self.proposal_accounts[account["id"]] = account["id"]
+        self.proposals[account["id"]] = {x["id"]: x for x in proposals}
+
+    def pending_proposals(self, account):
+        """ Return the maintained pending proposals that require the
+            approval of ``account`` in the order of their ids
+
+            :param str account: Account name or id
+            :returns: List of proposals or ``None`` if the proposals of
+                ``account`` are not maintained
+        """
+        account_id = self.proposal_accounts.get(account)
+        if self.proposals is None or account_id not in self.proposals:
+            return None
+        proposals = self.proposals[account_id]
+        return [proposals[x] for x in sorted(proposals, key=self.instance)]
+
+    def expect(self, kind, count=1, expiration=None):
+        """ Announce that ``count`` objects of a kind are about to be
+            created (e.g. by a proposal of ours)
+
+            Since the proposal may never be executed, the objects are only
+            looked for until it expires.
+
+            :param str kind: One of the keys in ``ChainState.lists``
+            :param int count: Number of objects
+            :param int expiration: Seconds until the proposal expires
+                (defaults to ``ChainState.expectation_lifetime``)
+        """
+        if expiration is None:
+            expiration = self.expectation_lifetime
+        deadline = time.monotonic() + expiration
+        self._expected.setdefault(kind, []).extend([deadline] * count)
+        self._expected[kind].sort()
+
+    def expected(self, kind):
+        """ Return the number of objects of a kind that are expected (and
+            whose proposals have not expired yet)
+        """
+        current = time.monotonic()
+        deadlines = [x for x in self._expected.get(kind, []) if x > current]
+        if deadlines:
+            self._expected[kind] = deadlines
+        else:
+            self._expected.pop(kind, None)
+        return len(deadlines)
+
+    def received(self, kind, count=1):
+        """ Announce that ``count`` expected objects of a kind have been
+            added by other means than ``fetch_new()`` (e.g. by
+            :class:`bookied_sync.stream.OperationStream`)
+        """
+        if self.expected(kind):
+            # The proposals that expire first are most likely executed first
+            del self._expected[kind][:count]
+
+    def fetch_new(self, kind):
+        """ Fetch the objects of a kind that have been created after the
+            most recent object in the index and add them to the index
+
+            Object ids are assigned sequentially. Hence, this only
+            requests ids past the highest one known instead of reloading
+            all objects.
+        """
+        if kind not in self._last:
+            return []
+        rpc = self.peerplays.rpc
+        new = list()
+        while True:
+            first = self._last[kind] + 1
+            ids = [
+                "{}.{}".format(self.spaces[kind], first + i)
+                for i in range(self.batch_size)
+            ]
+            created = list(takewhile(bool, rpc.get_objects(ids) or []))
+            for obj in created:
+                self.add(kind, obj)
+                self._last[kind] = max(self._last[kind], self.instance(obj["id"]))
+            new.extend(created)
+            if len(created) < len(ids):
+                break
+        if new:
+            log.debug("Added {} new objects of kind {}".format(len(new), kind))
+            self.received(kind, len(new))
+        return new
+
+    def _update(self, kind):
+        if not self.expected(kind):
+            return
+        current = time.monotonic()
+        last = self._fetched.get(kind)
+        if last is not None and current - last < self.fetch_interval:
+            return
+        self._fetched[kind] = current
+        self.fetch_new(kind)
+
+    def objects(self, kind, parent_id=None):
+        """ Return all objects of a kind (and parent)
+        """
+        self._update(kind)
+        if (kind, parent_id) not in self._objects:
+            self.load(kind, parent_id)
+        return self._objects[(kind, parent_id)]
+
+    def find(self, kind, key, parent_id=None):
+        """ Return the candidates of a kind (and parent) that carry ``key``
+
+            :param str kind: One of the keys in ``ChainState.lists``
+            :param key: Value of the indexed attribute (see
+                ``ChainState.keys``) or a tuple as returned by
+                ``ChainState.event_key()`` for events
+            :param str parent_id: Id of the parent object (if required)
+        """
+        self._update(kind)
+        if (kind, parent_id) not in self._index:
+            self.load(kind, parent_id)
+        return self._index[(kind, parent_id)].get(key, [])
+
+    def find_dynamic(self, event_id, typ, center, spread):
+        """ Return the dynamic betting market groups of an event whose line
+            is within ``center`` +/- ``spread`` (see
+            :class:`bookied_sync.dynamic.DynamicIndex`)
+
+            :param str event_id: Id of the event
+            :param str typ: Dynamic type (e.g. ``hc`` or ``ou``)
+            :param float center: Line value of the lookup
+            :param float spread: Allowed deviation
+        """
+        key = ("bettingmarketgroup", event_id)
+        objects = self.objects(*key)
+        if key not in self._dynamic:
+            self._dynamic[key] = DynamicIndex(objects)
+        return self._dynamic[key].find(typ, center, spread)
+
+    def get(self, id):
+        """ Return the object with id ``id`` if it has been loaded (or
+            ``None``)
+        """
+        return self._ids.get(id)
+
+    def find_any(self, kind, keys, parent_id=None):
+        """ Return the candidates that carry any of ``keys`` in the order
+            of their ids
+        """
+        found = dict()
+        for key in keys:
+            for obj in self.find(kind, key, parent_id):
+                found.setdefault(obj["id"], obj)
+        return [found[x] for x in sorted(found, key=self.instance)]
+
+    def find_events(self, eventgroup_id, names, start_time):
+        """ Return the events of an event group that carry any of the names
+            and start at ``start_time``
+
+            :param str eventgroup_id: Id of the event group
+            :param list names: List of ``[lang, name]`` pairs
+            :param start_time: Start time (``datetime`` or formatted
+                string)
+        """
+        return self.find_any(
+            "event",
+            [self.event_key(lang, name, start_time) for lang, name in names],
+            eventgroup_id,
+        )
+
+    def refresh(self, kind=None, parent_id=None):
+        """ Reload everything (or a kind, or a kind and parent) that has
+            been loaded before from the blockchain
+        """
+        for k, p in list(self._objects):
+            if (kind is None or k == kind) and (parent_id is None or p == parent_id):
+                self.load(k, p, refresh=True)
+                self._expected.pop(k, None)
+
+    def invalidate(self, kind=None, parent_id=None):
+        """ Drop everything (or a kind, or a kind and parent) from the
+            index so that it is reloaded on next use
+        """
+        for k, p in list(self._objects):
+            if (kind is None or k == kind) and (parent_id is None or p == parent_id):
+                for obj in self._objects.pop((k, p), []):
+                    self._ids.pop(obj.get("id"), None)
+                self._index.pop((k, p), None)
+                self._dynamic.pop((k, p), None)
+                self._expected.pop(k, None)
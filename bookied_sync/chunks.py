@@ -0,0 +1,112 @@
+import re
+from peerplaysbase.objects import Operation
+from . import log
+
+#: Relative object id, refers to the object created by the n-th operation
+#: of the same proposal
+RELATIVE_ID = re.compile(r"^0\.0\.(\d+)$")
+
+
+def relative_references(data):
+    """ Return the indices of all operations that ``data`` (the payload of
+        an operation) refers to through relative ids (``0.0.x``)
+    """
+    if isinstance(data, dict):
+        data = list(data.values())
+    if isinstance(data, (list, tuple)):
+        return set().union(*[relative_references(x) for x in data])
+    if isinstance(data, str):
+        match = RELATIVE_ID.match(data)
+        if match:
+            return {int(match.group(1))}
+    return set()
+
+
+def renumber(data, mapping):
+    """ Rewrite relative ids in ``data`` according to ``mapping`` (old index
+        to new index)
+    """
+    if isinstance(data, dict):
+        return {k: renumber(v, mapping) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [renumber(x, mapping) for x in data]
+    if isinstance(data, str):
+        match = RELATIVE_ID.match(data)
+        if match and int(match.group(1)) in mapping:
+            return "0.0.{}".format(mapping[int(match.group(1))])
+    return data
+
+
+def group_operations(operations):
+    """ Group operations that refer to each other through relative ids
+
+        :param list operations: Operations as ``[operation_id, data]``
+        :returns: Lists of operation indices in the order of their first
+            operation
+    """
+    parent = list(range(len(operations)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, op in enumerate(operations):
+        for j in relative_references(op[1]):
+            if j < len(operations):
+                parent[root(i)] = root(j)
+
+    groups = dict()
+    for i in range(len(operations)):
+        groups.setdefault(root(i), []).append(i)
+    return sorted(groups.values(), key=lambda x: x[0])
+
+
+def chunk_operations(operations, max_operations=None, max_bytes=None):
+    """ Split the operations of a proposal into several proposals
+
+        Operations that refer to each other through relative ids stay in
+        the same chunk and their references are renumbered to the position
+        within the chunk. Within a chunk, operations keep their original
+        order. A group that exceeds
+        the limits on its own is put into a chunk of its own.
+
+        :param list operations: Operations as ``[operation_id, data]``
+        :param int max_operations: Maximal number of operations per chunk
+        :param int max_bytes: Maximal serialized size of the operations per
+            chunk
+        :returns: List of chunks, each a list of operations
+    """
+    chunks = list()
+    current, current_bytes = list(), 0
+    for group in group_operations(operations):
+        size = sum(len(bytes(Operation(operations[i]))) for i in group)
+        if (max_operations and len(group) > max_operations) or (
+            max_bytes and size > max_bytes
+        ):
+            log.warning(
+                "Operations {} refer to each other and exceed the proposal "
+                "limits".format(group)
+            )
+        if current and (
+            (max_operations and len(current) + len(group) > max_operations)
+            or (max_bytes and current_bytes + size > max_bytes)
+        ):
+            chunks.append(sorted(current))
+            current, current_bytes = list(), 0
+        current.extend(group)
+        current_bytes += size
+    if current:
+        chunks.append(sorted(current))
+
+    ret = list()
+    for chunk in chunks:
+        mapping = {old: new for new, old in enumerate(chunk)}
+        ret.append(
+            [
+                [operations[i][0], renumber(operations[i][1], mapping)]
+                for i in chunk
+            ]
+        )
+    return ret
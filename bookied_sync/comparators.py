@@ -1,5 +1,247 @@
+import time
+from functools import partial
+from threading import Lock
 from peerplays.event import Event
-from .utils import dList2Dict
+from peerplays.utils import formatTime
+from .utils import dList2Dict, canonical, canonical_of
+
+
+def comparator(prepare, cost=1, name=None):
+    """ Create a comparator ``cmp(soll, ist)`` from ``prepare(soll)``
+
+        ``prepare`` computes the lookup-side values once and returns a
+        test ``test(ist)`` for the objects or operations on chain. The
+        comparator carries ``prepare`` and its ``cost`` so that
+        :class:`Comparators` can evaluate it efficiently.
+
+        :param callable prepare: Returns the test for a lookup
+        :param int cost: Relative cost of the test (cheapest first)
+        :param str name: Name of the comparator in the statistics (see
+            :class:`ComparatorStats`), defaults to the name of the factory
+    """
+
+    def cmp(soll, ist):
+        return prepare(soll)(ist)
+
+    cmp.prepare = prepare
+    cmp.cost = cost
+    cmp.name = name or prepare.__qualname__.split(".")[0]
+    return cmp
+
+
+def comparator_name(func):
+    """ Return the name of a comparator (or custom function)
+    """
+    return getattr(func, "name", None) or getattr(func, "__qualname__", repr(func))
+
+
+def once(func):
+    """ Return a function that calls ``func()`` on first use only and
+        returns its (cached) result
+    """
+    value = list()
+
+    def get():
+        if not value:
+            value.append(func())
+        return value[0]
+
+    return get
+
+
+class Comparators(object):
+    """ Compiled list of comparators
+
+        The comparators are evaluated cheapest first and the evaluation
+        stops at the first mismatch. ``bind()`` prepares the comparators
+        for one lookup, so that the lookup-side values are computed once
+        (on first use) for all objects or operations that are compared.
+        Plain functions ``func(soll, ist)`` (e.g. custom lists) are
+        accepted, they are evaluated last and in their original order.
+
+        .. code-block:: python
+
+            match = Comparators(cmp_name("en"), cmp_sport()).bind(lookup)
+            ids = [x["id"] for x in eventgroups if match(x)]
+
+        :param list comparators: Comparators
+    """
+
+    #: Cost of comparators that do not provide one (e.g. custom functions)
+    default_cost = 10
+
+    def __init__(self, *comparators):
+        self.comparators = sorted(
+            comparators, key=lambda x: getattr(x, "cost", self.default_cost)
+        )
+
+    @classmethod
+    def compile(cls, comparators):
+        """ Return ``comparators`` as :class:`Comparators` (compiled once)
+        """
+        if isinstance(comparators, cls):
+            return comparators
+        return cls(*comparators)
+
+    def __iter__(self):
+        return iter(self.comparators)
+
+    def __len__(self):
+        return len(self.comparators)
+
+    @staticmethod
+    def _prepare(func, soll):
+        if hasattr(func, "prepare"):
+            return func.prepare(soll)
+        return partial(func, soll)
+
+    def bind(self, soll):
+        """ Return a test ``match(ist)`` for the lookup ``soll``
+
+            If the lookup carries ``comparator_stats`` (see
+            :class:`ComparatorStats`), the comparisons are recorded.
+        """
+        tests = [once(partial(self._prepare, x, soll)) for x in self.comparators]
+        stats = getattr(soll, "comparator_stats", None)
+        if stats is not None:
+            tests = [
+                stats.instrument(test, type(soll).__name__, comparator_name(x))
+                for test, x in zip(tests, self.comparators)
+            ]
+
+        def match(ist):
+            for test in tests:
+                if not test()(ist):
+                    return False
+            return True
+
+        return match
+
+    def __call__(self, soll, ist):
+        return self.bind(soll)(ist)
+
+    @property
+    def spread(self):
+        """ Smallest spread of the fuzzy comparators (see
+            ``cmp_dynamic_bmg_fuzzy()``) or ``None``
+        """
+        spreads = [x.spread for x in self.comparators if hasattr(x, "spread")]
+        return min(spreads) if spreads else None
+
+    def compares_parent(self, name):
+        """ Do the comparators compare the parent ``name`` (e.g.
+            ``event_id``)?
+        """
+        return any(getattr(x, "parent", None) == name for x in self.comparators)
+
+
+class ComparatorStats(object):
+    """ Call counters and timers of the comparators
+
+        If ``Lookup.comparator_stats`` carries an instance of this class,
+        every comparison made through :class:`Comparators` is recorded per
+        lookup class and comparator: the number of calls, how many of them
+        matched, did not match or raised, and the cumulative time (including
+        the preparation of the lookup-side values).
+
+        .. code-block:: python
+
+            Lookup.comparator_stats = ComparatorStats()
+            # ... sync ...
+            print(Lookup.comparator_stats.report())
+
+        :param callable clock: Timer (defaults to ``time.perf_counter``)
+    """
+
+    #: Fields of a record
+    fields = ("calls", "true", "false", "errors", "time")
+
+    def __init__(self, clock=None):
+        self.clock = clock or time.perf_counter
+        self._records = dict()
+        self._lock = Lock()
+
+    def instrument(self, test, lookup, name):
+        """ Return ``test`` (as prepared by :meth:`Comparators.bind`) with
+            its calls recorded for the lookup class ``lookup`` and the
+            comparator ``name``
+        """
+        key = (lookup, name)
+
+        def timed(ist):
+            start = self.clock()
+            try:
+                result = test()(ist)
+            except Exception:
+                self._record(key, "errors", self.clock() - start)
+                raise
+            self._record(key, "true" if result else "false", self.clock() - start)
+            return result
+
+        return lambda: timed
+
+    def _record(self, key, outcome, seconds):
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                record = self._records[key] = dict.fromkeys(self.fields, 0)
+            record["calls"] += 1
+            record[outcome] += 1
+            record["time"] += seconds
+
+    def get(self, lookup=None, name=None):
+        """ Return the records, optionally only those of the lookup class
+            ``lookup`` and/or the comparator ``name``
+
+            :returns: Dictionary ``{(lookup, name): record}`` where a record
+                carries ``calls``, ``true``, ``false``, ``errors``, ``time``
+                (seconds) and ``true_ratio``
+        """
+        with self._lock:
+            records = {k: dict(v) for k, v in self._records.items()}
+        ret = dict()
+        for key, record in records.items():
+            if lookup not in (None, key[0]) or name not in (None, key[1]):
+                continue
+            record["true_ratio"] = record["true"] / record["calls"]
+            ret[key] = record
+        return ret
+
+    def stats(self):
+        """ Return the records by lookup class and comparator
+        """
+        ret = dict()
+        for (lookup, name), record in self.get().items():
+            ret.setdefault(lookup, dict())[name] = record
+        return ret
+
+    def report(self, sort="time"):
+        """ Return the records as table, the most expensive first
+
+            :param str sort: Field to sort by (e.g. ``time`` or ``calls``)
+        """
+        records = sorted(self.get().items(), key=lambda x: x[1][sort], reverse=True)
+        header = ("lookup", "comparator") + self.fields + ("true %",)
+        rows = [
+            (lookup, name)
+            + tuple(str(x[field]) for field in self.fields[:-1])
+            + ("{:.6f}".format(x["time"]), "{:.1f}".format(x["true_ratio"] * 100))
+            for (lookup, name), x in records
+        ]
+        widths = [max(len(x) for x in column) for column in zip(header, *rows)]
+        return "\n".join(
+            "  ".join(
+                x.ljust(w) if i < 2 else x.rjust(w)
+                for i, (x, w) in enumerate(zip(row, widths))
+            ).rstrip()
+            for row in [header] + rows
+        )
+
+    def reset(self):
+        """ Drop all records
+        """
+        with self._lock:
+            self._records = dict()
 
 
 def cmp_dynamic_bmg_fuzzy(spread=1):
@@ -10,18 +252,21 @@ def cmp_dynamic_bmg_fuzzy(spread=1):
         Lookup
     """
 
-    def cmp(soll, ist):
-        def in_range(x, center):
-            x = float(x)
-            center = float(center)
-            return x >= center - spread and x <= center + spread
+    def in_range(x, center):
+        x = float(x)
+        center = float(center)
+        return x >= center - spread and x <= center + spread
+
+    def prepare(soll):
+        self_description = once(lambda: dList2Dict(soll.description))
+        return partial(test, self_description)
 
-        ist_description = ist.get("description", ist.get("new_description"))
+    def test(self_description, ist):
+        ist_description, description = canonical_of(ist, "description")
         if not ist_description:
             return False
 
-        self_description = dList2Dict(soll.description)
-        description = dList2Dict(ist_description)
+        self_description = self_description()
         if "_dynamic" not in self_description or "_dynamic" not in description:
             return False
 
@@ -53,7 +298,11 @@ def cmp_dynamic_bmg_fuzzy(spread=1):
         else:
             raise
 
+        return False
+
     # Return the new cmp function that contains the 'spread'
+    cmp = comparator(prepare, cost=5, name="cmp_dynamic_bmg_fuzzy({})".format(spread))
+    cmp.spread = spread
     return cmp
 
 
@@ -61,16 +310,18 @@ def cmp_lang(key, lang):
     """ Compare a single *language* of double listed data obtained from `key`
     """
 
-    def cmp(soll, ist):
-        _ist = ist.get(key, ist.get("new_{}".format(key)))
-        _soll = getattr(soll, key)
-        if not _ist:
-            return False
-        lang_ist = dList2Dict(_ist).get(lang)
-        lang_soll = dList2Dict(_soll).get(lang)
-        return lang_ist == lang_soll
+    def prepare(soll):
+        lang_soll = dList2Dict(getattr(soll, key)).get(lang)
 
-    return cmp
+        def test(ist):
+            _ist, mapping = canonical_of(ist, key)
+            if not _ist:
+                return False
+            return mapping.get(lang) == lang_soll
+
+        return test
+
+    return comparator(prepare, cost=3, name="cmp_lang({}, {})".format(key, lang))
 
 
 def cmp_langs(key, langs=None):
@@ -78,37 +329,40 @@ def cmp_langs(key, langs=None):
         `key`
     """
 
-    def cmp(soll, ist, langs=langs, key=key):
-        ist = ist.get(key, ist.get("new_{}".format(key)))
-        if not ist:
-            return False
+    def prepare(soll):
+        description = dList2Dict(soll.description)
 
-        if callable(langs):
-            langs = filter(langs, dList2Dict(ist).keys())
-        if not langs:
-            langs = ["en"]
+        def test(ist, langs=langs):
+            _ist, mapping = canonical_of(ist, key)
+            if not _ist:
+                return False
 
-        return all(
-            [bool([k, dList2Dict(soll.description).get(k)] in ist) for k in langs]
-        )
+            if callable(langs):
+                langs = filter(langs, mapping.keys())
+            if not langs:
+                langs = ["en"]
 
-    return cmp
+            return all((k, description.get(k)) in _ist for k in langs)
+
+        return test
+
+    return comparator(prepare, cost=4, name="cmp_langs({})".format(key))
 
 
 def cmp_all_langs(key):
     """ Compare *all* *languages* of a double listed data obtained from `key`
     """
 
-    def cmp(soll, ist):
-        _soll = getattr(soll, key)
-        _ist = ist.get(key, ist.get("new_{}".format(key)))
-        return (
-            (bool(_ist) and bool(_soll))
-            and all([a in _ist for a in _soll])
-            and all([b in _soll for b in _ist])
-        )
+    def prepare(soll):
+        _soll = canonical(getattr(soll, key))
 
-    return cmp
+        def test(ist):
+            _ist = canonical_of(ist, key)[0]
+            return bool(_ist) and bool(_soll) and _ist == _soll
+
+        return test
+
+    return comparator(prepare, cost=2, name="cmp_all_langs({})".format(key))
 
 
 def cmp_required_keys(*required_keys):
@@ -123,43 +377,66 @@ def cmp_required_keys(*required_keys):
 
     """
 
-    def cmp(soll, ist):
-        def test(data, keys):
-            return any([x in data for x in keys])
+    def test(data, keys):
+        return any([x in data for x in keys])
 
+    def cmp(ist):
         if not any([test(ist, x) for x in required_keys]):
             raise ValueError
         return True
 
-    return cmp
+    return comparator(lambda soll: cmp, cost=0)
 
 
 def cmp_status():
     """ Compare the status attribute of an operation
     """
 
-    def cmp(soll, ist):
-        return (
-            not bool(soll.get("status"))
-            or not bool(ist.get("status"))
-            or ist.get("status") == soll.get("status")
-        )
+    def prepare(soll):
+        status = soll.get("status")
 
-    return cmp
+        def test(ist):
+            return (
+                not bool(status)
+                or not bool(ist.get("status"))
+                or ist.get("status") == status
+            )
+
+        return test
+
+    return comparator(prepare, cost=1)
 
 
 def cmp_parent(name, allow_proposal=True):
     """ Compare the parent element denoted by ``name`` (e.g. sport_id)
     """
 
-    def cmp(soll, ist):
-        alt_key_name = "new_{}".format(name)
-        parent_id = ist.get(name, ist.get(alt_key_name))
-        test_parent = soll.valid_object_id(parent_id)
-        if allow_proposal and soll.parent_id[0] == "0":
-            test_parent = False
-        return not test_parent or ist.get(name, ist.get(alt_key_name)) == soll.parent_id
+    alt_key_name = "new_{}".format(name)
+
+    def prepare(soll):
+        known = list()
+
+        def soll_parent_id():
+            # The parent may still be a proposal (0.0.x or 1.10.x), only
+            # the id of an object on chain is final
+            if known:
+                return known[0]
+            parent_id = soll.parent_id
+            if soll.valid_object_id(parent_id):
+                known.append(parent_id)
+            return parent_id
+
+        def test(ist):
+            parent_id = ist.get(name, ist.get(alt_key_name))
+            test_parent = soll.valid_object_id(parent_id)
+            if allow_proposal and soll_parent_id()[0] == "0":
+                test_parent = False
+            return not test_parent or parent_id == soll_parent_id()
+
+        return test
 
+    cmp = comparator(prepare, cost=2, name="cmp_parent({})".format(name))
+    cmp.parent = name
     return cmp
 
 
@@ -167,16 +444,17 @@ def cmp_start_time():
     """ Compare start time
     """
 
-    def cmp(soll, ist):
-        from peerplays.utils import formatTime
+    def prepare(soll):
+        if not soll.get("start_time"):
+            return lambda ist: True
+        start_time = formatTime(soll.get("start_time"))
 
-        return (
-            not bool(soll.get("start_time"))
-            or not bool(ist.get("start_time"))
-            or ist.get("start_time") == formatTime(soll.get("start_time"))
-        )
+        def test(ist):
+            return not bool(ist.get("start_time")) or ist.get("start_time") == start_time
 
-    return cmp
+        return test
+
+    return comparator(prepare, cost=1)
 
 
 def cmp_description(lang="en"):
@@ -247,22 +525,28 @@ def cmp_sport():
 def cmp_asset():
     """ compare asset
     """
-    def cmp(soll, ist):
-        return (
-            not bool(soll.get("asset"))
-            or not bool(ist.get("asset"))
-            or ist.get("asset") == soll.get("asset")
-        )
 
-    return cmp
+    def prepare(soll):
+        asset = soll.get("asset")
+
+        def test(ist):
+            return (
+                not bool(asset)
+                or not bool(ist.get("asset"))
+                or ist.get("asset") == asset
+            )
+
+        return test
+
+    return comparator(prepare, cost=1)
 
 def cmp_season():
     """ compare the content of season
     """
 
-    def cmp(soll, ist):
+    def cmp(ist):
         """ Currently disabled
         """
         return True
 
-    return cmp
+    return comparator(lambda soll: cmp, cost=0)
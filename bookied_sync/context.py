@@ -0,0 +1,91 @@
+import os
+from .lookup import Lookup
+
+
+class SyncContext(object):
+    """ Shared context for synchronizing a tree of lookup objects
+
+        The context is created explicitly and sets up the blockchain
+        instance, the proposing and approving accounts, the transaction
+        buffers and the bookiesports data **once**. While the context is
+        active, all instances of :class:`bookied_sync.lookup.Lookup` (and
+        its subclasses) obtain those from the context instead of running
+        the full initialization, which makes child nodes (events, betting
+        market groups, betting markets) cheap value objects.
+
+        The parameters are identical to those of
+        :class:`bookied_sync.lookup.Lookup`.
+
+        .. code-block:: python
+
+            with SyncContext(network="beatrice", proposing_account="init0"):
+                event = LookupEvent(...)
+                for bmg in event.bettingmarketgroups:
+                    for bm in bmg.bettingmarkets:
+                        bm.update()
+
+    """
+
+    def __init__(
+        self,
+        sports_folder=None,
+        network=None,
+        proposing_account=None,
+        approving_account=None,
+        *args,
+        **kwargs
+    ):
+        # Full initialization of accounts, buffers and data
+        self.lookup = Lookup(
+            sports_folder, network, proposing_account, approving_account, *args, **kwargs
+        )
+        self.blockchain = self.lookup.blockchain
+        self.cwd = os.getcwd()
+
+    def __enter__(self):
+        return self.activate()
+
+    def __exit__(self, *args):
+        self.deactivate()
+
+    def activate(self):
+        """ Use this context for all Lookup instances created from now on
+        """
+        Lookup.context = self
+        return self
+
+    def deactivate(self):
+        """ Stop using this context for new Lookup instances
+        """
+        if Lookup.context is self:
+            Lookup.context = None
+
+    @property
+    def is_active(self):
+        return Lookup.context is self
+
+    @property
+    def peerplays(self):
+        """ Alias for the blockchain instance
+        """
+        return self.blockchain
+
+    @property
+    def data(self):
+        return Lookup.data
+
+    @property
+    def proposing_account(self):
+        return Lookup._proposing_account
+
+    @property
+    def approving_account(self):
+        return Lookup._approving_account
+
+    @property
+    def direct_buffer(self):
+        return Lookup.direct_buffer
+
+    @property
+    def proposal_buffer(self):
+        return Lookup.proposal_buffer
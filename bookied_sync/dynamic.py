@@ -0,0 +1,102 @@
+from bisect import bisect_left, bisect_right
+from .utils import canonical_of
+
+
+def dynamic_line(data):
+    """ Return the dynamic type and the line value (home handicap or
+        over/under) of a betting market group on chain or an operation
+
+        :param dict data: Object or payload of the operation
+        :returns: ``(type, value)`` or ``None`` if the betting market group
+            is not dynamic
+    """
+    return description_line(canonical_of(data, "description")[1])
+
+
+def description_line(description):
+    """ Return the dynamic type and the line value of a description (as
+        dictionary), see ``dynamic_line()``
+    """
+    typ = description.get("_dynamic")
+    if not typ:
+        return
+    value = description.get("_ou" if typ.lower() == "ou" else "_hch")
+    try:
+        return typ, float(value)
+    except (TypeError, ValueError):
+        return
+
+
+class DynamicIndex(object):
+    """ Sorted index of dynamic betting market groups by event, dynamic
+        type and line value
+
+        ``find()`` returns the betting market groups whose line is within
+        a spread around a center (as compared by
+        :func:`bookied_sync.comparators.cmp_dynamic_bmg_fuzzy`) with two
+        binary searches per event instead of comparing all of them.
+        Operations that refer to an event in the same proposal (``0.0.x``)
+        are kept apart and returned for any event.
+
+        :param list items: Betting market groups (or entries that carry
+            them, see ``key``)
+        :param callable key: Returns the object or operation payload of an
+            item
+    """
+
+    def __init__(self, items=(), key=None):
+        self.key = key or (lambda x: x)
+        self._lines = dict()
+        self._count = 0
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """ Add an item (ignored if it is not a dynamic betting market group)
+        """
+        data = self.key(item)
+        line = dynamic_line(data)
+        if line is None:
+            return False
+        event_id = data.get("event_id", data.get("new_event_id"))
+        if not event_id or event_id[:5] != "1.22.":
+            event_id = None
+        values, items = self._lines.setdefault((event_id, line[0]), ([], []))
+        i = bisect_right(values, line[1])
+        values.insert(i, line[1])
+        items.insert(i, (self._count, item))
+        self._count += 1
+        return True
+
+    def remove(self, item):
+        """ Remove an item (by identity)
+        """
+        for values, items in self._lines.values():
+            for i, (_, x) in enumerate(items):
+                if x is item:
+                    del values[i]
+                    del items[i]
+                    return True
+        return False
+
+    def find(self, typ, center, spread, event_id=None):
+        """ Return the items of type ``typ`` whose line is within
+            ``center`` +/- ``spread`` in the order they were added
+
+            :param str typ: Dynamic type (e.g. ``hc`` or ``ou``)
+            :param float center: Line value of the lookup
+            :param float spread: Allowed deviation
+            :param str event_id: Only return items of this event (and those
+                that refer to an event in their proposal)
+        """
+        center = float(center)
+        found = list()
+        for (_event_id, _typ), (values, items) in self._lines.items():
+            if _typ != typ:
+                continue
+            if event_id is not None and _event_id not in (event_id, None):
+                continue
+            lower = bisect_left(values, center - spread)
+            upper = bisect_right(values, center + spread)
+            found.extend(items[lower:upper])
+        return [x for _, x in sorted(found, key=lambda x: x[0])]
@@ -42,6 +42,36 @@ class LookupEvent(Lookup, dict):
     operation_update = "event_update"
     operation_create = "event_create"
 
+    invalidating_keys = {
+        "sport": ("sport_identifier",),
+        "eventgroup": ("sport_identifier", "eventgroup_identifier"),
+        "eventscheme": ("sport_identifier", "eventgroup_identifier"),
+        "participants": ("sport_identifier", "eventgroup_identifier"),
+        "names": ("teams", "sport_identifier", "eventgroup_identifier"),
+    }
+
+    #: Comparators of ``test_operation_equal()`` and ``find_id()`` (see
+    #: :class:`bookied_sync.comparators.Comparators`)
+    test_operation_equal_comparators = comparators.Comparators(
+        comparators.cmp_required_keys(
+            ["event_group_id", "new_name", "new_status"],
+            ["event_group_id", "name", "status"],
+        ),
+        comparators.cmp_all_name(),
+        comparators.cmp_status(),
+        comparators.cmp_season(),
+        comparators.cmp_start_time(),
+        comparators.cmp_event_group(),
+    )
+    find_id_comparators = comparators.Comparators(
+        comparators.cmp_name("en"),
+        comparators.cmp_start_time(),
+        comparators.cmp_event_group(),
+    )
+
+    #: Attributes of the fingerprint (see ``Lookup.fingerprint()``)
+    fingerprint_keys = ("name",)
+
     def __init__(
         self,
         teams,
@@ -57,7 +87,7 @@ class LookupEvent(Lookup, dict):
 
         # First try to load the data from the blockchain if id is present
         if id and len(id.split(".")) == 3:
-            dict.update(self, dict(Event(id)))
+            dict.update(self, dict(Event(id, blockchain_instance=self.blockchain)))
         # Also store all the stuff in kwargs
         dict.__init__(self, extra_data)
         dict.update(
@@ -81,7 +111,6 @@ class LookupEvent(Lookup, dict):
                 "Here: {}".format(str(self["teams"]))
             )
 
-        self.parent = self.eventgroup
         self.identifier = "{}/{}/{}".format(
             self.parent["name"]["en"], teams[0], teams[1]
         )
@@ -90,7 +119,9 @@ class LookupEvent(Lookup, dict):
             raise ValueError("'start_time' must be instance of datetime.datetime()")
         else:
             # remove offset
-            self["start_time"] = self["start_time"].replace(tzinfo=None)
+            dict.__setitem__(
+                self, "start_time", self["start_time"].replace(tzinfo=None)
+            )
 
         if not isinstance(self["season"], dict):
             raise ValueError("'season' must be (language) dictionary")
@@ -114,13 +145,19 @@ class LookupEvent(Lookup, dict):
             :param list teams: list of teams
             :param datetime.datetime start_time: Time of start
 
+            .. note:: If ``Lookup.chain_state`` is set, the events are
+                      obtained from its event index.
         """
         sport = LookupSport(sport_identifier)
         eventgroup = LookupEventGroup(sport, eventgroup_identifier)
-        events = Events(eventgroup.id)  # This is a pypeerplays class!
         # Format teams into proper names according to event scheme
         names = substitution(teams, eventgroup["eventscheme"]["name"])
         names = [[k, v] for k, v in names.items()]
+        if Lookup.chain_state is not None:
+            events = Lookup.chain_state.find_events(eventgroup.id, names, start_time)
+        else:
+            # This is a pypeerplays class!
+            events = Events(eventgroup.id, blockchain_instance=eventgroup.blockchain)
         for event in events:
             if (
                 any([x in event["name"] for x in names])
@@ -139,7 +176,7 @@ class LookupEvent(Lookup, dict):
     def sport(self):
         """ Return LookupSport instance for this event
         """
-        return LookupSport(self["sport_identifier"])
+        return self.cached("sport", lambda: LookupSport(self["sport_identifier"]))
 
     @property
     def teams(self):
@@ -154,36 +191,29 @@ class LookupEvent(Lookup, dict):
     def eventgroup(self):
         """ Get the event group that corresponds to this event
         """
-        sport = LookupSport(self["sport_identifier"])
-        return LookupEventGroup(sport["identifier"], self["eventgroup_identifier"])
+        return self.cached(
+            "eventgroup",
+            lambda: LookupEventGroup(self.sport, self["eventgroup_identifier"]),
+        )
+
+    @property
+    def parent(self):
+        """ Return the parent event group (see ``eventgroup``)
+        """
+        return self.eventgroup
 
     def test_operation_equal(self, event, **kwargs):
         """ This method checks if an object or operation on the blockchain
             has the same content as an object in the  lookup
         """
 
-        test_operation_equal_search = kwargs.get(
-            "test_operation_equal_search",
-            [
-                comparators.cmp_required_keys(
-                    ["event_group_id", "new_name", "new_status"],
-                    ["event_group_id", "name", "status"],
-                ),
-                comparators.cmp_all_name(),
-                comparators.cmp_status(),
-                comparators.cmp_season(),
-                comparators.cmp_start_time(),
-                comparators.cmp_event_group(),
-            ],
+        match = self.matcher(
+            "match_equal",
+            self.test_operation_equal_comparators,
+            kwargs.get("test_operation_equal_search"),
         )
 
-        if all(
-            [
-                # compare by using 'all' the funcs in find_id_search
-                func(self, event)
-                for func in test_operation_equal_search
-            ]
-        ):
+        if match(event):
             return True
         return False
 
@@ -200,32 +230,26 @@ class LookupEvent(Lookup, dict):
         if not self.valid_object_id(parent_id):
             return
 
-        events = Events(self.parent_id, peerplays_instance=self.peerplays)
+        events = self.find_id_candidates(
+            "event",
+            lambda: Events(parent_id, peerplays_instance=self.peerplays),
+            parent_id=parent_id,
+            custom="find_id_search" in kwargs,
+        )
 
-        find_id_search = kwargs.get(
-            "find_id_search",
-            [
-                comparators.cmp_name("en"),
-                comparators.cmp_start_time(),
-                comparators.cmp_event_group(),
-            ],
+        match = self.matcher(
+            "match_find", self.find_id_comparators, kwargs.get("find_id_search")
         )
 
         for event in events:
-            if all(
-                [
-                    # compare by using 'all' the funcs in find_id_search
-                    func(self, event)
-                    for func in find_id_search
-                ]
-            ):
+            if match(event):
                 return event["id"]
 
     def is_synced(self):
         """ Test if data on chain matches lookup
         """
         if "id" in self and self["id"]:
-            event = Event(self["id"])
+            event = self.chain_object(Event)
             if self.test_operation_equal(event):
                 return True
         return False
@@ -233,6 +257,11 @@ class LookupEvent(Lookup, dict):
     def propose_new(self):
         """ Propose operation to create this object
         """
+        if Lookup.chain_state is not None:
+            Lookup.chain_state.expect(
+                "event",
+                expiration=getattr(Lookup.proposal_buffer, "proposal_expiration", None),
+            )
         return self.peerplays.event_create(
             self.names,
             self.season,
@@ -262,8 +291,12 @@ class LookupEvent(Lookup, dict):
         """
         from .participant import LookupParticipants
 
-        name = self.eventgroup["participants"]
-        return LookupParticipants(self["sport_identifier"], name)
+        return self.cached(
+            "participants",
+            lambda: LookupParticipants(
+                self["sport_identifier"], self.eventgroup["participants"]
+            ),
+        )
 
     def lookup_bettingmarketgroups(self):
         """ Return content of betting market groups
@@ -282,10 +315,13 @@ class LookupEvent(Lookup, dict):
     def names(self):
         """ Properly format names for internal use
         """
-        teams = self["teams"]
-        scheme = self.eventscheme.get("name", {})
-        items = substitution(teams, scheme)
-        return [[k, v] for k, v in items.items()]
+
+        def names():
+            scheme = self.eventscheme.get("name", {})
+            items = substitution(self["teams"], scheme)
+            return [[k, v] for k, v in items.items()]
+
+        return self.cached("names", names)
 
     @property
     def season(self):
@@ -297,7 +333,7 @@ class LookupEvent(Lookup, dict):
     def eventscheme(self):
         """ Obtain Event scheme from event group
         """
-        return self.eventgroup["eventscheme"]
+        return self.cached("eventscheme", lambda: self.eventgroup["eventscheme"])
 
     @property
     def bettingmarketgroups(self):
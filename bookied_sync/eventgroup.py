@@ -17,69 +17,58 @@ class LookupEventGroup(Lookup, dict):
     operation_update = "event_group_update"
     operation_create = "event_group_create"
 
+    #: Comparators of ``test_operation_equal()`` and ``find_id()`` (see
+    #: :class:`bookied_sync.comparators.Comparators`)
+    test_operation_equal_comparators = comparators.Comparators(
+        comparators.cmp_required_keys(["sport_id", "new_name"], ["sport_id", "name"]),
+        comparators.cmp_all_name(),
+        comparators.cmp_sport(),
+    )
+    find_id_comparators = comparators.Comparators(
+        comparators.cmp_name("identifier"), comparators.cmp_sport()
+    )
+
+    #: Attributes of the fingerprint (see ``Lookup.fingerprint()``)
+    fingerprint_keys = ("name",)
+
     def __init__(self, sport, eventgroup):
         from .sport import LookupSport
 
         self.identifier = eventgroup
 
         if isinstance(sport, LookupSport):
+            # Reuse the instance instead of loading the sport again
+            self.sport = sport
             sport = sport.get("identifier")
+        else:
+            self.sport = LookupSport(sport)
 
         self.sport_name = sport
-        self.sport = LookupSport(sport)
         self.parent = self.sport
         self.eventgroup = eventgroup
         super(LookupEventGroup, self).__init__()
 
-        if eventgroup.lower() in self.data["sports"][sport]["eventgroups"]:
-            dict.__init__(self, self.data["sports"][sport]["eventgroups"][eventgroup])
-        else:
-            found = False
-            for name, evg in self.data["sports"][sport]["eventgroups"].items():
-                if (
-                    # Name
-                    name.lower() == eventgroup.lower()
-                    or
-                    # Identifier
-                    evg.get("identifier", "").lower() == eventgroup.lower()
-                    or
-                    # List of languages
-                    eventgroup.lower()
-                    in [x.lower() for x in evg.get("name", {}).values()]
-                    or
-                    # List of aliases
-                    eventgroup.lower() in [x.lower() for x in evg.get("aliases", [])]
-                ):
-                    found = True
-                    dict.__init__(self, evg)
-
-            if not found:
-                raise ObjectNotFoundInLookup(
-                    "Eventgroup {} not available in sport {}".format(eventgroup, sport)
-                )
+        # Resolve key, identifier, names and aliases through the index
+        index = self.data["sports_index"]
+        sport_key = index.find_sport(sport)
+        key = index.find_eventgroup(sport_key, eventgroup)
+        if key is None:
+            raise ObjectNotFoundInLookup(
+                "Eventgroup {} not available in sport {}".format(eventgroup, sport)
+            )
+        dict.__init__(self, self.data["sports"][sport_key]["eventgroups"][key])
 
     def test_operation_equal(self, eventgroup, **kwargs):
         """ This method checks if an object or operation on the blockchain
             has the same content as an object in the  lookup
         """
-        test_operation_equal_search = kwargs.get(
-            "test_operation_equal_search",
-            [
-                comparators.cmp_required_keys(
-                    ["sport_id", "new_name"], ["sport_id", "name"]
-                ),
-                comparators.cmp_all_name(),
-                comparators.cmp_sport(),
-            ],
+        match = self.matcher(
+            "match_equal",
+            self.test_operation_equal_comparators,
+            kwargs.get("test_operation_equal_search"),
         )
 
-        if all(
-            [
-                # compare by using 'all' the funcs in find_id_search
-                func(self, eventgroup)
-                for func in test_operation_equal_search
-            ]
-        ):
+        if match(eventgroup):
             return True
         return False
 
@@ -96,28 +85,26 @@ class LookupEventGroup(Lookup, dict):
         if not self.valid_object_id(parent_id):
             return
 
-        egs = EventGroups(self.parent_id, peerplays_instance=self.peerplays)
+        egs = self.find_id_candidates(
+            "eventgroup",
+            lambda: EventGroups(parent_id, peerplays_instance=self.peerplays),
+            parent_id=parent_id,
+            custom="find_id_search" in kwargs,
+        )
 
-        find_id_search = kwargs.get(
-            "find_id_search",
-            [comparators.cmp_name("identifier"), comparators.cmp_sport()],
+        match = self.matcher(
+            "match_find", self.find_id_comparators, kwargs.get("find_id_search")
         )
 
         for eg in egs:
-            if all(
-                [
-                    # compare by using 'all' the funcs in find_id_search
-                    func(self, eg)
-                    for func in find_id_search
-                ]
-            ):
+            if match(eg):
                 return eg["id"]
 
     def is_synced(self):
         """ Test if data on chain matches lookup
         """
         if "id" in self and self["id"]:
-            eventgroup = EventGroup(self["id"])
+            eventgroup = self.chain_object(EventGroup)
             if self.test_operation_equal(eventgroup):
                 return True
         return False
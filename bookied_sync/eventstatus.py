@@ -56,7 +56,7 @@ class LookupEventStatus(Lookup, dict):
     def is_synced(self):
         """ Test if data on chain matches lookup
         """
-        event = Event(self["event"]["id"])
+        event = Event(self["event"]["id"], blockchain_instance=self.blockchain)
         if event["status"] == self["status"]:
             return True
 
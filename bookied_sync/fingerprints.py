@@ -0,0 +1,93 @@
+from peerplaysbase.objects import Operation
+from peerplaysbase.operationids import getOperationNameForId
+from .utils import canonical, canonical_of, canonicalize
+
+#: Description keys that are matched fuzzily (dynamic handicaps and
+#: over/under values) and hence not part of a fingerprint
+WILDCARDS = ("_hch", "_hca", "_ou")
+
+
+def strip_wildcards(form):
+    """ Remove the wildcard pairs from a canonical form
+    """
+    return tuple(x for x in form if x[0] not in WILDCARDS)
+
+
+def fingerprint(data, keys):
+    """ Return the fingerprint of an operation (or object on chain)
+
+        The fingerprint consists of the canonical forms (see
+        :func:`bookied_sync.utils.canonical`) of the double lists ``keys``
+        (e.g. ``name`` and ``description``), without wildcard values.
+        Status, start time and parent ids are not part of it, since the
+        comparators do not compare them if they are unset or refer to a
+        proposal.
+
+        :param dict data: Payload of the operation
+        :param tuple keys: Attributes to take into account
+    """
+    return tuple(strip_wildcards(canonical_of(data, key)[0]) for key in keys)
+
+
+def lookup_fingerprint(lookup, keys):
+    """ Return the fingerprint of the operation that ``lookup`` would
+        propose (comparable with ``fingerprint()``)
+    """
+    return tuple(strip_wildcards(canonical(getattr(lookup, key))) for key in keys)
+
+
+class BufferIndex(object):
+    """ Index of the operations in a proposal buffer by operation name and
+        fingerprint
+
+        The index is extended by the operations appended to the buffer
+        since the last call, and rebuilt if the buffer has been replaced or
+        truncated.
+    """
+
+    def __init__(self):
+        self._buffer = None
+        self._raw = list()
+        self._operations = list()
+        self._index = dict()
+
+    def _sync(self, buffer):
+        ops = buffer.ops
+        n = len(self._raw)
+        if (
+            buffer is not self._buffer
+            or len(ops) < n
+            or (n and ops[n - 1] is not self._raw[n - 1])
+        ):
+            self._buffer = buffer
+            self._raw = list()
+            self._operations = list()
+            self._index = dict()
+        for oid in range(len(self._raw), len(ops)):
+            op = Operation(ops[oid]).json()
+            op[1] = canonicalize(op[1])
+            entry = (op, "0.0.0", "0.0.%d" % oid)
+            self._raw.append(ops[oid])
+            self._operations.append(entry)
+            name = getOperationNameForId(op[0])
+            for (_name, keys), index in self._index.items():
+                if _name == name:
+                    index.setdefault(fingerprint(op[1], keys), []).append(entry)
+
+    def get(self, buffer, name, keys, fp):
+        """ Return the buffered ``(operation, pid, oid)`` of type ``name``
+            whose fingerprint (over ``keys``) is ``fp``
+
+            :param buffer: Proposal buffer
+            :param str name: Operation name, e.g. ``event_create``
+            :param tuple keys: Attributes of the fingerprint
+            :param tuple fp: Fingerprint
+        """
+        self._sync(buffer)
+        if (name, keys) not in self._index:
+            index = dict()
+            for entry in self._operations:
+                if getOperationNameForId(entry[0][0]) == name:
+                    index.setdefault(fingerprint(entry[0][1], keys), []).append(entry)
+            self._index[(name, keys)] = index
+        return self._index[(name, keys)].get(fp, [])
@@ -0,0 +1,114 @@
+class LookupIndex(object):
+    """ Case-insensitive index over the sports and event groups provided
+        by bookiesports
+
+        The index is built once when the lookup data is (re-)loaded and
+        maps the key, the identifier, every internationalized name and
+        every alias of a sport (or event group) to the key under which
+        the object is stored in ``Lookup.data["sports"]``.
+
+        The event groups of a sport as well as the names and aliases of
+        the participants of each list of participants are indexed on first
+        use. For lazily loaded sports (see
+        :class:`bookied_sync.lazysports.LazyBookieSports`), only the sport
+        headers are read to build the index.
+
+        :param dict sports: The sports as loaded by ``BookieSports``
+
+        .. note:: If multiple objects share a search term, the last one
+                  in the lookup wins (same behavior as a linear scan that
+                  does not stop at the first match).
+    """
+
+    def __init__(self, sports):
+        self._data = sports
+        self._sports = dict()
+        self._eventgroups = dict()
+        self._participants = dict()
+
+        headers = sports.headers() if hasattr(sports, "headers") else sports.items()
+        for sport_key, sport in headers:
+            for term in self.terms(sport_key, sport):
+                self._sports[term] = sport_key
+
+        # Exact keys take precedence over any other search term
+        self._sports.update({k: k for k in sports})
+
+    def _load_eventgroups(self, sport):
+        """ Build (and cache) the event group index of a sport
+        """
+        if sport not in self._eventgroups:
+            eventgroups = dict()
+            if sport in self._data:
+                evgs = self._data[sport].get("eventgroups", {})
+                for evg_key, evg in evgs.items():
+                    for term in self.terms(evg_key, evg):
+                        eventgroups[term] = evg_key
+
+                # Exact keys take precedence over any other search term
+                eventgroups.update({k: k for k in evgs})
+            self._eventgroups[sport] = eventgroups
+        return self._eventgroups[sport]
+
+    @staticmethod
+    def terms(key, obj):
+        """ Return all lower-cased search terms for an object in the lookup
+        """
+        terms = [key, obj.get("identifier") or ""]
+        terms.extend(obj.get("name", {}).values())
+        terms.extend(obj.get("aliases", None) or [])
+        return set(str(x).lower() for x in terms if x)
+
+    def find_sport(self, sport):
+        """ Return the key of a sport from its key, identifier, name or
+            alias (case-insensitive)
+
+            :param str sport: Search term
+        """
+        return self._sports.get(sport, self._sports.get(str(sport).lower()))
+
+    def find_eventgroup(self, sport, eventgroup):
+        """ Return the key of an event group within a sport from its key,
+            identifier, name or alias (case-insensitive)
+
+            :param str sport: Key of the sport (see ``find_sport``)
+            :param str eventgroup: Search term
+        """
+        eventgroups = self._load_eventgroups(sport)
+        return eventgroups.get(eventgroup, eventgroups.get(str(eventgroup).lower()))
+
+    def _load_participants(self, sport, list_identifier):
+        """ Build (and cache) the participant map of a list of participants
+        """
+        key = (sport, list_identifier)
+        if key not in self._participants:
+            teams = dict()
+            participants = self._data[sport]["participants"].get(list_identifier, {})
+            for team in participants.get("participants", []):
+                names = list(team.get("name", {}).values())
+                names.extend(team.get("aliases", None) or [])
+                for name in names:
+                    # First team in the list wins
+                    teams.setdefault(str(name).lower(), team)
+            self._participants[key] = (frozenset(teams), teams)
+        return self._participants[key]
+
+    def participant_names(self, sport, list_identifier):
+        """ Return a frozenset of all lower-cased names and aliases of the
+            participants in a list
+
+            :param str sport: Key of the sport
+            :param str list_identifier: Identifier of the participants list
+        """
+        return self._load_participants(sport, list_identifier)[0]
+
+    def find_participant(self, sport, list_identifier, name):
+        """ Return the participant (team) that carries ``name`` as name or
+            alias (case-insensitive)
+
+            :param str sport: Key of the sport
+            :param str list_identifier: Identifier of the participants list
+            :param str name: Name or alias of the participant
+        """
+        teams = self._load_participants(sport, list_identifier)[1]
+        return teams.get(str(name).lower())
@@ -0,0 +1,45 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from peerplays.instance import shared_blockchain_instance
+
+#: Blockchain instance of the current context (thread or asyncio task),
+#: see ``scoped_blockchain_instance()``
+_scoped = ContextVar("bookied_sync_blockchain_instance", default=None)
+
+
+def scoped_blockchain_instance():
+    """ Return the blockchain instance that has been set for the current
+        context (or ``None``)
+    """
+    return _scoped.get()
+
+
+def current_blockchain_instance():
+    """ Return the blockchain instance of the current context or, if none
+        has been set, the shared instance
+    """
+    instance = _scoped.get()
+    if instance is None:
+        return shared_blockchain_instance()
+    return instance
+
+
+@contextmanager
+def use_blockchain_instance(instance):
+    """ Use ``instance`` for all lookups (and the caches that do not carry
+        an instance of their own) within the current context only
+
+        Other threads and asyncio tasks keep using their instances.
+
+        .. code-block:: python
+
+            with use_blockchain_instance(instance):
+                event.update()
+
+        :param peerplays.PeerPlays instance: Blockchain instance
+    """
+    token = _scoped.set(instance)
+    try:
+        yield instance
+    finally:
+        _scoped.reset(token)
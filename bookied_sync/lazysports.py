@@ -0,0 +1,97 @@
+import os
+import jsonschema
+import bookiesports
+from glob import glob
+from bookiesports import BookieSports
+from bookiesports.exceptions import SportsNotFoundError
+from . import log
+
+
+class LazyBookieSports(dict):
+    """ Lazy variant of ``BookieSports``
+
+        Only the index of the network and the ``index.yaml`` of each sport
+        are read on instantiation. The full sport (including its event
+        groups, rules, participants and betting market groups) is loaded
+        and validated on first access, e.g. through
+        :class:`bookied_sync.sport.LookupSport`,
+        :class:`bookied_sync.eventgroup.LookupEventGroup`,
+        :class:`bookied_sync.rule.LookupRule` or
+        :class:`bookied_sync.participant.LookupParticipants`.
+
+        :param str network: Network/chain name
+        :param str sports_folder: Base folder of the sports (optional)
+    """
+
+    def __init__(self, network=None, sports_folder=None):
+        self.chain = (network or BookieSports.DEFAULT_CHAIN).lower()
+        self.folder = os.path.join(
+            sports_folder or BookieSports.BASE_FOLDER, self.chain
+        )
+        if not os.path.isdir(self.folder):
+            raise SportsNotFoundError(
+                "No bookiesports, found in {}".format(self.folder)
+            )
+
+        # We reuse the (validating) loader of bookiesports
+        self._loader = BookieSports.__new__(BookieSports)
+        self._loader._cwd = os.path.dirname(os.path.realpath(bookiesports.__file__))
+        if not getattr(BookieSports, "schema", None):
+            BookieSports.schema = self._loader._loadschema()
+
+        self.index = self._loader._loadyaml(os.path.join(self.folder, "index.yaml"))
+        jsonschema.validate(self.index, BookieSports.schema["network"])
+
+        self._headers = dict()
+        for sport_dir in sorted(glob(os.path.join(self.folder, "*"))):
+            if os.path.isdir(sport_dir):
+                dict.__setitem__(self, os.path.basename(sport_dir), None)
+
+    @property
+    def chain_id(self):
+        return self.index["chain_id"]
+
+    def is_loaded(self, sport):
+        """ Has the sport been materialized already?
+        """
+        return dict.get(self, sport) is not None
+
+    def headers(self):
+        """ Return the content of ``index.yaml`` of every sport without
+            loading event groups, rules and participants
+        """
+        for name in self:
+            if self.is_loaded(name):
+                yield name, dict.__getitem__(self, name)
+            else:
+                if name not in self._headers:
+                    self._headers[name] = self._loader._loadyaml(
+                        os.path.join(self.folder, name, "index.yaml")
+                    )
+                yield name, self._headers[name]
+
+    def _materialize(self, name):
+        log.debug("Loading sport {} from {}".format(name, self.folder))
+        sport = self._loader._loadSport(os.path.join(self.folder, name))
+        # Run bookiesports' consistency tests for this sport only
+        BookieSports._tests({name: sport})
+        dict.__setitem__(self, name, sport)
+        self._headers.pop(name, None)
+        return sport
+
+    def __getitem__(self, name):
+        sport = dict.__getitem__(self, name)
+        if sport is None:
+            sport = self._materialize(name)
+        return sport
+
+    def get(self, name, default=None):
+        if name in self:
+            return self[name]
+        return default
+
+    def values(self):
+        return [self[name] for name in self]
+
+    def items(self):
+        return [(name, self[name]) for name in self]
@@ -1,14 +1,25 @@
 import os
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from peerplays.instance import BlockchainInstance
 from peerplays.account import Account
 from peerplays.proposal import Proposal, Proposals
 from peerplays.witness import Witnesses
+from peerplays.utils import parse_time
+from peerplaysbase.objects import Operation
 from peerplaysapi.exceptions import OperationInProposalExistsException
 from .exceptions import ObjectNotFoundError, CannotCreateWithParentInProposal
 from .update import UpdateTransaction
-from bookiesports import BookieSports
+from .index import LookupIndex
+from .snapshot import load_bookiesports
+from .pending import PendingOperations, WitnessCache
+from .chunks import chunk_operations
+from .approvals import ApprovalMap, ApprovalBatch
+from .fingerprints import BufferIndex, lookup_fingerprint
+from .instance import scoped_blockchain_instance
+from .comparators import Comparators
 from . import log
 
 
@@ -38,16 +49,83 @@ class Lookup(dict, BlockchainInstance):
     #: Singelton to store data and prevent rereading if Lookup is
     #: instantiated multiple times
     data = dict()
-    approval_map = {}
+    approval_map = ApprovalMap()
 
     direct_buffer = None
     proposal_buffer = None
     sports_folder = None
 
+    #: Folder to store compiled snapshots of bookiesports in (optional, see
+    #: :func:`bookied_sync.snapshot.load_bookiesports`)
+    snapshot_folder = None
+
+    #: Load sports, event groups, rules and participants on first access
+    #: (see :class:`bookied_sync.lazysports.LazyBookieSports`)
+    lazy = False
+
+    #: Active :class:`bookied_sync.context.SyncContext` (if any)
+    context = None
+
+    #: Index of the objects on chain used by ``find_id()`` (optional, see
+    #: :class:`bookied_sync.chainstate.ChainState`)
+    chain_state = None
+
+    #: Cache of the pending proposals shared by all lookups (optional, see
+    #: :class:`bookied_sync.pending.PendingOperationsCache`)
+    pending_cache = None
+
+    #: Cache of the (active) witnesses used to filter pending proposals
+    #: (optional, see :class:`bookied_sync.pending.WitnessCache`)
+    witness_cache = None
+
+    #: Number of threads used by ``is_bookiesports_in_sync()`` and
+    #: ``sync_bookiesports()`` to check objects concurrently
+    sync_workers = 1
+
+    #: Split the proposal buffer into proposals of at most this many
+    #: operations on broadcast (optional, see ``proposal_chunks()``)
+    proposal_max_operations = None
+
+    #: Split the proposal buffer into proposals whose operations serialize
+    #: to at most this many bytes on broadcast (optional)
+    proposal_max_bytes = None
+
+    #: Executor that runs the broadcasts of ``broadcast_async()`` (created
+    #: with ``broadcast_workers`` threads on first use)
+    broadcast_executor = None
+    broadcast_workers = 4
+
+    #: Minimal number of seconds between two evictions of expired
+    #: proposals from the approval map (if the pending proposals are not
+    #: cached, see ``pending_cache``)
+    approval_expiration_interval = 3
+    _approvals_expired_at = None
+
+    #: Queue of proposals to approve on broadcast instead of one by one
+    #: (optional, see :class:`bookied_sync.approvals.ApprovalBatch`)
+    approval_batch = None
+
+    #: Call counters and timers of the comparators (optional, see
+    #: :class:`bookied_sync.comparators.ComparatorStats`)
+    comparator_stats = None
+
+    #: Attributes (double lists) that ``test_operation_equal()`` compares in
+    #: full, they make up the fingerprint of the proposed operations (see
+    #: ``fingerprint()``). Without, pending and buffered operations are
+    #: scanned.
+    fingerprint_keys = ()
+
+    #: Index of the proposal buffer by fingerprint
+    _buffer_index = BufferIndex()
+
     _approving_account = None
     _proposing_account = None
     _network_name = None
 
+    #: Cached parent objects and derived values (see ``cached()``) by the
+    #: keys that, when changed, invalidate them
+    invalidating_keys = {}
+
     def __init__(
         self,
         sports_folder=None,
@@ -61,30 +139,27 @@ class Lookup(dict, BlockchainInstance):
         """
         kwargs.pop("proposer", None)  # Do not forward proposer
         kwargs.pop("approver", None)  # Do not forward approver
+        self._pop_options(kwargs)
+
+        # With an active sync context, child nodes do not need to set up
+        # instance, accounts, buffers and data again
+        if Lookup.context is not None and not (
+            sports_folder
+            or network
+            or proposing_account
+            or approving_account
+            or args
+            or kwargs
+        ):
+            self._init_from_context(Lookup.context)
+            return
+
         BlockchainInstance.__init__(self, *args, **kwargs)
 
         # self._cwd = os.path.dirname(os.path.realpath(__file__))
         self._cwd = os.getcwd()
 
-        if not self.proposing_account and proposing_account:
-            self.proposing_account = proposing_account
-        elif self.proposing_account:
-            pass
-        elif "default_account" in self.blockchain.config:
-            proposing_account = self.blockchain.config["default_account"]
-        else:  # pragma: no cover
-            log.error("No proposing account known")
-            raise Exception("No proposing account known!")
-
-        if not self.approving_account and approving_account:
-            self.approving_account = approving_account
-        elif self.approving_account:
-            pass
-        elif "default_account" in self.blockchain.config:
-            approving_account = self.blockchain.config["default_account"]
-        else:  # pragma: no cover
-            log.error("No approving account known")
-            raise Exception("No approving account known!")
+        self._init_accounts(proposing_account, approving_account)
 
         # We define two transaction buffers
         if not Lookup.direct_buffer:
@@ -99,12 +174,16 @@ class Lookup(dict, BlockchainInstance):
             or (network and Lookup._network_name != network)
         ):
             # Load sports
-            self._bookiesports = BookieSports(
-                network=network, sports_folder=sports_folder
+            self._bookiesports = load_bookiesports(
+                network=network,
+                sports_folder=sports_folder,
+                snapshot_folder=Lookup.snapshot_folder,
+                lazy=Lookup.lazy,
             )
             Lookup.sports_folder = sports_folder
             Lookup._network_name = network
             self.data["sports"] = self._bookiesports
+            self.data["sports_index"] = LookupIndex(self._bookiesports)
 
             # Ensure that the node is on the right network
             sports_chain_id = self._bookiesports.chain_id
@@ -156,18 +235,23 @@ class Lookup(dict, BlockchainInstance):
     @staticmethod
     def _clear():
         # Lookup.data = dict()
-        Lookup.approval_map = {}
+        Lookup.context = None
+        Lookup.approval_map = ApprovalMap()
         Lookup.direct_buffer = None
         Lookup.proposal_buffer = None
 
     def clear(self):
         self.peerplays.clear()
+        if Lookup.pending_cache is not None:
+            Lookup.pending_cache.refresh()
         self.clear_proposal_buffer()
         self.clear_direct_buffer()
         self.clear_approval_map()
+        if Lookup.approval_batch is not None:
+            Lookup.approval_batch.clear()
 
     def clear_approval_map(self):
-        Lookup.approval_map = {}
+        Lookup.approval_map = ApprovalMap()
 
     def clear_proposal_buffer(self, expiration=6 * 60 * 60):
         Lookup.proposal_buffer_tx = self.peerplays.new_tx()
@@ -198,9 +282,9 @@ class Lookup(dict, BlockchainInstance):
             ):
                 log.info(str(Lookup.proposal_buffer))
 
-        for tx in [
-            Lookup.direct_buffer.broadcast(),
-            Lookup.proposal_buffer.broadcast(),
+        approvals = self.approval_buffers()
+        for tx in [Lookup.direct_buffer.broadcast()] + [
+            buffer.broadcast() for buffer in approvals + self.proposal_chunks()
         ]:
             if tx and dict(tx) and tx.get("operations", []):
                 txs.append(UpdateTransaction(tx))
@@ -209,6 +293,94 @@ class Lookup(dict, BlockchainInstance):
         self.clear_direct_buffer()
         return txs
 
+    def broadcast_async(self):
+        """ Non-blocking variant of ``broadcast()``
+
+            The current buffers are handed over to background threads (see
+            ``Lookup.broadcast_executor``) and replaced by fresh buffers
+            right away, so that the next batch of updates can be built
+            while the previous one is broadcast. In blocking mode (see
+            ``set_blocking()``), the threads wait until the transactions
+            are included in a block.
+
+            :returns: List of ``concurrent.futures.Future``, one per
+                transaction, each resolving to an
+                :class:`bookied_sync.update.UpdateTransaction` (or ``None``
+                if nothing was broadcast)
+        """
+        buffers = (
+            [Lookup.direct_buffer] + self.approval_buffers() + self.proposal_chunks()
+        )
+        self.clear_proposal_buffer()
+        self.clear_direct_buffer()
+
+        if Lookup.broadcast_executor is None:
+            Lookup.broadcast_executor = ThreadPoolExecutor(
+                max_workers=self.broadcast_workers
+            )
+        futures = list()
+        for buffer in buffers:
+            if buffer is None or buffer.is_empty():
+                continue
+            log.info("Broadcasting in background: {}".format(str(buffer)))
+            futures.append(
+                Lookup.broadcast_executor.submit(self._broadcast_buffer, buffer)
+            )
+        return futures
+
+    @staticmethod
+    def _broadcast_buffer(buffer):
+        tx = buffer.broadcast()
+        if tx and dict(tx) and tx.get("operations", []):
+            return UpdateTransaction(tx)
+
+    def approval_buffers(self):
+        """ Approve the proposals queued in ``Lookup.approval_batch``
+
+            The approvals are appended to the direct buffer or, if the
+            batch limits its transactions, returned as separate buffers.
+
+            :returns: List of additional transaction buffers
+        """
+        if Lookup.approval_batch is None or not len(Lookup.approval_batch):
+            return []
+        return Lookup.approval_batch.flush(Lookup.direct_buffer)
+
+    def proposal_chunks(self):
+        """ Split the proposal buffer into proposals that do not exceed
+            ``Lookup.proposal_max_operations`` operations and
+            ``Lookup.proposal_max_bytes`` bytes
+
+            Operations that refer to each other through relative ids
+            (``0.0.x``) are kept in the same proposal (see
+            :func:`bookied_sync.chunks.chunk_operations`). Without limits
+            or if the buffer fits, the proposal buffer is returned as is.
+
+            :returns: List of proposal buffers
+        """
+        buffer = Lookup.proposal_buffer
+        if not (self.proposal_max_operations or self.proposal_max_bytes):
+            return [buffer]
+        chunks = chunk_operations(
+            [op.json() for op in buffer.list_operations()],
+            max_operations=self.proposal_max_operations,
+            max_bytes=self.proposal_max_bytes,
+        )
+        if len(chunks) < 2:
+            return [buffer]
+        log.info("Splitting proposal into {} proposals".format(len(chunks)))
+        proposals = list()
+        for chunk in chunks:
+            proposal = self.peerplays.new_proposal(
+                self.peerplays.new_tx(),
+                proposer=buffer.proposer,
+                proposal_expiration=buffer.proposal_expiration,
+                proposal_review=buffer.proposal_review,
+            )
+            proposal.appendOps([Operation(op).op for op in chunk])
+            proposals.append(proposal)
+        return proposals
+
     def proposal_transactions(self):  # pragma: no cover
         return Lookup.proposal_buffer.parent.json()
 
@@ -394,28 +566,104 @@ class Lookup(dict, BlockchainInstance):
         require_active_witness=True,
         **kwargs
     ):
-        pending_proposals = Proposals(account)
-        witnesses = Witnesses(only_active=require_active_witness)
-        props = list()
+        pending_cache = Lookup.pending_cache
+        if pending_cache is not None:
+            # Expired approvals are evicted with the head time the cache has
+            # fetched anyway
+            props = pending_cache.get(
+                (account, require_witness, require_active_witness),
+                lambda: self._load_pending_operations(
+                    account,
+                    require_witness,
+                    require_active_witness,
+                    now=pending_cache.head_time,
+                ),
+            )
+        else:
+            props = self._load_pending_operations(
+                account, require_witness, require_active_witness
+            )
+
+        for prop in props:
+            Lookup.approval_map.register(
+                prop["proposal"]["id"],
+                [oid for _, _, oid in prop["data"]],
+                expiration=prop["proposal"].get("expiration_time"),
+                source=account,
+                proposal=prop["proposal"],
+            )
+        return props
+
+    def _load_pending_operations(
+        self, account, require_witness, require_active_witness, now=None
+    ):
+        pending_proposals = None
+        if Lookup.chain_state is not None:
+            pending_proposals = Lookup.chain_state.pending_proposals(account)
+        if pending_proposals is None:
+            pending_proposals = Proposals(account, blockchain_instance=self.blockchain)
+        if not require_witness:
+            witnesses = None
+        elif Lookup.witness_cache is not None:
+            witnesses = Lookup.witness_cache.get(require_active_witness)
+        else:
+            witnesses = WitnessCache.witness_ids(
+                Witnesses(
+                    only_active=require_active_witness,
+                    blockchain_instance=self.blockchain,
+                )
+            )
+        props = PendingOperations()
         for proposal in pending_proposals:
             # Do not inspect proposals that have not been proposed by a witness
-            if require_witness and proposal.proposer not in witnesses:
+            # (compare ids only, ``proposal.proposer`` would fetch the account)
+            if witnesses is not None and proposal.get("proposer") not in witnesses:
                 log.info(
                     "Skipping proposal {} as it has been proposed by a non-witness '{}'".format(
-                        proposal["id"], Account(proposal.proposer)["name"]
+                        proposal["id"], proposal.get("proposer")
                     )
                 )
                 continue
             ret = []
-            if not proposal["id"] in Lookup.approval_map:
-                Lookup.approval_map[proposal["id"]] = {}
             for oid, operations in enumerate(proposal.proposed_operations):
-                if oid not in Lookup.approval_map[proposal["id"]]:
-                    Lookup.approval_map[proposal["id"]][oid] = False
                 ret.append((operations, proposal["id"], oid))
             props.append(dict(proposal=proposal, data=ret))
+        self._evict_approvals(account, pending_proposals, now=now)
         return props
 
+    def _evict_approvals(self, account, pending_proposals, now=None):
+        """ Drop proposals from the approval map that are no longer pending
+            (executed or deleted) or that have expired
+
+            :param datetime.datetime now: Current chain time. If not
+                provided, it is fetched at most every
+                ``approval_expiration_interval`` seconds.
+        """
+        approval_map = Lookup.approval_map
+        if not approval_map:
+            return
+        evicted = approval_map.retain(
+            [x["id"] for x in pending_proposals], source=account
+        )
+        if now is None and self._approvals_expiration_due():
+            dgp = self.blockchain.rpc.get_dynamic_global_properties()
+            now = parse_time(dgp["time"])
+        if now is not None:
+            evicted += approval_map.expire(now)
+        if evicted:
+            log.debug(
+                "Approval Map: evicted {}, size {}".format(evicted, approval_map.size)
+            )
+
+    @staticmethod
+    def _approvals_expiration_due():
+        last = Lookup._approvals_expired_at
+        current = time.monotonic()
+        if last is not None and current - last < Lookup.approval_expiration_interval:
+            return False
+        Lookup._approvals_expired_at = current
+        return True
+
     def get_buffered_operations(self):
         # Obtain the proposals that we have in our buffer
         # from peerplaysbase.operationids import getOperationNameForId
@@ -436,7 +684,13 @@ class Lookup(dict, BlockchainInstance):
             Internally, a proposal is approved partially using a map that
             contains the approval of each operation in a proposal. Once all
             operations of a proposal are approved, the whole proopsal is
-            approved.
+            approved. The map counts the unapproved operations per proposal
+            (see :class:`bookied_sync.approvals.ApprovalMap`), hence, only
+            the proposal that has just become complete is inspected.
+
+            If ``Lookup.approval_batch`` is set, the proposal is queued and
+            approved together with the other queued proposals on broadcast
+            (see :class:`bookied_sync.approvals.ApprovalBatch`).
 
             :param str pid: Proposal id
             :param int oid: Operation number within the proposal
@@ -446,51 +700,48 @@ class Lookup(dict, BlockchainInstance):
             return
         assert self.approving_account, "No approving_account defined!"
 
-        Lookup.approval_map[pid][oid] = True
-
-        def pretty_proposal_map():
-            ret = dict()
-            for k, v in Lookup.approval_map.items():
-                ret[k] = "{:.1f}".format(sum(v.values()) / len(v) * 100)
-            return ret
+        approval_map = Lookup.approval_map
+        if not approval_map.approve(pid, oid):
+            log.info("Approval Map: {} {:.1f}%".format(pid, approval_map.progress(pid)))
+            return
 
-        log.info("Approval Map: {}".format(pretty_proposal_map()))
+        # All operations of the proposal have been approved just now
+        if Lookup.approval_batch is not None:
+            log.info("Queueing approval of proposal {}".format(pid))
+            Lookup.approval_batch.add(
+                pid, self.approving_account, proposal=approval_map.proposal(pid)
+            )
+            del Lookup.approval_map[pid]
+            return
 
-        approved_read_for_delete = []
-        for p in Lookup.approval_map:
-            if all(Lookup.approval_map[p].values()):
-                proposal = Proposal(p)
-                account = Account(self.approving_account)
-                if account["id"] not in proposal["available_active_approvals"]:
-                    log.info("Approving proposal {} by {}".format(p, account["name"]))
-                    approved_read_for_delete.append(p)
-                    try:
-                        log.debug(
-                            self.peerplays.approveproposal(
-                                p,
-                                account=self.approving_account,
-                                append_to=Lookup.direct_buffer,
-                            )
-                        )
-                    except Exception as e:
-                        log.debug(
-                            "Exception when approving proposal: {}".format(str(e))
-                        )
-                        # Not raising as at this point, the only reason for
-                        # this to fail is (probably) for the proposal to be
-                        # approved already - in the meantime.
-                        pass
-                else:
-                    log.info(
-                        "Proposal {} has already been approved by {}".format(
-                            p, account["name"]
-                        )
+        proposal = Proposal(pid, blockchain_instance=self.blockchain)
+        account = Account(self.approving_account, blockchain_instance=self.blockchain)
+        if account["id"] not in proposal["available_active_approvals"]:
+            log.info("Approving proposal {} by {}".format(pid, account["name"]))
+            try:
+                log.debug(
+                    self.peerplays.approveproposal(
+                        pid,
+                        account=self.approving_account,
+                        append_to=Lookup.direct_buffer,
                     )
-
-        # In order not to approve the same proposal again and again, we remove
-        # it from the map
-        for p in approved_read_for_delete:
-            del Lookup.approval_map[p]
+                )
+            except Exception as e:
+                log.debug("Exception when approving proposal: {}".format(str(e)))
+                # Not raising as at this point, the only reason for
+                # this to fail is (probably) for the proposal to be
+                # approved already - in the meantime.
+                pass
+
+            # In order not to approve the same proposal again and again, we
+            # remove it from the map
+            del Lookup.approval_map[pid]
+        else:
+            log.info(
+                "Proposal {} has already been approved by {}".format(
+                    pid, account["name"]
+                )
+            )
 
     def has_pending_new(self, **kwargs):
         """ This call tests if a proposal that would create this object is
@@ -504,19 +755,13 @@ class Lookup(dict, BlockchainInstance):
             and is needed for fuzzy matching (e.g. for dynamic markets)
         """
         log.debug("Looking for {}".format(self))
-        from peerplaysbase.operationids import getOperationNameForId
-
-        pending_proposals = self.get_pending_operations(**kwargs)
-        for proposalObject in pending_proposals:
-            proposal = proposalObject["proposal"]
-            for op, pid, oid in proposalObject["data"]:
-                if getOperationNameForId(op[0]) == self.operation_create:
-                    log.debug(
-                        "Testing pending proposal {}-{}".format(proposal["id"], oid)
-                    )
-                    kwargs["proposal"] = proposal
-                    if self.test_operation_equal(op[1], **kwargs):
-                        yield dict(pid=pid, oid=oid, proposal=proposal)
+        for op, pid, oid, proposal in self._pending_candidates(
+            self.operation_create, **kwargs
+        ):
+            log.debug("Testing pending proposal {}-{}".format(proposal["id"], oid))
+            kwargs["proposal"] = proposal
+            if self.test_operation_equal(op[1], **kwargs):
+                yield dict(pid=pid, oid=oid, proposal=proposal)
 
     def has_buffered_new(self, **kwargs):
         """ This call tests if an operation is buffered for proposal
@@ -528,12 +773,9 @@ class Lookup(dict, BlockchainInstance):
             allows us to define the 'comparing'-lambda from the outside
             and is needed for fuzzy matching (e.g. for dynamic markets)
         """
-        from peerplaysbase.operationids import getOperationNameForId
-
-        for op, pid, oid in self.get_buffered_operations():
-            if getOperationNameForId(op[0]) == self.operation_create:
-                if self.test_operation_equal(op[1], **kwargs):
-                    return pid, oid
+        for op, pid, oid in self._buffered_candidates(self.operation_create, **kwargs):
+            if self.test_operation_equal(op[1], **kwargs):
+                return pid, oid
 
     def has_pending_update(self, **kwargs):
         """ Test if there is an update on-chain to properly match blockchain
@@ -546,14 +788,11 @@ class Lookup(dict, BlockchainInstance):
             allows us to define the 'comparing'-lambda from the outside
             and is needed for fuzzy matching (e.g. for dynamic markets)
         """
-        from peerplaysbase.operationids import getOperationNameForId
-
-        for proposalObject in self.get_pending_operations(**kwargs):
-            proposal = proposalObject["proposal"]
-            for op, pid, oid in proposalObject["data"]:
-                if getOperationNameForId(op[0]) == self.operation_update:
-                    if self.test_operation_equal(op[1], proposal=proposal, **kwargs):
-                        yield dict(pid=pid, oid=oid, proposal=proposal)
+        for op, pid, oid, proposal in self._pending_candidates(
+            self.operation_update, **kwargs
+        ):
+            if self.test_operation_equal(op[1], proposal=proposal, **kwargs):
+                yield dict(pid=pid, oid=oid, proposal=proposal)
 
     def has_buffered_update(self, **kwargs):
         """ Test if there is an update buffered locally to properly match
@@ -566,12 +805,53 @@ class Lookup(dict, BlockchainInstance):
             allows us to define the 'comparing'-lambda from the outside
             and is needed for fuzzy matching (e.g. for dynamic markets)
         """
+        for op, pid, oid in self._buffered_candidates(self.operation_update, **kwargs):
+            if self.test_operation_equal(op[1], **kwargs):
+                return pid, oid
+
+    def fingerprint(self):
+        """ Return the fingerprint of the operations that ``propose_new()``
+            and ``propose_update()`` emit (see
+            :mod:`bookied_sync.fingerprints`)
+
+            The fingerprint is cached until the lookup is changed or
+            invalidated.
+        """
+        return self.cached(
+            "match_fingerprint",
+            lambda: lookup_fingerprint(self, self.fingerprint_keys),
+        )
+
+    def _fingerprinted(self, kwargs):
+        # Custom comparators may match fuzzily on any attribute
+        return bool(self.fingerprint_keys) and not (
+            "test_operation_equal_search" in kwargs
+        )
+
+    def _pending_candidates(self, name, **kwargs):
+        """ Pending operations of type ``name`` that may match this lookup
+        """
+        pending_proposals = self.get_pending_operations(**kwargs)
+        if not self._fingerprinted(kwargs):
+            return pending_proposals.operations(name)
+        return pending_proposals.fingerprinted(
+            name, self.fingerprint_keys, self.fingerprint()
+        )
+
+    def _buffered_candidates(self, name, **kwargs):
+        """ Buffered operations of type ``name`` that may match this lookup
+        """
         from peerplaysbase.operationids import getOperationNameForId
 
-        for op, pid, oid in self.get_buffered_operations():
-            if getOperationNameForId(op[0]) == self.operation_update:
-                if self.test_operation_equal(op[1], **kwargs):
-                    return pid, oid
+        if not self._fingerprinted(kwargs):
+            return [
+                x
+                for x in self.get_buffered_operations()
+                if getOperationNameForId(x[0][0]) == name
+            ]
+        return Lookup._buffer_index.get(
+            Lookup.proposal_buffer, name, self.fingerprint_keys, self.fingerprint()
+        )
 
     @property
     def id(self):
@@ -627,63 +907,236 @@ class Lookup(dict, BlockchainInstance):
         )
         return found
 
-    def is_bookiesports_in_sync(self):  # pragma: no cover
-        """ Test if bookiesports is in sync
+    def bookiesports_objects(self):
+        """ Yield ``(kind, lookup)`` for all sports, event groups and rules
+            in the order they are synced
         """
-        in_sync = True
         for sport in self.list_sports():
-            if not sport.is_synced():
-                log.warning(
-                    "Not in sync: Sport {} ({})".format(
-                        sport["identifier"], sport["id"]
-                    )
-                )
-                in_sync = False
+            yield "sport", sport
 
             # Go through all event groups of the sport
             for e in sport.eventgroups:
-                if not e.is_synced():
-                    log.warning(
-                        "Not in sync: Event Group {} ({})".format(
-                            e["identifier"], e["id"]
-                        )
-                    )
-                    in_sync = False
+                yield "eventgroup", e
 
             # Go through all the rules linked in the sport
             for r in sport.rules:
-                if not r.is_synced():
-                    log.warning(
-                        "Not in sync: Rule {} ({})".format(r["identifier"], r["id"])
+                yield "rule", r
+
+    def check_bookiesports_objects(self, workers=None):
+        """ Yield ``(kind, lookup, is_synced)`` for all objects returned by
+            ``bookiesports_objects()``
+
+            With more than one worker, ``is_synced()`` is evaluated for all
+            objects concurrently before the first result is returned.
+            Results are still returned in the original order.
+
+            :param int workers: Number of threads (defaults to
+                ``Lookup.sync_workers``)
+        """
+        workers = workers or self.sync_workers
+        if workers <= 1:
+            for kind, obj in self.bookiesports_objects():
+                yield kind, obj, obj.is_synced()
+            return
+
+        objects = list(self.bookiesports_objects())
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            synced = list(executor.map(lambda x: x[1].is_synced(), objects))
+        for (kind, obj), is_synced in zip(objects, synced):
+            yield kind, obj, is_synced
+
+    def is_bookiesports_in_sync(self, workers=None):  # pragma: no cover
+        """ Test if bookiesports is in sync
+
+            :param int workers: Number of threads used to check objects
+                concurrently (defaults to ``Lookup.sync_workers``)
+        """
+        labels = dict(sport="Sport", eventgroup="Event Group", rule="Rule")
+        in_sync = True
+        for kind, obj, is_synced in self.check_bookiesports_objects(workers):
+            if not is_synced:
+                log.warning(
+                    "Not in sync: {} {} ({})".format(
+                        labels[kind], obj["identifier"], obj["id"]
                     )
-                    in_sync = False
+                )
+                in_sync = False
 
         return in_sync
 
-    def sync_bookiesports(self):  # pragma: no cover
+    def sync_bookiesports(self, workers=None):  # pragma: no cover
         """ Sync eventgroups and sports according to bookiesports/lookup
+
+            The checks can run concurrently (see
+            ``check_bookiesports_objects()``), but updates are applied one
+            after another in the original order so that the proposal and
+            direct buffers are filled deterministically.
+
+            :param int workers: Number of threads used to check objects
+                concurrently (defaults to ``Lookup.sync_workers``)
         """
-        # Go through all sports
-        for sport in self.list_sports():
+        for kind, obj, is_synced in self.check_bookiesports_objects(workers):
+            if not is_synced:
+                log.warning("Updating {} {}".format(kind, obj["identifier"]))
+                obj.update()
+        return self
 
-            if not sport.is_synced():
-                log.warning("Updating sport {}".format(sport["identifier"]))
-                sport.update()
+    # Caching of parent chain and derived values ############################
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        stale = [x for x, keys in self.invalidating_keys.items() if key in keys]
+        if stale:
+            self.invalidate(*stale)
+        # The bound comparators have prepared the values of this lookup
+        self.invalidate_matchers()
 
-            # Go through all event groups of the sport
-            for e in sport.eventgroups:
+    @staticmethod
+    def _pop_options(kwargs):
+        """ Take the class-wide options (``snapshot_folder``, ``lazy``) from
+            the keyword arguments
+        """
+        if "snapshot_folder" in kwargs:
+            Lookup.snapshot_folder = kwargs.pop("snapshot_folder")
+        if "lazy" in kwargs:
+            Lookup.lazy = kwargs.pop("lazy")
 
-                if not e.is_synced():
-                    log.warning("Updating eventgroup {}".format(e["identifier"]))
-                    e.update()
+    def _init_accounts(self, proposing_account=None, approving_account=None):
+        """ Set the proposing and approving accounts
+        """
+        if not self.proposing_account and proposing_account:
+            self.proposing_account = proposing_account
+        elif self.proposing_account:
+            pass
+        elif "default_account" in self.blockchain.config:
+            proposing_account = self.blockchain.config["default_account"]
+        else:  # pragma: no cover
+            log.error("No proposing account known")
+            raise Exception("No proposing account known!")
 
-            # Go through all the rules linked in the sport
-            for r in sport.rules:
+        if not self.approving_account and approving_account:
+            self.approving_account = approving_account
+        elif self.approving_account:
+            pass
+        elif "default_account" in self.blockchain.config:
+            approving_account = self.blockchain.config["default_account"]
+        else:  # pragma: no cover
+            log.error("No approving account known")
+            raise Exception("No approving account known!")
 
-                if not r.is_synced():
-                    log.warning("Updating rule {}".format(r["identifier"]))
-                    r.update()
-        return self
+    @property
+    def blockchain(self):
+        """ Blockchain instance of this lookup, unless another instance is in
+            use in the current context (see
+            :func:`bookied_sync.instance.use_blockchain_instance`)
+        """
+        instance = scoped_blockchain_instance()
+        if instance is not None:
+            return instance
+        return BlockchainInstance.blockchain.fget(self)
+
+    def _init_from_context(self, context):
+        """ Initialize this instance from an active sync context (see
+            :class:`bookied_sync.context.SyncContext`)
+        """
+        self._blockchain = context.blockchain
+        self._cwd = context.cwd
+        self._retriggered = False
+        self._retriggered_kwargs = dict()
+
+    def cached(self, key, factory):
+        """ Return the cached value for ``key`` or obtain it from
+            ``factory()`` and cache it for this instance
+
+            :param str key: Name of the cached value
+            :param callable factory: Method that returns the value
+        """
+        cache = self.__dict__.setdefault("_cache", dict())
+        if key not in cache:
+            cache[key] = factory()
+        return cache[key]
+
+    def invalidate(self, *keys):
+        """ Clear the cached values ``keys`` (or all cached parent objects
+            and derived values) of this instance
+        """
+        if not keys:
+            self.__dict__["_cache"] = dict()
+            return
+        cache = self.__dict__.get("_cache", dict())
+        for key in keys:
+            cache.pop(key, None)
+
+    def invalidate_matchers(self):
+        """ Clear the cached matchers (see ``matcher()``) and the
+            fingerprint of this instance
+        """
+        cache = self.__dict__.get("_cache")
+        if cache:
+            for key in [x for x in cache if x.startswith("match_")]:
+                del cache[key]
+
+    def matcher(self, key, comparators, search=None):
+        """ Return the test ``match(ist)`` of ``comparators`` bound to this
+            lookup
+
+            The default comparators are bound once per instance and cached
+            as ``key`` (e.g. ``match_equal``) until the lookup is changed
+            or invalidated. A custom list ``search`` is compiled and bound
+            on every call.
+
+            :param str key: Name of the cached matcher (``match_*``)
+            :param bookied_sync.comparators.Comparators comparators: Default
+                comparators
+            :param list search: Custom comparators (optional)
+        """
+        if search is not None:
+            return Comparators.compile(search).bind(self)
+        stats = self.comparator_stats
+        bound = self.cached(
+            key, lambda: (stats, Comparators.compile(comparators).bind(self))
+        )
+        if bound[0] is not stats:
+            # Statistics have been switched since the matcher was bound
+            self.invalidate_matchers()
+            return self.matcher(key, comparators)
+        return bound[1]
+
+    def find_id_candidates(self, kind, objects, parent_id=None, custom=False):
+        """ Return the objects on chain that ``find_id()`` needs to compare
+            with
+
+            If a chain state index is available (see ``Lookup.chain_state``)
+            and the default comparators are used, only those objects are
+            returned that match the indexed attribute of this lookup.
+            Otherwise, ``objects()`` is called to obtain all objects.
+
+            :param str kind: Kind of object (see
+                :class:`bookied_sync.chainstate.ChainState`)
+            :param callable objects: Returns all objects to compare with
+            :param str parent_id: Id of the parent object (if required)
+            :param bool custom: Custom comparators are used
+        """
+        if Lookup.chain_state is None or custom:
+            return objects()
+        key = Lookup.chain_state.lookup_key(kind, self)
+        if key is None:
+            return Lookup.chain_state.objects(kind, parent_id)
+        return Lookup.chain_state.find(kind, key, parent_id)
+
+    def chain_object(self, cls):
+        """ Return the object on chain that carries the id of this lookup
+
+            If ``Lookup.chain_state`` indexes the object, it is taken from
+            there. Otherwise, it is fetched as ``cls(self["id"])``.
+
+            :param class cls: Class of the object (e.g.
+                ``peerplays.sport.Sport``)
+        """
+        if Lookup.chain_state is not None:
+            obj = Lookup.chain_state.get(self["id"])
+            if obj is not None:
+                return obj
+        return cls(self["id"], blockchain_instance=self.blockchain)
 
     def valid_object_id(self, id, fetch=None):
         """ This method returns True or False depending on whether a object id
@@ -699,7 +1152,7 @@ class Lookup(dict, BlockchainInstance):
         test = id and id[0] == "1" and id[:4] != "1.10"
         if test and fetch:
             try:
-                fetch(id)
+                fetch(id, blockchain_instance=self.blockchain)
             except Exception:
                 return False
         return test
@@ -13,6 +13,8 @@ class LookupParticipants(Lookup, dict):
 
     def __init__(self, sport, list_identifier):
         self.identifier = "{}/{}".format(sport, list_identifier)
+        self.sport = sport
+        self.list_identifier = list_identifier
         super(LookupParticipants, self).__init__()
         assert sport in self.data["sports"], "Sport {} not avaialble".format(sport)
 
@@ -25,10 +27,21 @@ class LookupParticipants(Lookup, dict):
         """ See if we can find a particular participant in the list of
             participants (self)
         """
-        parties = self.get("participants")
-        for team in parties:
-            if name.lower() in [
-                x.lower() for x in team.get("name", {}).values()
-            ] or name.lower() in [x.lower() for x in team.get("aliases", [])]:
-                return True
-        return False
+        return name.lower() in self.participant_names
+
+    @property
+    def participant_names(self):
+        """ Frozenset of all (lower-cased) names and aliases of the
+            participants in this list
+        """
+        return self.data["sports_index"].participant_names(
+            self.sport, self.list_identifier
+        )
+
+    def get_participant(self, name):
+        """ Obtain the canonical participant (team) from its name or
+            alias
+        """
+        return self.data["sports_index"].find_participant(
+            self.sport, self.list_identifier, name
+        )
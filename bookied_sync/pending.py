@@ -0,0 +1,224 @@
+import time
+from peerplays.utils import parse_time
+from peerplays.witness import Witnesses
+from peerplaysbase.operationids import getOperationNameForId
+from .fingerprints import fingerprint
+from .utils import canonicalize
+from .dynamic import DynamicIndex
+from .instance import current_blockchain_instance
+from . import log
+
+
+class PendingOperations(list):
+    """ List of pending proposals as returned by
+        :meth:`bookied_sync.lookup.Lookup.get_pending_operations`
+
+        Each element is a dictionary with the ``proposal`` and its ``data``,
+        a list of ``(operation, proposal_id, operation_index)`` tuples.
+        Additionally, the operations are indexed by operation type on first
+        use (see ``operations()``) and by fingerprint (see
+        ``fingerprinted()``). The canonical forms of their names and
+        descriptions are computed once, when they are indexed.
+    """
+
+    _by_type = None
+    _by_fingerprint = None
+    _dynamic = None
+
+    def operations(self, name):
+        """ Return all pending operations of a type
+
+            :param str name: Operation name, e.g. ``event_create``
+            :returns: List of ``(operation, proposal_id, operation_index,
+                proposal)`` tuples in the order of the proposals
+        """
+        if self._by_type is None:
+            by_type = dict()
+            for prop in self:
+                for op, pid, oid in prop["data"]:
+                    op = [op[0], canonicalize(op[1])]
+                    by_type.setdefault(getOperationNameForId(op[0]), []).append(
+                        (op, pid, oid, prop["proposal"])
+                    )
+            self._by_type = by_type
+        return self._by_type.get(name, [])
+
+    def fingerprinted(self, name, keys, fp):
+        """ Return the pending operations of a type whose fingerprint is
+            ``fp`` (see :mod:`bookied_sync.fingerprints`)
+
+            The operations are indexed by fingerprint on first use (per
+            type and keys).
+
+            :param str name: Operation name, e.g. ``event_create``
+            :param tuple keys: Attributes of the fingerprint
+            :param tuple fp: Fingerprint
+            :returns: List of ``(operation, proposal_id, operation_index,
+                proposal)`` tuples in the order of the proposals
+        """
+        if self._by_fingerprint is None:
+            self._by_fingerprint = dict()
+        if (name, keys) not in self._by_fingerprint:
+            index = dict()
+            for entry in self.operations(name):
+                index.setdefault(fingerprint(entry[0][1], keys), []).append(entry)
+            self._by_fingerprint[(name, keys)] = index
+        return self._by_fingerprint[(name, keys)].get(fp, [])
+
+    def dynamic(self, name):
+        """ Return the pending dynamic betting market groups of operation
+            type ``name`` as :class:`bookied_sync.dynamic.DynamicIndex`
+            (built on first use)
+        """
+        if self._dynamic is None:
+            self._dynamic = dict()
+        if name not in self._dynamic:
+            self._dynamic[name] = DynamicIndex(
+                self.operations(name), key=lambda x: x[0][1]
+            )
+        return self._dynamic[name]
+
+
+class PendingOperationsCache(object):
+    """ Block-scoped cache of the pending proposals on chain
+
+        :meth:`bookied_sync.lookup.Lookup.get_pending_operations` fetches
+        the proposals of the witness account, filters them by proposer and
+        parses their operations. If ``Lookup.pending_cache`` carries an
+        instance of this class, the parsed result is shared by all lookup
+        objects until the head block changes (or ``refresh()`` is called).
+        Hence, also the operation type index of
+        :class:`bookied_sync.pending.PendingOperations` is built only once
+        per refresh.
+
+        :param peerplays.PeerPlays blockchain_instance: Blockchain instance
+        :param bool check_head_block: Invalidate the cache when the head
+            block changes. If ``False``, the cache is only invalidated by
+            ``refresh()``.
+    """
+
+    def __init__(self, blockchain_instance=None, check_head_block=True):
+        self.blockchain = blockchain_instance
+        self.check_head_block = check_head_block
+        self.hits = 0
+        self.misses = 0
+        self._block = None
+        self._cache = dict()
+        #: Time of the head block as of the last check (``datetime``)
+        self.head_time = None
+
+    @property
+    def peerplays(self):
+        return self.blockchain or current_blockchain_instance()
+
+    def head_block_number(self):
+        """ Return the current head block number (and remember its time)
+        """
+        dgp = self.peerplays.rpc.get_dynamic_global_properties()
+        self.head_time = parse_time(dgp["time"])
+        return dgp["head_block_number"]
+
+    def get(self, key, load):
+        """ Return the cached pending operations for ``key`` or call
+            ``load()`` to obtain (and cache) them
+
+            :param tuple key: Account and proposer filter
+            :param callable load: Loads the pending operations from chain
+        """
+        if self.check_head_block:
+            block = self.head_block_number()
+            if block != self._block:
+                log.debug("New head block {}, dropping pending operations".format(block))
+                self._cache = dict()
+                self._block = block
+
+        if key in self._cache:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._cache[key] = load()
+        return self._cache[key]
+
+    def refresh(self):
+        """ Drop all cached pending operations
+        """
+        self._cache = dict()
+        self._block = None
+        self.head_time = None
+
+    def stats(self):
+        """ Return hit and miss counters
+        """
+        return dict(hits=self.hits, misses=self.misses)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+
+class WitnessCache(object):
+    """ Cache of the ids of the (active) witnesses used to filter pending
+        proposals by their proposer
+
+        The set of witnesses only changes at the maintenance interval. Hence,
+        the ids are kept until the next maintenance (as announced by the
+        dynamic global properties) or, if ``ttl`` is provided, for ``ttl``
+        seconds. Membership checks are set lookups. The cache is used if
+        ``Lookup.witness_cache`` carries an instance of this class.
+
+        :param peerplays.PeerPlays blockchain_instance: Blockchain instance
+        :param float ttl: Seconds to keep the witnesses (optional)
+    """
+
+    def __init__(self, blockchain_instance=None, ttl=None):
+        self.blockchain = blockchain_instance
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._cache = dict()
+
+    @property
+    def peerplays(self):
+        return self.blockchain or current_blockchain_instance()
+
+    @staticmethod
+    def witness_ids(witnesses):
+        """ Return the witness ids and witness account ids of ``witnesses``
+            as frozenset
+        """
+        return frozenset(x["id"] for x in witnesses) | frozenset(
+            x["witness_account"] for x in witnesses
+        )
+
+    def _expiration(self):
+        if self.ttl is not None:
+            return time.monotonic() + self.ttl
+        dgp = self.peerplays.rpc.get_dynamic_global_properties()
+        remaining = parse_time(dgp["next_maintenance_time"]) - parse_time(dgp["time"])
+        return time.monotonic() + max(remaining.total_seconds(), 0)
+
+    def get(self, only_active=True):
+        """ Return the ids of the (active) witnesses and their accounts
+
+            :param bool only_active: Only consider active witnesses
+        """
+        expiration, ids = self._cache.get(only_active, (None, None))
+        if expiration is not None and time.monotonic() < expiration:
+            self.hits += 1
+            return ids
+        self.misses += 1
+        ids = self.witness_ids(
+            Witnesses(only_active=only_active, blockchain_instance=self.peerplays)
+        )
+        self._cache[only_active] = (self._expiration(), ids)
+        return ids
+
+    def refresh(self):
+        """ Drop the cached witnesses
+        """
+        self._cache = dict()
+
+    def stats(self):
+        """ Return hit and miss counters
+        """
+        return dict(hits=self.hits, misses=self.misses)
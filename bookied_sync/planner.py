@@ -0,0 +1,316 @@
+from copy import deepcopy
+from datetime import datetime
+from peerplays.utils import formatTime
+from .lookup import Lookup
+from .chainstate import ChainState
+from .pending import PendingOperationsCache
+from .sport import LookupSport
+from .eventgroup import LookupEventGroup
+from .event import LookupEvent
+from .bettingmarketgroup import LookupBettingMarketGroup
+from .bettingmarket import LookupBettingMarket
+from .rule import LookupRule
+from .exceptions import ObjectNotFoundError
+from .utils import dList2Dict
+from . import log
+
+
+class Plan(list):
+    """ Result of :meth:`Planner.plan`
+
+        Each element is a dictionary that describes one node of the lookup
+        tree (in the order ``update()`` would process them):
+
+        * ``kind``: Kind of object (see
+          :class:`bookied_sync.chainstate.ChainState`)
+        * ``identifier``: Identifier of the lookup
+        * ``id``: Id of the object on chain (if it exists)
+        * ``parent``: Index of the parent node in this plan (or ``None``)
+        * ``action``: One of ``Plan.actions``
+        * ``approvals``: List of ``dict(pid=..., oid=...)`` of pending
+          proposals that would be approved
+        * ``changes``: Attributes that differ between chain and lookup as
+          ``{attribute: dict(chain=..., lookup=...)}``
+        * ``lookup``: The lookup object
+    """
+
+    #: Possible actions per node
+    actions = ("create", "update", "approve", "none")
+
+    def by_action(self, action):
+        """ Return all nodes with ``action``
+        """
+        return [x for x in self if x["action"] == action]
+
+    def summary(self):
+        """ Return the number of nodes per action
+        """
+        return {action: len(self.by_action(action)) for action in self.actions}
+
+    def diff(self):
+        """ Return the plan without the lookup objects and without the
+            nodes that are in sync
+        """
+        return [
+            {k: v for k, v in x.items() if k != "lookup"}
+            for x in self
+            if x["action"] != "none"
+        ]
+
+
+class Planner(object):
+    """ Dry-run of ``update()`` for an entire tree of lookup objects
+
+        The planner walks a lookup subtree (sport, event groups, rules,
+        events, betting market groups and betting markets) and computes
+        what ``update()`` would do for each node: create the object, update
+        it, approve pending proposals or nothing. Nothing is proposed,
+        approved or broadcast.
+
+        Objects are resolved through a
+        :class:`bookied_sync.chainstate.ChainState` which is bulk-loaded
+        once per kind and parent, and pending proposals are loaded once for
+        the whole plan. Hence, the plan does not cost RPC calls per node.
+
+        .. code-block:: python
+
+            planner = Planner()
+            plan = planner.plan(LookupSport("Basketball"), events=events)
+            print(plan.summary())
+            planner.apply(plan)
+
+        :param bookied_sync.chainstate.ChainState chain_state: Snapshot of
+            the chain (defaults to ``Lookup.chain_state`` or a new one)
+        :param bookied_sync.pending.PendingOperationsCache pending_cache:
+            Cache of the pending proposals (defaults to
+            ``Lookup.pending_cache`` or a new one that is only refreshed
+            by ``refresh()``)
+    """
+
+    #: Per lookup class: kind of object
+    kinds = [
+        (LookupSport, "sport"),
+        (LookupEventGroup, "eventgroup"),
+        (LookupEvent, "event"),
+        (LookupBettingMarketGroup, "bettingmarketgroup"),
+        (LookupBettingMarket, "bettingmarket"),
+        (LookupRule, "rule"),
+    ]
+
+    #: Per kind: Attributes on chain and the lookup attributes they are
+    #: compared with in ``changes``
+    attributes = {
+        "sport": {"name": "names"},
+        "eventgroup": {"name": "names", "sport_id": "parent_id"},
+        "event": {
+            "name": "names",
+            "season": "season",
+            "start_time": "start_time",
+            "event_group_id": "parent_id",
+        },
+        "bettingmarketgroup": {"description": "description", "event_id": "parent_id"},
+        "bettingmarket": {"description": "description", "group_id": "parent_id"},
+        "rule": {"name": "names", "description": "descriptions"},
+    }
+
+    def __init__(self, chain_state=None, pending_cache=None):
+        self.chain_state = chain_state or Lookup.chain_state or ChainState()
+        self.pending_cache = (
+            pending_cache
+            or Lookup.pending_cache
+            or PendingOperationsCache(check_head_block=False)
+        )
+
+    def refresh(self):
+        """ Reload the chain state and the pending proposals
+        """
+        self.chain_state.refresh()
+        self.pending_cache.refresh()
+
+    @classmethod
+    def kind(cls, lookup):
+        for klass, kind in cls.kinds:
+            if isinstance(lookup, klass):
+                return kind
+        raise ValueError("Unknown lookup {}".format(lookup.__class__.__name__))
+
+    def children(self, kind, lookup, events):
+        """ Return the child lookups of a node
+        """
+        if kind == "sport":
+            return list(lookup.eventgroups) + list(lookup.rules)
+        if kind == "eventgroup":
+            return [
+                x
+                for x in events
+                if x.eventgroup["identifier"] == lookup["identifier"]
+                and x.sport["identifier"] == lookup.sport["identifier"]
+            ]
+        if kind == "event":
+            return list(lookup.bettingmarketgroups)
+        if kind == "bettingmarketgroup":
+            return list(lookup.bettingmarkets)
+        return []
+
+    def _activate(self):
+        state = (Lookup.chain_state, Lookup.pending_cache, Lookup.approval_map)
+        Lookup.chain_state = self.chain_state
+        Lookup.pending_cache = self.pending_cache
+        Lookup.approval_map = deepcopy(Lookup.approval_map)
+        return state
+
+    @staticmethod
+    def _deactivate(state):
+        Lookup.chain_state, Lookup.pending_cache, Lookup.approval_map = state
+
+    def plan(self, *lookups, **kwargs):
+        """ Compute the plan for the lookups and their children
+
+            Neither the lookups nor the buffers and the approval map are
+            modified.
+
+            :param list lookups: Root lookup objects (e.g. a
+                ``LookupSport``)
+            :param list events: ``LookupEvent`` objects to plan as children
+                of the event groups (events are not part of bookiesports)
+            :param kwargs: Forwarded to ``find_id()``, ``has_pending_new()``
+                and ``has_pending_update()`` (e.g. ``require_witness``)
+        """
+        events = list(kwargs.pop("events", []))
+        plan = Plan()
+        state = self._activate()
+        try:
+            self._walk(plan, lookups, events, **kwargs)
+            # Events whose event group is not part of the tree
+            planned = set(id(x["lookup"]) for x in plan)
+            self._walk(
+                plan, [x for x in events if id(x) not in planned], events, **kwargs
+            )
+        finally:
+            self._deactivate(state)
+        return plan
+
+    def _walk(self, plan, lookups, events, **kwargs):
+        stack = [(x, None) for x in reversed(lookups)]
+        while stack:
+            lookup, parent = stack.pop()
+            kind = self.kind(lookup)
+            plan.append(self._plan_node(kind, lookup, parent, plan, **kwargs))
+            for child in reversed(self.children(kind, lookup, events)):
+                stack.append((child, len(plan) - 1))
+
+    def _plan_node(self, kind, lookup, parent, plan, **kwargs):
+        item = dict(
+            kind=kind,
+            identifier=lookup.identifier,
+            id=None,
+            parent=parent,
+            action="none",
+            approvals=[],
+            changes=dict(),
+            lookup=lookup,
+        )
+
+        # Children of objects that are yet to be created cannot exist
+        if parent is not None and plan[parent]["action"] == "create":
+            item["action"] = "create"
+            return item
+
+        object_id = lookup.get("id") or lookup.find_id(**kwargs)
+        if not object_id:
+            return self._plan_new(item, lookup, **kwargs)
+
+        item["id"] = object_id
+        obj = self._chain_object(kind, lookup, object_id)
+        if obj is None:
+            # Not indexed (e.g. an id that is set in bookiesports), fall back
+            # to fetching the object
+            log.debug("Object {} is not part of the chain state".format(object_id))
+            try:
+                if lookup.is_synced():
+                    return item
+            except Exception as e:
+                log.warning("Cannot fetch object {}: {}".format(object_id, str(e)))
+        elif lookup.test_operation_equal(obj):
+            return item
+        else:
+            item["changes"] = self.changes(kind, lookup, obj)
+
+        for pending in lookup.has_pending_update(**kwargs):
+            item["approvals"].append(dict(pid=pending["pid"], oid=pending["oid"]))
+        item["action"] = "approve" if item["approvals"] else "update"
+        return item
+
+    def _plan_new(self, item, lookup, **kwargs):
+        """ Plan an object that does not exist on chain: approve its pending
+            creation or create it
+        """
+        for pending in lookup.has_pending_new(**kwargs):
+            item["action"] = "approve"
+            item["approvals"].append(dict(pid=pending["pid"], oid=pending["oid"]))
+            if len(list(pending["proposal"].proposed_operations)) < 2:
+                break
+        if not item["approvals"]:
+            item["action"] = "create"
+        return item
+
+    def _chain_object(self, kind, lookup, object_id):
+        """ Return the object ``object_id`` from the chain state (loading
+            the objects of the parent if required) or ``None``
+        """
+        obj = self.chain_state.get(object_id)
+        if obj is None:
+            try:
+                parent_attr = ChainState.lists[kind][1]
+                self.chain_state.objects(
+                    kind, lookup.parent_id if parent_attr else None
+                )
+            except ObjectNotFoundError:
+                pass
+            obj = self.chain_state.get(object_id)
+        return obj
+
+    @staticmethod
+    def _normalize(value):
+        if isinstance(value, datetime):
+            return formatTime(value)
+        if isinstance(value, (list, tuple)) and all(
+            isinstance(x, (list, tuple)) and len(x) == 2 for x in value
+        ):
+            return dList2Dict(value)
+        return value
+
+    def changes(self, kind, lookup, obj):
+        """ Return the attributes of ``obj`` on chain that differ from the
+            lookup
+        """
+        changes = dict()
+        for attr, name in self.attributes[kind].items():
+            if hasattr(type(lookup), name):
+                value = getattr(lookup, name)
+            else:
+                value = lookup.get(name)
+            value = self._normalize(value)
+            chain = self._normalize(obj.get(attr))
+            if value != chain:
+                changes[attr] = dict(chain=chain, lookup=value)
+        return changes
+
+    def apply(self, plan, **kwargs):
+        """ Run ``update()`` on all nodes of the plan that are not in sync
+
+            The chain state and the pending proposals of the planner are
+            used, so this does not reload them per node.
+
+            :param Plan plan: Plan as returned by ``plan()``
+            :param kwargs: Forwarded to ``update()``
+        """
+        chain_state, pending_cache = Lookup.chain_state, Lookup.pending_cache
+        Lookup.chain_state = self.chain_state
+        Lookup.pending_cache = self.pending_cache
+        try:
+            for item in plan:
+                if item["action"] != "none":
+                    item["lookup"].update(**kwargs)
+        finally:
+            Lookup.chain_state, Lookup.pending_cache = chain_state, pending_cache
@@ -13,6 +13,20 @@ class LookupRule(Lookup, dict):
     operation_update = "betting_market_rules_update"
     operation_create = "betting_market_rules_create"
 
+    #: Comparators of ``test_operation_equal()`` and ``find_id()`` (see
+    #: :class:`bookied_sync.comparators.Comparators`)
+    test_operation_equal_comparators = comparators.Comparators(
+        comparators.cmp_required_keys(
+            ["new_description", "new_name"], ["description", "name"]
+        ),
+        comparators.cmp_all_description(),
+        comparators.cmp_all_name(),
+    )
+    find_id_comparators = comparators.Comparators(comparators.cmp_name("en"))
+
+    #: Attributes of the fingerprint (see ``Lookup.fingerprint()``)
+    fingerprint_keys = ("name", "description")
+
     def __init__(self, sport, rules):
         self.identifier = "{}/{}".format(sport, rules)
         Lookup.__init__(self)
@@ -27,24 +41,13 @@ class LookupRule(Lookup, dict):
         """ This method checks if an object or operation on the blockchain
             has the same content as an object in the  lookup
         """
-        test_operation_equal_search = kwargs.get(
-            "test_operation_equal_search",
-            [
-                comparators.cmp_required_keys(
-                    ["new_description", "new_name"], ["description", "name"]
-                ),
-                comparators.cmp_all_description(),
-                comparators.cmp_all_name(),
-            ],
+        match = self.matcher(
+            "match_equal",
+            self.test_operation_equal_comparators,
+            kwargs.get("test_operation_equal_search"),
         )
 
-        if all(
-            [
-                # compare by using 'all' the funcs in find_id_search
-                func(self, operation)
-                for func in test_operation_equal_search
-            ]
-        ):
+        if match(operation):
             return True
         return False
 
@@ -55,25 +58,23 @@ class LookupRule(Lookup, dict):
             .. note:: This only checks if a sport exists with the same name in
                        **ENGLISH**!
         """
-        rules = Rules(peerplays_instance=self.peerplays)
-        find_id_search = kwargs.get(
-            "test_operation_equal_search", [comparators.cmp_name("en")]
+        rules = self.find_id_candidates(
+            "rule",
+            lambda: Rules(peerplays_instance=self.peerplays),
+            custom="test_operation_equal_search" in kwargs,
+        )
+        match = self.matcher(
+            "match_find", self.find_id_comparators, kwargs.get("test_operation_equal_search")
         )
         for rule in rules:
-            if all(
-                [
-                    # compare by using 'all' the funcs in find_id_search
-                    func(self, rule)
-                    for func in find_id_search
-                ]
-            ):
+            if match(rule):
                 return rule["id"]
 
     def is_synced(self):
         """ Test if data on chain matches lookup
         """
         if "id" in self and self["id"]:
-            rule = Rule(self["id"])
+            rule = self.chain_object(Rule)
             if self.test_operation_equal(rule):
                 return True
         return False
@@ -0,0 +1,123 @@
+import os
+import glob
+import pickle
+import hashlib
+from bookiesports import BookieSports
+from .lazysports import LazyBookieSports
+from . import log
+
+#: Increase to invalidate all existing snapshots
+SNAPSHOT_VERSION = 1
+
+
+def sports_folder_path(network=None, sports_folder=None):
+    """ Return the folder that ``BookieSports`` loads for a network
+    """
+    base = sports_folder or BookieSports.BASE_FOLDER
+    chain = (network or BookieSports.DEFAULT_CHAIN).lower()
+    return os.path.join(base, chain)
+
+
+def folder_hash(folder):
+    """ Compute a hash over names and contents of all files in ``folder``
+        (recursively)
+    """
+    sha = hashlib.sha256()
+    sha.update("v{}".format(SNAPSHOT_VERSION).encode("utf-8"))
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            sha.update(os.path.relpath(path, folder).encode("utf-8"))
+            with open(path, "rb") as fid:
+                sha.update(hashlib.sha256(fid.read()).digest())
+    return sha.hexdigest()
+
+
+def folder_key(folder):
+    """ Return a short digest of the location of ``folder`` that tells the
+        snapshots of different sports folders apart
+    """
+    path = os.path.realpath(folder).encode("utf-8")
+    return hashlib.sha256(path).hexdigest()[:16]
+
+
+def snapshot_path(snapshot_folder, network, digest, key):
+    return os.path.join(
+        snapshot_folder, "bookiesports-{}-{}-{}.pickle".format(network, key, digest)
+    )
+
+
+def load_snapshot(path):
+    """ Load a snapshot, returns ``None`` if it cannot be loaded
+    """
+    try:
+        with open(path, "rb") as fid:
+            return pickle.load(fid)
+    except Exception as e:
+        log.warning("Cannot load bookiesports snapshot {}: {}".format(path, str(e)))
+
+
+def store_snapshot(path, sports):
+    """ Store a snapshot atomically and remove outdated snapshots of the
+        same network and sports folder
+    """
+    folder, filename = os.path.split(path)
+    os.makedirs(folder, exist_ok=True)
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp, "wb") as fid:
+        pickle.dump(sports, fid, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+    prefix = filename.rsplit("-", 1)[0]
+    for old in glob.glob(os.path.join(folder, "{}-*.pickle".format(prefix))):
+        if old != path:
+            os.remove(old)
+
+
+def load_bookiesports(
+    network=None, sports_folder=None, snapshot_folder=None, lazy=False
+):
+    """ Load the bookiesports data and use a compiled snapshot if possible
+
+        If ``snapshot_folder`` is provided, the parsed data is stored as
+        pickle in that folder, keyed by a hash over the content of the
+        sports folder. As long as no file in the sports folder changes,
+        the snapshot is reused instead of parsing and validating all YAML
+        files again. If any file changes, the snapshot is rebuilt.
+
+        :param str network: Network/chain name as used by ``BookieSports``
+        :param str sports_folder: Base folder of the sports (optional)
+        :param str snapshot_folder: Folder to store snapshots in (optional)
+        :param bool lazy: Load sports on first access (see
+            :class:`bookied_sync.lazysports.LazyBookieSports`). Snapshots
+            are not used in lazy mode.
+    """
+    if lazy:
+        return LazyBookieSports(network=network, sports_folder=sports_folder)
+
+    folder = sports_folder_path(network, sports_folder)
+    if not snapshot_folder or not os.path.isdir(folder):
+        return BookieSports(network=network, sports_folder=sports_folder)
+
+    path = snapshot_path(
+        snapshot_folder,
+        os.path.basename(folder),
+        folder_hash(folder),
+        folder_key(folder),
+    )
+    if os.path.isfile(path):
+        sports = load_snapshot(path)
+        if isinstance(sports, BookieSports):
+            log.debug("Loaded bookiesports snapshot {}".format(path))
+            return sports
+
+    log.info("Compiling bookiesports snapshot {}".format(path))
+    sports = BookieSports(
+        network=network, sports_folder=sports_folder, override_cache=True
+    )
+    try:
+        store_snapshot(path, sports)
+    except Exception as e:
+        log.warning("Cannot store bookiesports snapshot {}: {}".format(path, str(e)))
+    return sports
@@ -18,35 +18,26 @@ class LookupSport(Lookup, dict):
     operation_update = "sport_update"
     operation_create = "sport_create"
 
+    #: Comparators of ``test_operation_equal()`` and ``find_id()`` (see
+    #: :class:`bookied_sync.comparators.Comparators`)
+    test_operation_equal_comparators = comparators.Comparators(
+        comparators.cmp_required_keys(["new_name"], ["name"]),
+        comparators.cmp_all_name(),
+    )
+    find_id_comparators = comparators.Comparators(comparators.cmp_name("identifier"))
+
+    #: Attributes of the fingerprint (see ``Lookup.fingerprint()``)
+    fingerprint_keys = ("name",)
+
     def __init__(self, sport):
         self.identifier = sport
         super(LookupSport, self).__init__()
 
-        if sport in [x for x in self.data["sports"]]:
-            # Easy, the sports name is the key
-            dict.__init__(self, self.data["sports"][sport])
-        else:
-            found = False
-            # Load from identifier
-            for name, s in self.data["sports"].items():
-                if (
-                    # Name
-                    name.lower() == sport.lower()
-                    or
-                    # Identifier
-                    s.get("identifier", "").lower() == sport.lower()
-                    or
-                    # List of languages
-                    sport.lower() in [x.lower() for x in s.get("name", {}).values()]
-                    or
-                    # List of aliases
-                    sport.lower() in [x.lower() for x in s.get("aliases", [])]
-                ):
-                    found = True
-                    dict.__init__(self, s)
-
-            if not found:
-                raise ObjectNotFoundInLookup("Not Found: {}".format(sport))
+        # Resolve key, identifier, names and aliases through the index
+        key = self.data["sports_index"].find_sport(sport)
+        if key is None:
+            raise ObjectNotFoundInLookup("Not Found: {}".format(sport))
+        dict.__init__(self, self.data["sports"][key])
 
     @property
     def eventgroups(self):
@@ -75,21 +66,13 @@ class LookupSport(Lookup, dict):
         """ This method checks if an object or operation on the blockchain
             has the same content as an object in the  lookup
         """
-        test_operation_equal_search = kwargs.get(
-            "test_operation_equal_search",
-            [
-                comparators.cmp_required_keys(["new_name"], ["name"]),
-                comparators.cmp_all_name(),
-            ],
+        match = self.matcher(
+            "match_equal",
+            self.test_operation_equal_comparators,
+            kwargs.get("test_operation_equal_search"),
         )
 
-        if all(
-            [
-                # compare by using 'all' the funcs in find_id_search
-                func(self, sport)
-                for func in test_operation_equal_search
-            ]
-        ):
+        if match(sport):
             return True
         return False
 
@@ -100,25 +83,23 @@ class LookupSport(Lookup, dict):
             .. note:: This only checks if a sport exists with the same name in
                        **ENGLISH**!
         """
-        sports = Sports(peerplays_instance=self.peerplays)
-        find_id_search = kwargs.get(
-            "find_id_search", [comparators.cmp_name("identifier")]
+        sports = self.find_id_candidates(
+            "sport",
+            lambda: Sports(peerplays_instance=self.peerplays),
+            custom="find_id_search" in kwargs,
+        )
+        match = self.matcher(
+            "match_find", self.find_id_comparators, kwargs.get("find_id_search")
         )
         for sport in sports:
-            if all(
-                [
-                    # compare by using 'all' the funcs in find_id_search
-                    func(self, sport)
-                    for func in find_id_search
-                ]
-            ):
+            if match(sport):
                 return sport["id"]
 
     def is_synced(self):
         """ Test if data on chain matches lookup
         """
         if "id" in self and self["id"]:
-            sport = Sport(self["id"])
+            sport = self.chain_object(Sport)
             if self.test_operation_equal(sport):
                 return True
         return False
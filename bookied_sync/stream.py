@@ -0,0 +1,443 @@
+import json
+from peerplays.instance import shared_blockchain_instance
+from peerplays.blockchain import Blockchain
+from peerplays.sport import Sport
+from peerplays.eventgroup import EventGroup
+from peerplays.event import Event
+from peerplays.bettingmarketgroup import BettingMarketGroup
+from peerplays.bettingmarket import BettingMarket
+from peerplays.rule import Rule
+from peerplays.account import Account
+from peerplays.proposal import Proposal, Proposals
+from peerplays.utils import parse_time
+from peerplaysbase.operationids import getOperationNameForId
+from .lookup import Lookup
+from .chainstate import ChainState
+from . import log
+
+
+def read_blocks(path):
+    """ Yield the blocks of a recorded file (one JSON encoded block per
+        line, see ``record_blocks()``)
+    """
+    with open(path) as fid:
+        for line in fid:
+            if line.strip():
+                yield json.loads(line)
+
+
+def record_blocks(blocks, path):
+    """ Store blocks in a file that can be replayed with ``read_blocks()``
+    """
+    with open(path, "w") as fid:
+        for block in blocks:
+            fid.write(json.dumps(block, sort_keys=True) + "\n")
+
+
+def node_blocks(start=None, stop=None, blockchain_instance=None):
+    """ Yield the blocks of a node (or a local stand-in) from ``start``
+        (defaults to the head block) until ``stop`` (or forever)
+    """
+    blockchain = Blockchain(
+        blockchain_instance=blockchain_instance or shared_blockchain_instance()
+    )
+    return blockchain.blocks(start=start, stop=stop)
+
+
+class OperationStream(object):
+    """ Keep a :class:`bookied_sync.chainstate.ChainState` up to date by
+        applying the operations of new blocks to it
+
+        Creates and updates of sports, event groups, events, rules,
+        betting market groups and betting markets, event status updates and
+        resolves patch the objects in the index in place. Objects that are
+        not part of the index (because their parent has not been loaded
+        yet) are dropped from the object cache of peerplays (together with
+        the cached lists of their kind) instead, so that they are fetched
+        again when needed. Proposal creates, updates
+        and deletes patch the pending proposals of the chain state, which
+        are then used by ``has_pending_new()`` and ``has_pending_update()``.
+        Only proposals that require the approval of a tracked account (see
+        ``track_proposals()``) are maintained. New proposals are fetched
+        from chain to obtain their required approvals. Proposals are
+        dropped once they are approved, when they are deleted and at their
+        expiration time.
+
+        .. code-block:: python
+
+            chain_state = ChainState()
+            Lookup.chain_state = chain_state
+            stream = OperationStream(chain_state)
+            stream.track_proposals()
+            for block in node_blocks():
+                stream.apply_block(block)
+
+        .. note:: Operations that a proposal executes are not part of a
+            block. A stand-in or a recorded file can provide them as
+            regular operations of a transaction that names the executed
+            proposal in its ``proposal`` attribute (which drops the
+            proposal).
+
+        :param bookied_sync.chainstate.ChainState chain_state: Index to
+            maintain (defaults to ``Lookup.chain_state``)
+        :param bookied_sync.pending.PendingOperationsCache pending_cache:
+            Cache to refresh whenever the pending proposals change
+            (defaults to ``Lookup.pending_cache``)
+        :param peerplays.PeerPlays blockchain_instance: Blockchain instance
+    """
+
+    #: Per kind: Class of the objects on chain
+    classes = {
+        "sport": Sport,
+        "eventgroup": EventGroup,
+        "event": Event,
+        "bettingmarketgroup": BettingMarketGroup,
+        "bettingmarket": BettingMarket,
+        "rule": Rule,
+    }
+
+    #: Per create operation: Kind, attributes of the object (by operation
+    #: attribute) and defaults
+    creates = {
+        "sport_create": ("sport", {"name": "name"}, {}),
+        "event_group_create": (
+            "eventgroup",
+            {"name": "name", "sport_id": "sport_id"},
+            {},
+        ),
+        "event_create": (
+            "event",
+            {
+                "name": "name",
+                "season": "season",
+                "start_time": "start_time",
+                "event_group_id": "event_group_id",
+            },
+            {"status": "upcoming"},
+        ),
+        "betting_market_rules_create": (
+            "rule",
+            {"name": "name", "description": "description"},
+            {},
+        ),
+        "betting_market_group_create": (
+            "bettingmarketgroup",
+            {
+                "description": "description",
+                "event_id": "event_id",
+                "rules_id": "rules_id",
+                "asset_id": "asset_id",
+                "never_in_play": "never_in_play",
+                "delay_before_settling": "delay_before_settling",
+            },
+            {"status": "upcoming"},
+        ),
+        "betting_market_create": (
+            "bettingmarket",
+            {
+                "group_id": "group_id",
+                "description": "description",
+                "payout_condition": "payout_condition",
+            },
+            {"status": "unresolved"},
+        ),
+    }
+
+    #: Per update operation: Kind, attribute that carries the object id and
+    #: attributes of the object (by operation attribute)
+    updates = {
+        "sport_update": ("sport", "sport_id", {"new_name": "name"}),
+        "event_group_update": (
+            "eventgroup",
+            "event_group_id",
+            {"new_name": "name", "new_sport_id": "sport_id"},
+        ),
+        "event_update": (
+            "event",
+            "event_id",
+            {
+                "new_name": "name",
+                "new_season": "season",
+                "new_start_time": "start_time",
+                "new_event_group_id": "event_group_id",
+                "new_status": "status",
+            },
+        ),
+        "event_update_status": (
+            "event",
+            "event_id",
+            {"status": "status", "scores": "scores"},
+        ),
+        "betting_market_rules_update": (
+            "rule",
+            "betting_market_rules_id",
+            {"new_name": "name", "new_description": "description"},
+        ),
+        "betting_market_group_update": (
+            "bettingmarketgroup",
+            "betting_market_group_id",
+            {
+                "new_description": "description",
+                "new_rules_id": "rules_id",
+                "status": "status",
+            },
+        ),
+        "betting_market_update": (
+            "bettingmarket",
+            "betting_market_id",
+            {
+                "new_group_id": "group_id",
+                "new_description": "description",
+                "new_payout_condition": "payout_condition",
+            },
+        ),
+    }
+
+    #: Per delete operation: Attribute that carries the object id
+    deletes = {"sport_delete": "sport_id", "event_group_delete": "event_group_id"}
+
+    def __init__(self, chain_state=None, pending_cache=None, blockchain_instance=None):
+        self.chain_state = chain_state or Lookup.chain_state or ChainState()
+        self.pending_cache = pending_cache
+        self.blockchain = blockchain_instance
+        self.block_num = None
+        self.applied = 0
+
+    @property
+    def peerplays(self):
+        return self.blockchain or shared_blockchain_instance()
+
+    def track_proposals(self, account="witness-account"):
+        """ Load the pending proposals that require the approval of
+            ``account`` into the chain state and maintain them from now on
+        """
+        account = Account(account, blockchain_instance=self.peerplays)
+        self.chain_state.track_proposals(
+            account, Proposals(account["name"], blockchain_instance=self.peerplays)
+        )
+        self._proposals_changed()
+
+    def _proposals_changed(self):
+        pending_cache = self.pending_cache or Lookup.pending_cache
+        if pending_cache is not None:
+            pending_cache.refresh()
+
+    def run(self, blocks):
+        """ Apply all ``blocks`` (e.g. from ``read_blocks()`` or
+            ``node_blocks()``)
+        """
+        for block in blocks:
+            self.apply_block(block)
+        return self
+
+    def apply_block(self, block):
+        """ Apply the operations of all transactions in a block
+
+            :param dict block: Block as returned by the node, the
+                transactions need to carry their ``operation_results``
+        """
+        for tx in block.get("transactions", []):
+            results = tx.get("operation_results", [])
+            created = list()
+            for i, op in enumerate(tx.get("operations", [])):
+                result = results[i] if i < len(results) else None
+                created.append(self.apply_operation(op, result, created))
+            # Operations executed by a proposal (provided by a stand-in)
+            if tx.get("proposal"):
+                log.debug("Proposal {} has been executed".format(tx["proposal"]))
+                self.remove_proposal(tx["proposal"])
+        if block.get("timestamp"):
+            self.expire_proposals(block["timestamp"])
+        self.block_num = block.get("block_num", self.block_num)
+
+    @staticmethod
+    def _resolve(data, created):
+        """ Resolve relative ids (``0.0.x``) that refer to objects created
+            by earlier operations of the same transaction
+        """
+        ret = dict()
+        for key, value in data.items():
+            if isinstance(value, str) and value.startswith("0.0."):
+                index = int(value.split(".")[2])
+                if index < len(created) and created[index]:
+                    value = created[index]
+            ret[key] = value
+        return ret
+
+    def apply_operation(self, op, result=None, created=()):
+        """ Apply a single operation
+
+            :param list op: Operation as ``[operation_id, data]``
+            :param list result: Operation result as ``[type, object_id]``
+            :param list created: Ids created by earlier operations of the
+                same transaction
+            :returns: Id of the created object (if any)
+        """
+        name = getOperationNameForId(op[0])
+        data = self._resolve(op[1], created)
+        new_id = result[1] if result and isinstance(result[1], str) else None
+        self.applied += 1
+
+        if name in self.creates and new_id:
+            kind, attributes, defaults = self.creates[name]
+            obj = dict(defaults, id=new_id)
+            obj.update({v: data[k] for k, v in attributes.items() if k in data})
+            self.chain_state.add_new(kind, obj)
+            self.chain_state.received(kind)
+        elif name in self.updates:
+            kind, id_attr, attributes = self.updates[name]
+            # Unset optional attributes are omitted (or null), while empty
+            # or false values are actual changes
+            changes = {
+                v: data[k] for k, v in attributes.items() if data.get(k) is not None
+            }
+            self.update_object(kind, data[id_attr], changes)
+        elif name in self.deletes:
+            self.chain_state.remove(data[self.deletes[name]])
+        elif name == "betting_market_group_resolve":
+            self.update_object(
+                "bettingmarketgroup",
+                data["betting_market_group_id"],
+                dict(status="graded"),
+            )
+            for bm_id, resolution in data.get("resolutions", []):
+                self.update_object(
+                    "bettingmarket", bm_id, dict(resolution=resolution)
+                )
+        elif name == "proposal_create" and new_id:
+            self.add_proposal(new_id)
+        elif name == "proposal_update":
+            self.update_proposal(data)
+        elif name == "proposal_delete":
+            self.remove_proposal(data["proposal"])
+        return new_id
+
+    def update_object(self, kind, id, changes):
+        """ Patch an object in the index (or drop it from the object cache
+            of peerplays if it is not indexed)
+        """
+        obj = self.chain_state.get(id)
+        # The object cached by peerplays is outdated
+        self.classes[kind].clear_cache()
+        if obj is None:
+            # The cached lists of this kind may carry the outdated object
+            log.debug("Object {} is not indexed, dropping it from cache".format(id))
+            ChainState.lists[kind][0].clear_cache()
+            return
+        updated = dict(obj)
+        updated.update(changes)
+        self.chain_state.replace(kind, updated)
+
+    def _tracked(self, pid):
+        """ Yield the maintained proposals (per account) with id ``pid``
+        """
+        for proposals in (self.chain_state.proposals or {}).values():
+            if pid in proposals:
+                yield proposals
+
+    def fetch_proposal(self, pid):
+        """ Return the proposal ``pid`` from chain (``None`` if it has
+            already been executed or removed)
+        """
+        data = self.peerplays.rpc.get_objects([pid])[0]
+        if data:
+            return Proposal(data, blockchain_instance=self.peerplays)
+
+    def add_proposal(self, pid):
+        """ Add a new proposal to the proposals of the tracked accounts
+            whose approval it requires
+        """
+        if not self.chain_state.proposals:
+            return
+        proposal = self.fetch_proposal(pid)
+        if proposal is None:
+            return
+        required = set(proposal["required_active_approvals"]) | set(
+            proposal["required_owner_approvals"]
+        )
+        added = False
+        for account_id, proposals in self.chain_state.proposals.items():
+            if account_id in required:
+                proposals[pid] = proposal
+                added = True
+        if added:
+            self._proposals_changed()
+
+    def update_proposal(self, data):
+        pid = data["proposal"]
+        proposal = None
+        for proposals in self._tracked(pid):
+            proposal = proposals[pid]
+            for key in ("active", "owner"):
+                approvals = [
+                    x
+                    for x in proposal["available_{}_approvals".format(key)]
+                    if x not in data.get("{}_approvals_to_remove".format(key), [])
+                ]
+                for account in data.get("{}_approvals_to_add".format(key), []):
+                    if account not in approvals:
+                        approvals.append(account)
+                proposal["available_{}_approvals".format(key)] = approvals
+        if proposal is None:
+            return
+        # Proposals cached by peerplays carry the outdated approvals
+        Proposal.clear_cache()
+        if self.approved(proposal):
+            log.debug("Proposal {} has been approved".format(pid))
+            self.remove_proposal(pid)
+        else:
+            self._proposals_changed()
+
+    def approved(self, proposal):
+        """ Test if the approvals of a proposal satisfy the authorities it
+            requires (i.e. it is executed)
+
+            Account authorities are resolved one level deep. Proposals with a
+            review period are only executed at their expiration.
+        """
+        if proposal.get("review_period_time"):
+            return False
+        owner = set(proposal["available_owner_approvals"])
+        active = set(proposal["available_active_approvals"]) | owner
+        keys = set(proposal["available_key_approvals"])
+        return all(
+            self._authorized(x, "active", active, keys)
+            for x in proposal["required_active_approvals"]
+        ) and all(
+            self._authorized(x, "owner", owner, keys)
+            for x in proposal["required_owner_approvals"]
+        )
+
+    def _authorized(self, account_id, permission, accounts, keys):
+        if account_id in accounts:
+            return True
+        account = Account(account_id, blockchain_instance=self.peerplays)
+        authority = account[permission]
+        weight = sum(w for x, w in authority["account_auths"] if x in accounts)
+        weight += sum(w for x, w in authority["key_auths"] if x in keys)
+        return weight >= authority["weight_threshold"]
+
+    def remove_proposal(self, pid):
+        removed = False
+        for proposals in list(self._tracked(pid)):
+            del proposals[pid]
+            removed = True
+        if removed:
+            Proposal.clear_cache()
+            self._proposals_changed()
+
+    def expire_proposals(self, timestamp):
+        """ Drop the proposals that expired at ``timestamp``
+        """
+        if not self.chain_state.proposals:
+            return
+        now = parse_time(timestamp)
+        expired = set()
+        for proposals in self.chain_state.proposals.values():
+            for pid, proposal in proposals.items():
+                expiration = proposal.get("expiration_time")
+                if expiration and parse_time(expiration) <= now:
+                    expired.add(pid)
+        for pid in expired:
+            log.debug("Proposal {} has expired".format(pid))
+            self.remove_proposal(pid)
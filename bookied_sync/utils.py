@@ -1,11 +1,84 @@
-def dList2Dict(l):
+def dList2Dict(dlist):
     """ Convert a double list ``[[key, value], [key, value]]`` into a
         dictionary
     """
-    return {v[0]: v[1] for v in l}
+    return {v[0]: v[1] for v in dlist}
 
 
-def dict2dList(l):
+def dict2dList(data):
     """ Convert a dictionary into a double list
     """
-    return [[k, v] for k, v in l.items()]
+    return [[k, v] for k, v in data.items()]
+
+
+def canonical(data):
+    """ Return the canonical form of a double list (or a dictionary): a
+        sorted tuple of ``(key, value)`` pairs
+
+        Two double lists that carry the same pairs (in any order) have the
+        same canonical form, which is hashable and can hence be used as a
+        dictionary key.
+    """
+    if not data:
+        return ()
+    if isinstance(data, dict):
+        data = data.items()
+    return tuple(sorted(set((k, v) for k, v in data)))
+
+
+#: Double lists whose canonical forms are computed by ``canonicalize()``
+canonical_keys = ("name", "description")
+
+
+class CanonicalDict(dict):
+    """ Operation payload that carries the canonical forms of its double
+        lists (see ``canonicalize()``)
+    """
+
+    canonical_forms = None
+
+
+def _forms(obj, key):
+    value = obj.get(key, obj.get("new_{}".format(key)))
+    return value, canonical(value), dList2Dict(value or [])
+
+
+def canonicalize(obj, keys=canonical_keys):
+    """ Compute the canonical forms of the double lists ``keys`` of an
+        object on chain or an operation payload once, when it enters an
+        index
+
+        The forms are attached to the object. Plain dictionaries (e.g.
+        operation payloads) cannot carry them and are copied into a
+        :class:`CanonicalDict`. Hence, the returned object needs to be
+        indexed.
+
+        :param dict obj: Object on chain or operation payload
+        :param tuple keys: Attributes, e.g. ``name`` and ``description``
+    """
+    if getattr(obj, "canonical_forms", None) is not None:
+        return obj
+    if type(obj) is dict:
+        obj = CanonicalDict(obj)
+    obj.canonical_forms = {key: _forms(obj, key) for key in keys}
+    return obj
+
+
+def canonical_of(obj, key):
+    """ Return the canonical form and the dictionary of the double list
+        ``obj[key]`` (or ``obj["new_<key>"]`` of an update operation)
+
+        Objects and operations that have been indexed carry their forms
+        (see ``canonicalize()``), those of all others are computed.
+
+        :param dict obj: Object on chain or operation
+        :param str key: Attribute, e.g. ``name`` or ``description``
+        :returns: ``(canonical, dictionary)``, ``((), {})`` if the
+            attribute is missing or empty
+    """
+    forms = getattr(obj, "canonical_forms", None)
+    if forms is not None and key in forms:
+        value, form, mapping = forms[key]
+        if value is obj.get(key, obj.get("new_{}".format(key))):
+            return form, mapping
+    return _forms(obj, key)[1:]
@@ -0,0 +1,189 @@
+import mock
+import asyncio
+import unittest
+from peerplays.event import Event
+from peerplays.proposal import Proposal
+from peerplays.instance import shared_blockchain_instance
+from bookied_sync.lookup import Lookup
+from bookied_sync.sport import LookupSport
+from bookied_sync.aio import AsyncSession, ReplayRpc, RpcMiss
+
+from .fixtures import fixture_data, lookup_test_event, lookup_new_event
+
+event_id = "1.22.2242"
+
+
+class AsyncRpc(object):
+    """ Async RPC that forwards calls to the synchronous RPC
+    """
+
+    def __init__(self, rpc):
+        self.rpc = rpc
+        self.calls = list()
+
+    def __getattr__(self, name):
+        async def call(*args):
+            self.calls.append(name)
+            await asyncio.sleep(0)
+            return getattr(self.rpc, name)(*args)
+
+        return call
+
+
+class ObjectRpc(AsyncRpc):
+    """ Async RPC that answers ``get_objects`` from ``objects`` first
+    """
+
+    def __init__(self, rpc, objects):
+        AsyncRpc.__init__(self, rpc)
+        self.objects = objects
+
+    def __getattr__(self, name):
+        if name != "get_objects":
+            return AsyncRpc.__getattr__(self, name)
+
+        async def call(ids):
+            self.calls.append(name)
+            await asyncio.sleep(0)
+            return [self.objects.get(x) or self.rpc.get_objects([x])[0] for x in ids]
+
+        return call
+
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+        self.blockchain = shared_blockchain_instance()
+        self.rpc = AsyncRpc(self.blockchain.rpc)
+        self.session = AsyncSession(self.rpc).activate()
+
+    def tearDown(self):
+        self.session.deactivate()
+
+    def test_replay(self):
+        instance = self.session.instance
+        self.assertIsInstance(instance.rpc, ReplayRpc)
+        with self.assertRaises(RpcMiss):
+            instance.rpc.get_objects(["2.1.0"])
+        run(self.session.fetch("get_objects", (["2.1.0"],)))
+        self.assertEqual(
+            instance.rpc.get_objects(["2.1.0"]), self.rpc.rpc.get_objects(["2.1.0"])
+        )
+        self.session.deactivate()
+        self.assertIsNone(self.session.instance)
+
+    def test_scoped_instance(self):
+        # The shared instance is left alone
+        self.assertNotIsInstance(self.blockchain.rpc, ReplayRpc)
+        event = lookup_test_event(event_id)
+        self.assertIs(event.blockchain, self.blockchain)
+
+        def func():
+            self.assertIs(event.blockchain, self.session.instance)
+            return event.find_id()
+
+        self.assertEqual(run(self.session.run(func)), event_id)
+        self.assertIs(event.blockchain, self.blockchain)
+
+    def test_head_block(self):
+        run(self.session.run(lambda: None))
+        run(self.session.fetch("get_objects", (["2.1.0"],)))
+        run(self.session.run(lambda: None))
+        self.assertIn(
+            self.session.key("get_objects", (["2.1.0"],)), self.session.responses
+        )
+
+        # A new head block drops the fetched responses
+        self.session._block -= 1
+        run(self.session.run(lambda: None))
+        self.assertNotIn(
+            self.session.key("get_objects", (["2.1.0"],)), self.session.responses
+        )
+        self.assertIn(
+            self.session.key("get_dynamic_global_properties", ()),
+            self.session.responses,
+        )
+
+    def test_find_id_is_synced(self):
+        event = lookup_test_event(event_id)
+        self.assertEqual(run(self.session.wrap(event).find_id()), event_id)
+        self.assertTrue(run(self.session.wrap(event).is_synced()))
+        sport = LookupSport("Basketball")
+        self.assertEqual(run(self.session.wrap(sport).get_id()), "1.20.1")
+
+    def test_rpc_helpers_replayed(self):
+        objects = {x["id"]: dict(x) for x in [Event(event_id), Proposal("1.10.1")]}
+        event = lookup_test_event(event_id)
+        Event.clear_cache()
+        Proposal.clear_cache()
+        rpc = ObjectRpc(self.blockchain.rpc, objects)
+        session = AsyncSession(rpc).activate()
+        connection = type(self.blockchain.rpc.connection)
+
+        def func():
+            # Nothing is requested from the (blocking) node RPC
+            with mock.patch.object(
+                connection, "rpcexec", side_effect=AssertionError("blocking")
+            ):
+                instance = session.instance
+                proposal = Proposal("1.10.1", blockchain_instance=instance)
+                return proposal["id"], event.is_synced()
+
+        self.assertEqual(run(session.run(func)), ("1.10.1", True))
+        self.assertIn("get_objects", rpc.calls)
+        self.assertGreater(session.stats()["retries"], 0)
+        session.deactivate()
+
+    def test_merge_concurrent_calls(self):
+        async def fetch_many():
+            return await asyncio.gather(
+                *[self.session.fetch("get_objects", (["2.1.0"],)) for _ in range(10)]
+            )
+
+        results = run(fetch_many())
+        self.assertEqual(len(set(str(x) for x in results)), 1)
+        self.assertEqual(self.rpc.calls, ["get_objects"])
+        self.assertEqual(self.session.stats()["calls"], 1)
+
+    def test_update_same_as_sync(self):
+        def proposed():
+            # The expiration time depends on the time of the call
+            op = Lookup.proposal_buffer.json()
+            return [op[0], dict(op[1], expiration_time=None)]
+
+        self.session.deactivate()
+        lookup_new_event().update()
+        expected = proposed()
+
+        fixture_data()
+        self.session.activate()
+        self.session.refresh()
+        event = lookup_new_event()
+        run(self.session.wrap(event).update())
+        self.assertEqual(proposed(), expected)
+
+    def test_update_transactional(self):
+        event = lookup_new_event()
+        calls = list()
+        propose_new = event.propose_new
+
+        def failing_propose_new():
+            # Write to the buffer first and then require new data
+            calls.append(1)
+            ret = propose_new()
+            event.blockchain.rpc.get_objects(["2.1.0"])
+            return ret
+
+        event.propose_new = failing_propose_new
+        run(self.session.wrap(event).update())
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(Lookup.proposal_buffer.ops), 1)
+
+    def test_gather(self):
+        sports = [LookupSport("Basketball"), LookupSport("AmericanFootball")]
+        ids = run(self.session.gather(sports, method="find_id", limit=1))
+        self.assertEqual(ids, ["1.20.1", "1.20.0"])
@@ -0,0 +1,210 @@
+import mock
+from copy import deepcopy
+import unittest
+from peerplays.proposal import Proposal
+from peerplays.utils import parse_time
+from bookied_sync.lookup import Lookup
+from bookied_sync.approvals import ApprovalMap, ApprovalBatch
+from bookied_sync.pending import PendingOperationsCache
+
+from .fixtures import fixture_data
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+        self.lookup = Lookup()
+        self.lookup.set_approving_account("init0")
+
+    def test_approval_map(self):
+        approval_map = ApprovalMap()
+        approval_map.register("1.10.1", [0, 1, 2])
+        approval_map.register("1.10.2", [0])
+        self.assertEqual(approval_map["1.10.1"], {0: False, 1: False, 2: False})
+        self.assertEqual(approval_map.unapproved("1.10.1"), 3)
+
+        # Registering again does not reset approvals
+        self.assertFalse(approval_map.approve("1.10.1", 0))
+        approval_map.register("1.10.1", [0, 1, 2])
+        self.assertEqual(approval_map.unapproved("1.10.1"), 2)
+
+        # Approving twice does not count twice
+        self.assertFalse(approval_map.approve("1.10.1", 0))
+        self.assertFalse(approval_map.approve("1.10.1", 1))
+        self.assertAlmostEqual(approval_map.progress("1.10.1"), 200 / 3)
+        self.assertTrue(approval_map.approve("1.10.1", 2))
+        self.assertFalse(approval_map.approve("1.10.1", 2))
+        self.assertEqual(approval_map.unapproved("1.10.2"), 1)
+
+        del approval_map["1.10.1"]
+        self.assertEqual(approval_map.unapproved("1.10.1"), 0)
+        with self.assertRaises(KeyError):
+            approval_map.approve("1.10.1", 0)
+
+        # Restored from a plain map
+        approval_map = ApprovalMap({"1.10.3": {0: True, 1: False}})
+        self.assertEqual(approval_map.unapproved("1.10.3"), 1)
+        self.assertTrue(approval_map.approve("1.10.3", 1))
+
+    def test_approve_on_completion(self):
+        Lookup.approval_map.register("1.10.1", [0, 1])
+        Lookup.approval_map.register("1.10.2413", [0])
+        with mock.patch("bookied_sync.lookup.Proposal", wraps=Proposal) as proposal:
+            self.lookup.approve("1.10.1", 0)
+            self.assertEqual(proposal.call_count, 0)
+            self.assertTrue(Lookup.direct_buffer.is_empty())
+
+            self.lookup.approve("1.10.1", 1)
+            proposal.assert_called_once_with(
+                "1.10.1", blockchain_instance=self.lookup.blockchain
+            )
+
+        self.assertNotIn("1.10.1", Lookup.approval_map)
+        self.assertIn("1.10.2413", Lookup.approval_map)
+        ops = Lookup.direct_buffer.json()["operations"]
+        self.assertEqual(len(ops), 1)
+        self.assertEqual(ops[0][1]["proposal"], "1.10.1")
+
+    def test_eviction(self):
+        approval_map = ApprovalMap(max_size=3)
+        approval_map.register("1.10.1", [0], expiration="2018-05-29T11:00:00")
+        approval_map.register("1.10.2", [0], source="witness-account")
+        approval_map.register("1.10.3", [0], source="init0")
+        self.assertEqual(approval_map.expire(parse_time("2018-05-29T10:30:00")), [])
+        self.assertEqual(
+            approval_map.expire(parse_time("2018-05-29T11:00:00")), ["1.10.1"]
+        )
+
+        # Only proposals of the same source disappear
+        self.assertEqual(approval_map.retain([], source="init0"), ["1.10.3"])
+        self.assertIn("1.10.2", approval_map)
+
+        # The oldest proposal makes room
+        approval_map.register("1.10.4", [0])
+        approval_map.register("1.10.5", [0])
+        approval_map.register("1.10.6", [0])
+        self.assertNotIn("1.10.2", approval_map)
+        self.assertEqual(approval_map.size, 3)
+        self.assertEqual(
+            approval_map.stats(),
+            dict(size=3, evicted=dict(expired=1, disappeared=1, size=1)),
+        )
+
+    def test_evict_on_load(self):
+        Lookup._approvals_expired_at = None
+        Lookup.approval_map.register("1.10.99", [0], source="witness-account")
+        Lookup.approval_map.register("1.10.98", [0])
+        Lookup.approval_map.register(
+            "1.10.97", [0], expiration="2018-05-29T09:00:00", source="init0"
+        )
+        self.lookup.get_pending_operations()
+        # Gone from the pending proposals, expired, and untouched
+        self.assertNotIn("1.10.99", Lookup.approval_map)
+        self.assertNotIn("1.10.97", Lookup.approval_map)
+        self.assertIn("1.10.98", Lookup.approval_map)
+        # Pending proposals are registered with their expiration
+        self.assertEqual(Lookup.approval_map["1.10.1"], {0: False})
+        self.assertEqual(Lookup.approval_map.stats()["evicted"]["disappeared"], 1)
+        self.assertEqual(Lookup.approval_map.stats()["evicted"]["expired"], 1)
+
+    def test_evict_without_rpc(self):
+        rpc = self.lookup.blockchain.rpc
+        Lookup.approval_map.register(
+            "1.10.97", [0], expiration="2018-05-29T09:00:00", source="init0"
+        )
+        dgp = rpc.get_dynamic_global_properties()
+
+        # Expired proposals are evicted at most once per interval
+        Lookup._approvals_expired_at = None
+        with mock.patch.object(
+            rpc, "get_dynamic_global_properties", create=True, return_value=dgp
+        ) as get_dgp:
+            self.lookup.get_pending_operations()
+            self.lookup.get_pending_operations()
+            self.assertEqual(get_dgp.call_count, 1)
+        self.assertNotIn("1.10.97", Lookup.approval_map)
+
+        # The pending cache provides the head time
+        Lookup.approval_map.register(
+            "1.10.97", [0], expiration="2018-05-29T09:00:00", source="init0"
+        )
+        Lookup.pending_cache = PendingOperationsCache()
+        try:
+            with mock.patch.object(
+                rpc, "get_dynamic_global_properties", create=True, return_value=dgp
+            ) as get_dgp:
+                self.lookup.get_pending_operations()
+                # Checking the head block only
+                self.assertEqual(get_dgp.call_count, 1)
+            self.assertNotIn("1.10.97", Lookup.approval_map)
+        finally:
+            Lookup.pending_cache = None
+
+    def test_approval_batch(self):
+        Lookup.approval_batch = ApprovalBatch()
+        try:
+            for pid in ["1.10.1", "1.10.2413"]:
+                Lookup.approval_map.register(pid, [0], proposal=Proposal(pid))
+            self.lookup.approve("1.10.1", 0)
+            self.lookup.approve("1.10.2413", 0)
+            self.assertEqual(len(Lookup.approval_batch), 2)
+            self.assertNotIn("1.10.1", Lookup.approval_map)
+            self.assertTrue(Lookup.direct_buffer.is_empty())
+
+            # Already in the direct buffer
+            self.lookup.peerplays.approveproposal(
+                "1.10.2413", account="init0", append_to=Lookup.direct_buffer
+            )
+            self.assertEqual(self.lookup.approval_buffers(), [])
+            self.assertEqual(len(Lookup.approval_batch), 0)
+            self.assertEqual(Lookup.approval_batch.skipped, 1)
+            ops = Lookup.direct_buffer.json()["operations"]
+            self.assertEqual(
+                [op[1]["proposal"] for op in ops], ["1.10.2413", "1.10.1"]
+            )
+        finally:
+            Lookup.approval_batch = None
+
+    def test_approval_batch_limits(self):
+        batch = ApprovalBatch(max_operations=2)
+        proposals = {pid: Proposal(pid) for pid in ["1.10.1", "1.10.2413"]}
+        for pid in ["1.10.1", "1.10.2413", "1.10.1"]:
+            batch.add(pid, "init0", proposal=proposals[pid])
+        batch.add("1.10.1", "init1")
+        # init0 has already approved 1.10.2413
+        proposal = proposals["1.10.2413"]
+        with mock.patch.dict(proposal, available_active_approvals=["1.2.7"]):
+            txs = batch.flush()
+        self.assertEqual(batch.skipped, 1)
+        self.assertEqual(batch.approved, 2)
+        self.assertEqual(
+            [
+                [
+                    (op[1]["proposal"], op[1]["fee_paying_account"])
+                    for op in tx.json()["operations"]
+                ]
+                for tx in txs
+            ],
+            [[("1.10.1", "1.2.7")], [("1.10.1", "1.2.8")]],
+        )
+
+    def test_approval_batch_registered_proposals(self):
+        Lookup.approval_batch = ApprovalBatch()
+        try:
+            Lookup.approval_map.clear()
+            self.lookup.get_pending_operations()
+            proposal = Lookup.approval_map.proposal("1.10.1")
+            self.assertEqual(proposal["id"], "1.10.1")
+            # Copies of the map share the proposals
+            self.assertIs(deepcopy(Lookup.approval_map).proposal("1.10.1"), proposal)
+
+            for oid in list(Lookup.approval_map["1.10.1"]):
+                self.lookup.approve("1.10.1", oid)
+            rpc = self.lookup.peerplays.rpc
+            with mock.patch.object(rpc, "get_objects", create=True) as get_objects:
+                self.lookup.approval_buffers()
+                get_objects.assert_not_called()
+            ops = Lookup.direct_buffer.json()["operations"]
+            self.assertEqual([op[1]["proposal"] for op in ops], ["1.10.1"])
+        finally:
+            Lookup.approval_batch = None
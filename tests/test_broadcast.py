@@ -0,0 +1,63 @@
+import mock
+import threading
+import unittest
+from peerplays.transactionbuilder import ProposalBuilder, TransactionBuilder
+from peerplaysbase.operationids import operations
+from bookied_sync.lookup import Lookup
+from bookied_sync.sport import LookupSport
+from bookied_sync.rule import LookupRule
+from bookied_sync.update import UpdateTransaction
+
+from .fixtures import fixture_data
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        if Lookup.broadcast_executor is not None:
+            Lookup.broadcast_executor.shutdown()
+            Lookup.broadcast_executor = None
+
+    def broadcast(self, buffer):
+        # Wait for the transaction to be "included"
+        self.release.wait(5)
+        if isinstance(buffer, ProposalBuilder):
+            op = operations["proposal_create"]
+        else:
+            op = operations["proposal_update"]
+        return dict(operations=[[op, {"proposal": "1.10.1"}]])
+
+    def test_broadcast_async(self):
+        sport = LookupSport("AmericanFootball")
+        sport.set_approving_account("init0")
+        sport.update(require_witness=False)
+        LookupRule("Basketball", "R_NBA_ML_1").update()
+        self.assertFalse(Lookup.direct_buffer.is_empty())
+        self.assertFalse(Lookup.proposal_buffer.is_empty())
+
+        with mock.patch.object(
+            ProposalBuilder, "broadcast", autospec=True, side_effect=self.broadcast
+        ), mock.patch.object(
+            TransactionBuilder, "broadcast", autospec=True, side_effect=self.broadcast
+        ):
+            futures = sport.broadcast_async()
+            self.assertEqual(len(futures), 2)
+            self.assertFalse(any(x.done() for x in futures))
+
+            # Fresh buffers can be filled in the meantime
+            self.assertTrue(Lookup.direct_buffer.is_empty())
+            self.assertTrue(Lookup.proposal_buffer.is_empty())
+            LookupRule("Basketball", "R_NBA_HCP_1").update()
+            self.assertEqual(len(Lookup.proposal_buffer.ops), 1)
+
+            self.release.set()
+            txs = [x.result(timeout=5) for x in futures]
+        self.assertTrue(all(isinstance(x, UpdateTransaction) for x in txs))
+        self.assertEqual([x.action() for x in txs], ["approval", "proposal"])
+        self.assertEqual(len(Lookup.proposal_buffer.ops), 1)
+
+    def test_broadcast_async_empty(self):
+        self.assertEqual(Lookup().broadcast_async(), [])
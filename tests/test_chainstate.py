@@ -0,0 +1,170 @@
+import mock
+import unittest
+from datetime import datetime
+from bookied_sync.lookup import Lookup
+from bookied_sync.chainstate import ChainState
+from bookied_sync.sport import LookupSport
+from bookied_sync.eventgroup import LookupEventGroup
+from bookied_sync.rule import LookupRule
+from bookied_sync.event import LookupEvent
+
+from .fixtures import fixture_data, lookup_test_event
+
+event_id = "1.22.2242"
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+        self.chain_state = ChainState()
+        Lookup.chain_state = self.chain_state
+
+    def tearDown(self):
+        Lookup.chain_state = None
+
+    def test_find(self):
+        self.assertEqual(
+            [x["id"] for x in self.chain_state.find("sport", "Basketball")], ["1.20.1"]
+        )
+        self.assertEqual(self.chain_state.find("sport", "Curling"), [])
+        events = self.chain_state.find(
+            "event",
+            ("en", "Boston Celtics @ Atlanta Hawks", "2022-10-16T00:00:00"),
+            "1.21.12",
+        )
+        self.assertEqual([x["id"] for x in events], [event_id])
+        self.assertEqual(len(self.chain_state.objects("event", "1.21.12")), 2)
+        # Canonical forms are computed when objects are indexed
+        self.assertIn(
+            ("en", "Boston Celtics @ Atlanta Hawks"), events[0].canonical_forms["name"][1]
+        )
+
+    def test_find_id(self):
+        self.assertEqual(LookupSport("Basketball").find_id(), "1.20.1")
+        self.assertEqual(LookupEventGroup("Basketball", "NBA").find_id(), "1.21.12")
+        self.assertEqual(LookupRule("Basketball", "R_NBA_ML_1").find_id(), "1.23.11")
+
+        event = lookup_test_event(event_id)
+        self.assertEqual(event.find_id(), event_id)
+
+        bmg = next(event.bettingmarketgroups)
+        self.assertEqual(bmg.find_id(), "1.24.212")
+        bmg["id"] = "1.24.212"
+        self.assertEqual(next(bmg.bettingmarkets).find_id(), "1.25.2950")
+
+    def test_bulk_load_once(self):
+        event = lookup_test_event(event_id)
+        with mock.patch.object(
+            self.chain_state, "_list", wraps=self.chain_state._list
+        ) as _list:
+            self.assertEqual(event.find_id(), event_id)
+            self.assertEqual(event.find_id(), event_id)
+            _list.assert_any_call("event", "1.21.12", refresh=False)
+            self.assertEqual(_list.call_count, 3)  # sport, eventgroup, event
+
+            # After invalidation, the events are loaded again
+            self.chain_state.invalidate("event")
+            self.assertEqual(event.find_id(), event_id)
+            self.assertEqual(_list.call_count, 4)
+
+    def test_custom_search(self):
+        event = lookup_test_event(event_id)
+        with mock.patch.object(
+            self.chain_state, "find", wraps=self.chain_state.find
+        ) as find:
+            self.assertEqual(
+                event.find_id(find_id_search=[lambda s, i: True]), "1.22.2241"
+            )
+            self.assertNotIn("event", [x[0][0] for x in find.call_args_list])
+
+    def test_find_events(self):
+        start_time = datetime(2022, 10, 16)
+        events = self.chain_state.find_events(
+            "1.21.12", [["en", "Foo"], ["en_us", "Foobar @ Demo"]], start_time
+        )
+        self.assertEqual([x["id"] for x in events], ["1.22.2241"])
+        self.assertEqual(
+            self.chain_state.find_events(
+                "1.21.12", [["en_us", "Foobar @ Demo"]], datetime(2022, 10, 17)
+            ),
+            [],
+        )
+
+        event = LookupEvent.find_event(
+            "Basketball", "NBA", ["Atlanta Hawks", "Boston Celtics"], start_time
+        )
+        self.assertEqual(event["id"], event_id)
+        self.assertIsNone(
+            LookupEvent.find_event(
+                "Basketball",
+                "NBA",
+                ["Atlanta Hawks", "Boston Celtics"],
+                datetime(2022, 10, 17),
+            )
+        )
+
+    def test_fetch_new(self):
+        self.chain_state.objects("event", "1.21.12")
+        new_event = {
+            "id": "1.22.2243",
+            "name": [["en", "Boston Celtics @ Chicago Bulls"]],
+            "start_time": "2022-10-18T00:00:00",
+            "event_group_id": "1.21.12",
+        }
+        other_event = dict(new_event, id="1.22.2244", event_group_id="1.21.13")
+        rpc = mock.MagicMock()
+        rpc.get_objects.return_value = [new_event, other_event, None]
+        self.chain_state.blockchain = mock.MagicMock(rpc=rpc)
+
+        # Nothing is fetched unless we expect new objects
+        key = ("en", "Boston Celtics @ Chicago Bulls", "2022-10-18T00:00:00")
+        self.assertEqual(self.chain_state.find("event", key, "1.21.12"), [])
+        rpc.get_objects.assert_not_called()
+
+        self.chain_state.expect("event")
+        self.assertEqual(
+            self.chain_state.find("event", key, "1.21.12"), [new_event]
+        )
+        self.assertEqual(
+            rpc.get_objects.call_args[0][0][:2], ["1.22.2243", "1.22.2244"]
+        )
+        # Event groups that have not been loaded are not populated
+        self.assertNotIn(("event", "1.21.13"), self.chain_state._objects)
+        self.assertEqual(len(self.chain_state.objects("event", "1.21.12")), 3)
+
+        # The expectation has been satisfied
+        rpc.get_objects.reset_mock()
+        self.chain_state.find("event", key, "1.21.12")
+        rpc.get_objects.assert_not_called()
+
+    def test_unexecuted_proposal(self):
+        self.chain_state.objects("event", "1.21.12")
+        rpc = mock.MagicMock()
+        rpc.get_objects.return_value = [None]
+        self.chain_state.blockchain = mock.MagicMock(rpc=rpc)
+        key = ("en", "Boston Celtics @ Chicago Bulls", "2022-10-18T00:00:00")
+
+        with mock.patch("time.monotonic", return_value=100.0):
+            self.chain_state.expect("event", expiration=60)
+            self.chain_state.find("event", key, "1.21.12")
+            self.assertEqual(rpc.get_objects.call_count, 1)
+            # Fetches are rate-limited
+            self.chain_state.find("event", key, "1.21.12")
+            self.assertEqual(rpc.get_objects.call_count, 1)
+        with mock.patch("time.monotonic", return_value=103.0):
+            self.chain_state.find("event", key, "1.21.12")
+            self.assertEqual(rpc.get_objects.call_count, 2)
+
+        # The proposal has expired without being executed
+        with mock.patch("time.monotonic", return_value=161.0):
+            self.assertEqual(self.chain_state.expected("event"), 0)
+            self.chain_state.find("event", key, "1.21.12")
+            self.assertEqual(rpc.get_objects.call_count, 2)
+
+    def test_propose_new_expects_event(self):
+        event = lookup_test_event(event_id)
+        with mock.patch.object(self.chain_state, "expect") as expect:
+            event.propose_new()
+            expect.assert_called_once_with(
+                "event", expiration=Lookup.proposal_buffer.proposal_expiration
+            )
@@ -0,0 +1,107 @@
+import unittest
+from peerplaysbase.objects import Operation
+from peerplaysbase.operationids import operations
+from bookied_sync.lookup import Lookup
+from bookied_sync.sport import LookupSport
+from bookied_sync.chunks import (
+    relative_references,
+    group_operations,
+    chunk_operations,
+)
+
+from .fixtures import fixture_data, lookup_new_event
+
+fee = {"amount": 0, "asset_id": "1.3.0"}
+
+
+def bm(group_id):
+    return [
+        operations["betting_market_create"],
+        {
+            "fee": fee,
+            "group_id": group_id,
+            "description": [["en", "Foobar"]],
+            "payout_condition": [["en", "Foobar"]],
+            "extensions": [],
+        },
+    ]
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+
+    def tearDown(self):
+        Lookup.proposal_max_operations = None
+        Lookup.proposal_max_bytes = None
+
+    def test_relative_references(self):
+        self.assertEqual(relative_references(bm("0.0.3")[1]), {3})
+        self.assertEqual(relative_references(bm("1.24.212")[1]), set())
+        self.assertEqual(
+            relative_references({"resolutions": [["0.0.1", "win"], ["0.0.2", "no"]]}),
+            {1, 2},
+        )
+
+    def test_group_operations(self):
+        ops = [bm("1.24.1"), bm("1.24.2"), bm("0.0.0"), bm("0.0.2"), bm("0.0.1")]
+        self.assertEqual(group_operations(ops), [[0, 2, 3], [1, 4]])
+
+    def test_chunk_operations(self):
+        ops = [bm("1.24.1"), bm("1.24.2"), bm("0.0.0"), bm("0.0.2"), bm("0.0.1")]
+        self.assertEqual(chunk_operations(ops), [ops])
+
+        chunks = chunk_operations(ops, max_operations=3)
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(
+            [x[1]["group_id"] for x in chunks[0]], ["1.24.1", "0.0.0", "0.0.1"]
+        )
+        self.assertEqual([x[1]["group_id"] for x in chunks[1]], ["1.24.2", "0.0.0"])
+
+        # Groups that exceed the limit on their own are not split
+        chunks = chunk_operations(ops, max_operations=1)
+        self.assertEqual([len(x) for x in chunks], [3, 2])
+
+        # Independent operations are packed by size
+        ops = [bm("1.24.{}".format(i)) for i in range(5)]
+        size = len(bytes(Operation(ops[0])))
+        chunks = chunk_operations(ops, max_bytes=2 * size)
+        self.assertEqual([len(x) for x in chunks], [2, 2, 1])
+
+    def test_proposal_chunks(self):
+        event = lookup_new_event()
+        event.update()
+        bmg = next(event.bettingmarketgroups)
+        bmg.update()
+        for x in bmg.bettingmarkets:
+            x.update()
+        LookupSport("AmericanFootball").propose_update()
+        self.assertEqual(len(Lookup.proposal_buffer.ops), 5)
+
+        # No limits
+        self.assertEqual(event.proposal_chunks(), [Lookup.proposal_buffer])
+
+        Lookup.proposal_max_operations = 4
+        chunks = event.proposal_chunks()
+        self.assertEqual(len(chunks), 2)
+        first = [x.json() for x in chunks[0].list_operations()]
+        self.assertEqual(
+            [x[0] for x in first],
+            [
+                operations["event_create"],
+                operations["betting_market_group_create"],
+                operations["betting_market_create"],
+                operations["betting_market_create"],
+            ],
+        )
+        self.assertEqual(first[1][1]["event_id"], "0.0.0")
+        self.assertEqual(first[2][1]["group_id"], "0.0.1")
+        second = [x.json() for x in chunks[1].list_operations()]
+        self.assertEqual(second[0][0], operations["sport_update"])
+
+        for chunk in chunks:
+            proposal = chunk.json()
+            self.assertEqual(proposal[0], operations["proposal_create"])
+            self.assertEqual(
+                chunk.proposal_expiration, Lookup.proposal_buffer.proposal_expiration
+            )
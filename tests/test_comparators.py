@@ -0,0 +1,140 @@
+import unittest
+from bookied_sync import comparators
+from bookied_sync.comparators import Comparators
+
+
+class Soll(dict):
+    """ Lookup stand-in that counts the accesses to its names
+    """
+
+    accessed = 0
+
+    @property
+    def names(self):
+        self.accessed += 1
+        return [["en", "Basketball"], ["de", "Basketball"]]
+
+    @property
+    def name(self):
+        return self.names
+
+
+class Testcases(unittest.TestCase):
+    def test_order(self):
+        def custom(soll, ist):
+            return True
+
+        pipeline = Comparators(
+            custom,
+            comparators.cmp_name("en"),
+            comparators.cmp_all_name(),
+            comparators.cmp_status(),
+            comparators.cmp_required_keys(["name"]),
+        )
+        self.assertEqual(
+            [x.cost if x is not custom else None for x in pipeline],
+            [0, 1, 2, 3, None],
+        )
+        self.assertIs(Comparators.compile(pipeline), pipeline)
+        self.assertEqual(len(Comparators.compile([custom])), 1)
+
+    def test_short_circuit(self):
+        calls = list()
+
+        def custom(soll, ist):
+            calls.append(ist)
+            return True
+
+        soll = Soll(status="upcoming")
+        match = Comparators(custom, comparators.cmp_status()).bind(soll)
+        self.assertFalse(match(dict(status="finished")))
+        self.assertEqual(calls, [])
+        self.assertTrue(match(dict(status="upcoming")))
+        self.assertEqual(len(calls), 1)
+
+    def test_prepare_once(self):
+        soll = Soll()
+        match = Comparators(comparators.cmp_name("en")).bind(soll)
+        candidates = [
+            dict(name=[["en", "Soccer"]]),
+            dict(name=[["en", "Basketball"]]),
+            dict(name=[]),
+        ]
+        self.assertEqual([match(x) for x in candidates], [False, True, False])
+        self.assertEqual(soll.accessed, 1)
+
+        # Comparators can still be called directly
+        self.assertTrue(comparators.cmp_name("en")(soll, candidates[1]))
+
+    def test_parent_in_proposal(self):
+        class Child(dict):
+            parent_ids = ["0.0.1", "1.20.1", "1.20.2"]
+
+            @property
+            def parent_id(self):
+                return self.parent_ids[0]
+
+            def valid_object_id(self, id):
+                return id[0] == "1" and id[:4] != "1.10"
+
+        soll = Child()
+        match = Comparators(comparators.cmp_parent("sport_id")).bind(soll)
+        self.assertTrue(match(dict(sport_id="1.20.2")))
+
+        # The parent has been created, its id is final from now on
+        soll.parent_ids.pop(0)
+        self.assertFalse(match(dict(sport_id="1.20.2")))
+        self.assertTrue(match(dict(sport_id="1.20.1")))
+        soll.parent_ids.pop(0)
+        self.assertTrue(match(dict(sport_id="1.20.1")))
+
+    def test_required_keys(self):
+        match = Comparators(
+            comparators.cmp_status(), comparators.cmp_required_keys(["name"])
+        ).bind(Soll())
+        with self.assertRaises(ValueError):
+            match(dict(status="upcoming"))
+
+    def test_all_langs(self):
+        cmp = comparators.cmp_all_name()
+        soll = Soll()
+        self.assertTrue(
+            cmp(soll, dict(name=[["de", "Basketball"], ["en", "Basketball"]]))
+        )
+        self.assertFalse(cmp(soll, dict(name=[["en", "Basketball"]])))
+        self.assertFalse(cmp(soll, dict(name=[])))
+
+    def test_stats(self):
+        ticks = iter(range(100))
+        stats = comparators.ComparatorStats(clock=lambda: next(ticks))
+        soll = Soll(status="upcoming")
+        soll.comparator_stats = stats
+        match = Comparators(
+            comparators.cmp_status(),
+            comparators.cmp_name("en"),
+            comparators.cmp_required_keys(["name"]),
+        ).bind(soll)
+
+        self.assertTrue(match(dict(status="upcoming", name=[["en", "Basketball"]])))
+        self.assertFalse(match(dict(status="finished", name=[])))
+        with self.assertRaises(ValueError):
+            match(dict(status="upcoming"))
+
+        records = stats.stats()["Soll"]
+        self.assertEqual(
+            records["cmp_required_keys"],
+            dict(calls=3, true=2, false=0, errors=1, time=3, true_ratio=2 / 3),
+        )
+        self.assertEqual(records["cmp_status"]["false"], 1)
+        self.assertEqual(
+            list(stats.get(name="cmp_lang(name, en)")), [("Soll", "cmp_lang(name, en)")]
+        )
+        self.assertEqual(stats.get(lookup="LookupEvent"), {})
+
+        report = stats.report(sort="calls").splitlines()
+        self.assertEqual(report[0].split()[:3], ["lookup", "comparator", "calls"])
+        self.assertEqual(len(report), 4)
+        self.assertEqual(report[1].split()[:3], ["Soll", "cmp_required_keys", "3"])
+
+        stats.reset()
+        self.assertEqual(stats.stats(), {})
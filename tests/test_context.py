@@ -0,0 +1,51 @@
+import os
+import unittest
+from peerplays import PeerPlays
+from bookied_sync.lookup import Lookup
+from bookied_sync.context import SyncContext
+from bookied_sync.sport import LookupSport
+
+from .fixtures import fixture_data, peerplays, lookup_test_event
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+
+    def tearDown(self):
+        Lookup.context = None
+
+    def get_context(self):
+        return SyncContext(
+            network="unittests",
+            sports_folder=os.path.join(
+                os.path.dirname(os.path.realpath(__file__)), "bookiesports"
+            ),
+            blockchain_instance=peerplays,
+        )
+
+    def test_context(self):
+        context = self.get_context()
+        self.assertFalse(context.is_active)
+        self.assertIs(context.peerplays, peerplays)
+        self.assertIs(context.data, Lookup.data)
+        self.assertIs(context.proposal_buffer, Lookup.proposal_buffer)
+        self.assertIs(context.direct_buffer, Lookup.direct_buffer)
+
+        with context:
+            self.assertTrue(context.is_active)
+            self.assertIs(Lookup.context, context)
+        self.assertFalse(context.is_active)
+        self.assertIsNone(Lookup.context)
+
+    def test_cheap_children(self):
+        with self.get_context() as context:
+            event = lookup_test_event("1.22.2242")
+            for bmg in event.bettingmarketgroups:
+                for bm in bmg.bettingmarkets:
+                    self.assertIs(bm._blockchain, context.blockchain)
+            self.assertIs(LookupSport("Basketball").peerplays, peerplays)
+
+            # Explicit parameters still run the full initialization
+            lookup = Lookup(blockchain_instance=PeerPlays(nobroadcast=True))
+            self.assertIsNot(lookup.blockchain, context.blockchain)
@@ -0,0 +1,81 @@
+import unittest
+from bookied_sync import comparators
+from bookied_sync.lookup import Lookup
+from bookied_sync.chainstate import ChainState
+from bookied_sync.dynamic import DynamicIndex, dynamic_line
+
+from .fixtures import fixture_data, lookup_test_event
+
+event_id = "1.22.2242"
+
+
+def bmg(id, typ, value, event_id=event_id):
+    key = "_ou" if typ == "ou" else "_hch"
+    return dict(
+        id=id,
+        event_id=event_id,
+        description=[["en", "Line"], ["_dynamic", typ], [key, str(value)]],
+    )
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+        self.chain_state = ChainState()
+        Lookup.chain_state = self.chain_state
+
+    def tearDown(self):
+        Lookup.chain_state = None
+
+    def test_dynamic_line(self):
+        self.assertEqual(dynamic_line(bmg("1.24.1", "hc", -1.5)), ("hc", -1.5))
+        self.assertEqual(dynamic_line(bmg("1.24.1", "ou", 4.5)), ("ou", 4.5))
+        self.assertIsNone(dynamic_line(dict(description=[["en", "Moneyline"]])))
+
+    def test_find(self):
+        index = DynamicIndex(
+            [
+                bmg("1.24.1", "hc", 3),
+                bmg("1.24.2", "hc", -1),
+                bmg("1.24.3", "ou", 1),
+                bmg("1.24.4", "hc", 1.5),
+                bmg("1.24.5", "hc", 1, event_id="0.0.0"),
+                bmg("1.24.6", "hc", 1, event_id="1.22.1"),
+                dict(id="1.24.7", description=[["en", "Moneyline"]]),
+            ]
+        )
+
+        def ids(*args, **kwargs):
+            return [x["id"] for x in index.find(*args, **kwargs)]
+
+        # In the order the items were added
+        self.assertEqual(ids("hc", 1, 0.5), ["1.24.4", "1.24.5", "1.24.6"])
+        self.assertEqual(ids("hc", 1, 0.49), ["1.24.5", "1.24.6"])
+        self.assertEqual(
+            ids("hc", 1, 2), ["1.24.1", "1.24.2", "1.24.4", "1.24.5", "1.24.6"]
+        )
+        self.assertEqual(ids("ou", 1, 0), ["1.24.3"])
+
+        # Operations that refer to their proposal match any event
+        self.assertEqual(ids("hc", 1, 0.5, event_id=event_id), ["1.24.4", "1.24.5"])
+
+        item = index.find("hc", 3, 0)[0]
+        self.assertTrue(index.remove(item))
+        self.assertEqual(ids("hc", 3, 0), [])
+
+    def test_find_id(self):
+        lookup = list(lookup_test_event(event_id).bettingmarketgroups)[1]
+        lookup["dynamic_allow_float"] = False
+
+        for home, spread, expected in [
+            (5, 0, "1.24.220"),
+            (6.5, 0, None),
+            (6.5, 0.49, None),
+            # Rounded to 6, hence 5.5 is within the spread
+            (6.5, 0.5, "1.24.301"),
+        ]:
+            lookup.set_handicaps(home=home)
+            search = [comparators.cmp_dynamic_bmg_fuzzy(spread)]
+            self.assertEqual(lookup.find_id(find_id_search=search), expected)
+
+        self.assertIn(("bettingmarketgroup", event_id), self.chain_state._dynamic)
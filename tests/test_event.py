@@ -224,6 +224,30 @@ class Testcases(unittest.TestCase):
             }
         )
 
+    def test_cached_parents(self):
+        event = lookup_test_event(event_id)
+        self.assertIs(event.eventgroup, event.eventgroup)
+        self.assertIs(event.sport, event.sport)
+        self.assertIs(event.eventgroup.sport, event.sport)
+        self.assertIs(event.participants, event.participants)
+        self.assertIs(event.names, event.names)
+
+        self.assertIs(event.parent, event.eventgroup)
+
+        # Changing teams invalidates the derived names only
+        eventgroup = event.eventgroup
+        names = event.names
+        event["teams"] = ["Nets", "Mavericks"]
+        self.assertIs(event.eventgroup, eventgroup)
+        self.assertNotEqual(event.names, names)
+        self.assertIn(["en", "Mavericks @ Nets"], event.names)
+
+        # The parent follows a change of the event group
+        event["eventgroup_identifier"] = "NBA OLD"
+        self.assertIsNot(event.eventgroup, eventgroup)
+        self.assertIs(event.parent, event.eventgroup)
+        self.assertEqual(event.parent["identifier"], "NBA OLD")
+
     def test_leadtimemax_close(self):
         event = LookupEvent(
             sport_identifier=self.lookup["sport_identifier"],
@@ -57,6 +57,27 @@ class Testcases(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.assertTrue(self.lookup.test_operation_equal({}))
 
+    def test_cached_matcher(self):
+        lookup = lookup_test_eventgroup(event_group_id)
+        comparators = lookup.test_operation_equal_comparators
+        self.assertTrue(lookup.test_operation_equal(test_operation_dict))
+        match = lookup.matcher("match_equal", comparators)
+        self.assertIs(lookup.matcher("match_equal", comparators), match)
+
+        # Custom comparators are bound on every call
+        custom = lookup.matcher("match_equal", comparators, [lambda soll, ist: True])
+        self.assertIsNot(custom, match)
+        self.assertIs(lookup.matcher("match_equal", comparators), match)
+
+        # Changes to the lookup rebind the matcher
+        lookup["name"] = dict(lookup["name"], en="NBA Playoffs")
+        self.assertIsNot(lookup.matcher("match_equal", comparators), match)
+        self.assertFalse(lookup.test_operation_equal(test_operation_dict))
+
+        match = lookup.matcher("match_equal", comparators)
+        lookup.invalidate()
+        self.assertIsNot(lookup.matcher("match_equal", comparators), match)
+
     def test_find_id(self):
         self.assertEqual(self.lookup.find_id(), event_group_id)
 
@@ -0,0 +1,81 @@
+import unittest
+from bookied_sync.lookup import Lookup
+from bookied_sync.sport import LookupSport
+from bookied_sync.fingerprints import fingerprint, BufferIndex
+
+from .fixtures import fixture_data
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+        self.lookup = LookupSport("Basketball")
+        self.lookup.clear_proposal_buffer()
+
+    def test_fingerprint(self):
+        keys = ("description",)
+        bmg = dict(
+            description=[["en", "Handicap"], ["_dynamic", "hc"], ["_hch", "1"]],
+            event_id="0.0.0",
+            status="upcoming",
+        )
+        other = dict(
+            new_description=[["_hch", "2"], ["_dynamic", "hc"], ["en", "Handicap"]],
+            new_event_id="1.22.1",
+        )
+        self.assertEqual(fingerprint(bmg, keys), fingerprint(other, keys))
+        self.assertEqual(
+            fingerprint(bmg, keys), ((("_dynamic", "hc"), ("en", "Handicap")),)
+        )
+        self.assertNotEqual(
+            fingerprint(bmg, keys), fingerprint(dict(description=[["en", "HC"]]), keys)
+        )
+
+    def test_lookup_fingerprint(self):
+        self.lookup.propose_new()
+        op = Lookup.proposal_buffer.list_operations()[0].json()
+        self.assertEqual(
+            self.lookup.fingerprint(), fingerprint(op[1], self.lookup.fingerprint_keys)
+        )
+
+    def test_buffered(self):
+        self.assertIsNone(self.lookup.has_buffered_new())
+        self.lookup.propose_new()
+        LookupSport("AmericanFootball").propose_new()
+        self.assertEqual(self.lookup.has_buffered_new(), ("0.0.0", "0.0.0"))
+        self.assertEqual(
+            LookupSport("AmericanFootball").has_buffered_new(), ("0.0.0", "0.0.1")
+        )
+
+        # Custom comparators scan all buffered operations
+        self.assertEqual(
+            self.lookup.has_buffered_new(test_operation_equal_search=[]),
+            ("0.0.0", "0.0.0"),
+        )
+
+        # A new buffer is indexed from scratch
+        self.lookup.clear_proposal_buffer()
+        self.assertIsNone(self.lookup.has_buffered_new())
+
+    def test_buffer_truncated(self):
+        index = BufferIndex()
+        self.lookup.propose_new()
+        buffer = Lookup.proposal_buffer
+        fp = self.lookup.fingerprint()
+        self.assertEqual(len(index.get(buffer, "sport_create", ("name",), fp)), 1)
+        del buffer.ops[0:]
+        LookupSport("AmericanFootball").propose_new()
+        self.assertEqual(index.get(buffer, "sport_create", ("name",), fp), [])
+
+    def test_pending_index(self):
+        lookup = LookupSport("AmericanFootball")
+        pending = lookup.get_pending_operations(require_witness=False)
+        self.assertEqual(len(pending.operations("sport_update")), 2)
+        candidates = pending.fingerprinted(
+            "sport_update", lookup.fingerprint_keys, lookup.fingerprint()
+        )
+        self.assertEqual([x[1] for x in candidates], ["1.10.1"])
+        self.assertEqual(
+            [x["pid"] for x in lookup.has_pending_update(require_witness=False)],
+            ["1.10.1"],
+        )
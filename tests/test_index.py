@@ -0,0 +1,88 @@
+import unittest
+from bookied_sync.index import LookupIndex
+
+sports = {
+    "Basketball": {
+        "identifier": "Basketball",
+        "name": {"en": "Basketball", "sv": "Bsktbll"},
+        "aliases": ["askba"],
+        "eventgroups": {
+            "NBA#RegSeas": {
+                "identifier": "NBA Regular Season",
+                "name": {"en": "NBA Regular Season", "sen": "NBA"},
+                "aliases": ["National Basketball Association"],
+            },
+            "NBA#Old": {"identifier": "NBA Old", "name": {"en": "NBA Old"}},
+        },
+        "participants": {
+            "NBA_Teams_2017-18": {
+                "participants": [
+                    {
+                        "identifier": "Atlanta Hawks",
+                        "name": {"en": "Atlanta Hawks", "sen": "Hawks"},
+                        "aliases": ["Atlanta"],
+                    },
+                    {"identifier": "Boston Celtics", "name": {"en": "Boston Celtics"}},
+                ]
+            }
+        },
+    },
+    "AmericanFootball": {
+        "identifier": "AmericanFootball",
+        "name": {"en": "American Football"},
+        "eventgroups": {},
+    },
+}
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.index = LookupIndex(sports)
+
+    def test_find_sport(self):
+        self.assertEqual(self.index.find_sport("Basketball"), "Basketball")
+        self.assertEqual(self.index.find_sport("BASKETBALL"), "Basketball")
+        self.assertEqual(self.index.find_sport("bsktbll"), "Basketball")
+        self.assertEqual(self.index.find_sport("askba"), "Basketball")
+        self.assertEqual(
+            self.index.find_sport("american football"), "AmericanFootball"
+        )
+        self.assertIsNone(self.index.find_sport("NONEXISTING"))
+
+    def test_find_eventgroup(self):
+        self.assertEqual(
+            self.index.find_eventgroup("Basketball", "NBA#RegSeas"), "NBA#RegSeas"
+        )
+        self.assertEqual(self.index.find_eventgroup("Basketball", "nba"), "NBA#RegSeas")
+        self.assertEqual(
+            self.index.find_eventgroup("Basketball", "nba regular season"),
+            "NBA#RegSeas",
+        )
+        self.assertEqual(
+            self.index.find_eventgroup(
+                "Basketball", "NATIONAL BASKETBALL ASSOCIATION"
+            ),
+            "NBA#RegSeas",
+        )
+        self.assertEqual(self.index.find_eventgroup("Basketball", "NBA Old"), "NBA#Old")
+        self.assertIsNone(self.index.find_eventgroup("Basketball", "NFL"))
+        self.assertIsNone(self.index.find_eventgroup("AmericanFootball", "NBA"))
+        self.assertIsNone(self.index.find_eventgroup(None, "NBA"))
+
+    def test_participants(self):
+        names = self.index.participant_names("Basketball", "NBA_Teams_2017-18")
+        self.assertIsInstance(names, frozenset)
+        self.assertIn("hawks", names)
+        self.assertIn("atlanta", names)
+        self.assertIn("boston celtics", names)
+        self.assertNotIn("atlanta hawks ", names)
+        self.assertIs(
+            names, self.index.participant_names("Basketball", "NBA_Teams_2017-18")
+        )
+
+        team = self.index.find_participant("Basketball", "NBA_Teams_2017-18", "ATLANTA")
+        self.assertEqual(team["identifier"], "Atlanta Hawks")
+        self.assertIsNone(
+            self.index.find_participant("Basketball", "NBA_Teams_2017-18", "foobar")
+        )
+        self.assertFalse(self.index.participant_names("Basketball", "unknown"))
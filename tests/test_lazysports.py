@@ -0,0 +1,43 @@
+import os
+import unittest
+from bookiesports import BookieSports
+from bookied_sync.index import LookupIndex
+from bookied_sync.lazysports import LazyBookieSports
+
+sports_folder = os.path.join(os.path.dirname(os.path.realpath(__file__)), "bookiesports")
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.sports = LazyBookieSports(network="unittests", sports_folder=sports_folder)
+
+    def test_lazy_loading(self):
+        self.assertEqual(sorted(self.sports), ["AmericanFootball", "Basketball"])
+        self.assertIn("Basketball", self.sports)
+        self.assertEqual(self.sports.chain_id, "*")
+        self.assertFalse(self.sports.is_loaded("Basketball"))
+        self.assertFalse(self.sports.is_loaded("AmericanFootball"))
+
+        basketball = self.sports["Basketball"]
+        self.assertTrue(self.sports.is_loaded("Basketball"))
+        self.assertFalse(self.sports.is_loaded("AmericanFootball"))
+        self.assertIn("NBA#RegSeas", basketball["eventgroups"])
+        self.assertIn("R_NBA_ML_1", basketball["rules"])
+        self.assertIn("NBA_Teams_2017-18", basketball["participants"])
+        self.assertIs(self.sports.get("Basketball"), basketball)
+        self.assertIsNone(self.sports.get("Curling"))
+
+    def test_equal_to_bookiesports(self):
+        sports = BookieSports(
+            network="unittests", sports_folder=sports_folder, override_cache=True
+        )
+        self.assertEqual(dict(self.sports.items()), dict(sports))
+
+    def test_index(self):
+        index = LookupIndex(self.sports)
+        self.assertEqual(index.find_sport("askba"), "Basketball")
+        self.assertFalse(self.sports.is_loaded("Basketball"))
+
+        self.assertEqual(index.find_eventgroup("Basketball", "nba"), "NBA#RegSeas")
+        self.assertTrue(self.sports.is_loaded("Basketball"))
+        self.assertFalse(self.sports.is_loaded("AmericanFootball"))
@@ -29,3 +29,10 @@ class Testcases(unittest.TestCase):
         self.assertTrue(self.lookup.is_participant("BuFFBiLL"))
         self.assertTrue(self.lookup.is_participant("Buffalo Bills"))
         self.assertTrue(self.lookup.is_participant("BuffaLO Bills"))
+
+    def test_get_participant(self):
+        self.assertIsNone(self.lookup.get_participant("foobarfoo"))
+        self.assertEqual(
+            self.lookup.get_participant("BuFFBiLL"),
+            self.lookup.get_participant("Buffalo Bills"),
+        )
@@ -0,0 +1,145 @@
+import mock
+import unittest
+from bookied_sync import lookup, pending
+from bookied_sync.lookup import Lookup
+from bookied_sync.sport import LookupSport
+from bookied_sync.pending import PendingOperationsCache, WitnessCache
+
+from .fixtures import fixture_data
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+        self.cache = PendingOperationsCache()
+        Lookup.pending_cache = self.cache
+        self.lookup = LookupSport("AmericanFootball")
+
+    def tearDown(self):
+        Lookup.pending_cache = None
+        Lookup.witness_cache = None
+
+    def pending(self):
+        return self.lookup.get_pending_operations(require_witness=False)
+
+    def test_cached_per_block(self):
+        with mock.patch.object(
+            lookup, "Proposals", wraps=lookup.Proposals
+        ) as proposals:
+            props = self.pending()
+            self.assertIs(self.pending(), props)
+            self.assertEqual(proposals.call_count, 1)
+            self.assertEqual(self.cache.stats(), dict(hits=1, misses=1))
+
+            # Different filters are cached separately
+            self.lookup.get_pending_operations(
+                require_witness=False, require_active_witness=False
+            )
+            self.assertEqual(proposals.call_count, 2)
+
+            # A new head block invalidates the cache
+            with mock.patch.object(
+                self.cache, "head_block_number", return_value=1001
+            ):
+                self.assertIsNot(self.pending(), props)
+                self.assertEqual(proposals.call_count, 3)
+                self.pending()
+                self.assertEqual(proposals.call_count, 3)
+
+            self.cache.refresh()
+            self.pending()
+            self.assertEqual(proposals.call_count, 4)
+            self.assertEqual(self.cache.stats(), dict(hits=2, misses=4))
+
+    def test_same_as_uncached(self):
+        cached = self.pending()
+        Lookup.pending_cache = None
+        uncached = self.pending()
+        self.assertEqual(
+            [x["data"] for x in cached], [x["data"] for x in uncached]
+        )
+        self.assertTrue(cached)
+
+    def test_approval_map(self):
+        props = self.pending()
+        pid = props[0]["proposal"]["id"]
+        self.assertIn(pid, Lookup.approval_map)
+
+        # The approval map is restored even if the pending operations
+        # come from the cache
+        self.lookup.clear_approval_map()
+        self.pending()
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(
+            Lookup.approval_map[pid], {oid: False for _, _, oid in props[0]["data"]}
+        )
+
+    def test_without_head_block(self):
+        self.cache.check_head_block = False
+        with mock.patch.object(self.cache, "head_block_number") as head:
+            self.pending()
+            self.pending()
+            head.assert_not_called()
+        self.assertEqual(self.cache.stats(), dict(hits=1, misses=1))
+        self.cache.reset_stats()
+        self.assertEqual(self.cache.stats(), dict(hits=0, misses=0))
+
+    def test_operation_index(self):
+        props = self.pending()
+        updates = props.operations(self.lookup.operation_update)
+        self.assertEqual(
+            [(x[1], x[2]) for x in updates], [("1.10.1", 0), ("1.10.2413", 0)]
+        )
+        self.assertEqual(updates[0][0][1]["sport_id"], "1.20.0")
+        self.assertIsNotNone(updates[0][0][1].canonical_forms)
+        self.assertIs(updates[0][3], props[0]["proposal"])
+        self.assertEqual(props.operations(self.lookup.operation_create), [])
+
+        # The index is built only once per refresh
+        with mock.patch("bookied_sync.pending.getOperationNameForId") as name:
+            self.assertIs(self.pending().operations("sport_update"), updates)
+            name.assert_not_called()
+
+    def test_witness_cache(self):
+        Lookup.pending_cache = None
+        Lookup.witness_cache = WitnessCache(ttl=60)
+        with mock.patch.object(
+            pending, "Witnesses", wraps=pending.Witnesses
+        ) as witnesses, mock.patch.object(lookup, "Account") as account:
+            props = self.lookup.get_pending_operations(require_active_witness=False)
+            self.assertEqual(len(props), 2)
+            self.lookup.get_pending_operations(require_active_witness=False)
+            self.assertEqual(witnesses.call_count, 1)
+            self.assertEqual(Lookup.witness_cache.stats(), dict(hits=1, misses=1))
+            account.assert_not_called()
+
+            # Proposals by non-witnesses are skipped without fetching
+            # the account of the proposer
+            Lookup.witness_cache.refresh()
+            with mock.patch.object(
+                WitnessCache, "witness_ids", return_value=frozenset(["1.2.8"])
+            ):
+                self.assertEqual(
+                    self.lookup.get_pending_operations(require_active_witness=False),
+                    [],
+                )
+            account.assert_not_called()
+            self.assertEqual(witnesses.call_count, 2)
+
+    def test_witness_cache_expiration(self):
+        blockchain = mock.MagicMock()
+        blockchain.rpc.get_dynamic_global_properties.return_value = {
+            "time": "2018-05-29T10:00:00",
+            "next_maintenance_time": "2018-05-29T11:00:00",
+        }
+        cache = WitnessCache(blockchain_instance=blockchain)
+        with mock.patch.object(pending, "Witnesses", return_value=[]):
+            with mock.patch("time.monotonic", return_value=100.0):
+                self.assertEqual(cache.get(), frozenset())
+            # The next maintenance is due in one hour
+            with mock.patch("time.monotonic", return_value=100.0 + 3599):
+                cache.get()
+            self.assertEqual(cache.stats(), dict(hits=1, misses=1))
+            with mock.patch("time.monotonic", return_value=100.0 + 3601):
+                cache.get()
+            self.assertEqual(cache.stats(), dict(hits=1, misses=2))
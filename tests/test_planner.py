@@ -0,0 +1,96 @@
+import mock
+import unittest
+from bookied_sync.lookup import Lookup
+from bookied_sync.chainstate import ChainState
+from bookied_sync.planner import Planner
+from bookied_sync.sport import LookupSport
+
+from .fixtures import fixture_data, lookup_test_event, lookup_new_event
+
+event_id = "1.22.2242"
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+        self.planner = Planner(ChainState())
+
+    def find(self, plan, identifier):
+        return [x for x in plan if x["identifier"] == identifier][0]
+
+    def test_plan(self):
+        approval_map = dict(Lookup.approval_map)
+        new_event = lookup_new_event()
+        plan = self.planner.plan(
+            LookupSport("Basketball"),
+            events=[lookup_test_event(event_id), new_event],
+            require_witness=False,
+        )
+        self.assertEqual(plan[0]["id"], "1.20.1")
+        self.assertEqual(plan[0]["action"], "none")
+
+        event = self.find(plan, "NBA Regular Season/Atlanta Hawks/Boston Celtics")
+        self.assertEqual(event["id"], event_id)
+        self.assertEqual(event["action"], "none")
+        self.assertEqual(plan[event["parent"]]["id"], "1.21.12")
+
+        # The new event and all of its children are to be created
+        index = [x["lookup"] for x in plan].index(new_event)
+        children = [x for x in plan if x["parent"] == index]
+        self.assertEqual(plan[index]["action"], "create")
+        self.assertEqual(len(children), 3)
+        self.assertTrue(all(x["action"] == "create" for x in children))
+
+        rule = self.find(plan, "Basketball/R_NBA_ML_1")
+        self.assertEqual(rule["action"], "update")
+        self.assertIn("description", rule["changes"])
+        self.assertNotIn("name", rule["changes"])
+
+        self.assertEqual(sum(plan.summary().values()), len(plan))
+        self.assertEqual(len(plan.diff()), len(plan) - plan.summary()["none"])
+        self.assertNotIn("lookup", plan.diff()[0])
+
+        # Dry-run
+        self.assertTrue(Lookup.proposal_buffer.is_empty())
+        self.assertTrue(Lookup.direct_buffer.is_empty())
+        self.assertEqual(Lookup.approval_map, approval_map)
+        self.assertIsNone(Lookup.chain_state)
+        self.assertFalse(new_event.get("id"))
+
+    def test_plan_approve(self):
+        plan = self.planner.plan(LookupSport("AmericanFootball"), require_witness=False)
+        self.assertEqual(plan[0]["action"], "approve")
+        self.assertEqual(plan[0]["approvals"], [dict(pid="1.10.1", oid=0)])
+        self.assertEqual(
+            plan[0]["changes"]["name"]["chain"]["de"], "Amerikanisches Football - Error"
+        )
+        self.assertEqual(
+            plan[0]["changes"]["name"]["lookup"]["de"], "Amerikanisches Football"
+        )
+
+    def test_plan_loads_once(self):
+        events = [lookup_test_event(event_id), lookup_new_event()]
+        with mock.patch.object(
+            ChainState, "_list", autospec=True, side_effect=ChainState._list
+        ) as _list:
+            self.planner.plan(
+                LookupSport("Basketball"), events=events, require_witness=False
+            )
+            calls = _list.call_count
+            self.planner.plan(
+                LookupSport("Basketball"), events=events, require_witness=False
+            )
+            self.assertEqual(_list.call_count, calls)
+
+    def test_apply(self):
+        plan = self.planner.plan(
+            *LookupSport("Basketball").rules, require_witness=False
+        )
+        self.assertEqual(plan.summary()["update"], 2)
+        self.planner.apply(plan, require_witness=False)
+        ops = Lookup.proposal_buffer.json()[1]["proposed_ops"]
+        self.assertEqual(len(ops), 2)
+        self.assertEqual(
+            [x["op"][1]["betting_market_rules_id"] for x in ops],
+            [x["id"] for x in plan.by_action("update")],
+        )
@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import unittest
+from bookiesports import BookieSports
+from bookied_sync import snapshot
+
+sports_folder = os.path.join(os.path.dirname(os.path.realpath(__file__)), "bookiesports")
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.sports_folder = os.path.join(self.tmp, "sports")
+        self.snapshot_folder = os.path.join(self.tmp, "snapshots")
+        shutil.copytree(sports_folder, self.sports_folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def load(self):
+        return snapshot.load_bookiesports(
+            network="unittests",
+            sports_folder=self.sports_folder,
+            snapshot_folder=self.snapshot_folder,
+        )
+
+    def snapshots(self):
+        return sorted(os.listdir(self.snapshot_folder))
+
+    def test_folder_hash(self):
+        folder = snapshot.sports_folder_path("unittests", self.sports_folder)
+        digest = snapshot.folder_hash(folder)
+        self.assertEqual(digest, snapshot.folder_hash(folder))
+
+        with open(os.path.join(folder, "Basketball", "index.yaml"), "a") as fid:
+            fid.write("\n# changed\n")
+        self.assertNotEqual(digest, snapshot.folder_hash(folder))
+
+    def test_snapshot_reuse_and_rebuild(self):
+        sports = self.load()
+        self.assertIsInstance(sports, BookieSports)
+        self.assertIn("Basketball", sports)
+        self.assertEqual(len(self.snapshots()), 1)
+        first = self.snapshots()
+
+        # Reused as long as nothing changes
+        cached = self.load()
+        self.assertEqual(dict(cached), dict(sports))
+        self.assertEqual(cached.chain_id, sports.chain_id)
+        self.assertEqual(self.snapshots(), first)
+
+        # Rebuilt (and old snapshot removed) if a file changes
+        folder = snapshot.sports_folder_path("unittests", self.sports_folder)
+        with open(os.path.join(folder, "Basketball", "index.yaml"), "a") as fid:
+            fid.write("\n# changed\n")
+        self.load()
+        self.assertEqual(len(self.snapshots()), 1)
+        self.assertNotEqual(self.snapshots(), first)
+
+    def test_shared_snapshot_folder(self):
+        other_folder = os.path.join(self.tmp, "other")
+        shutil.copytree(sports_folder, other_folder)
+        self.load()
+        snapshot.load_bookiesports(
+            network="unittests",
+            sports_folder=other_folder,
+            snapshot_folder=self.snapshot_folder,
+        )
+        self.assertEqual(len(self.snapshots()), 2)
+
+        # Rebuilding the snapshot of one folder keeps the other one
+        folder = snapshot.sports_folder_path("unittests", self.sports_folder)
+        with open(os.path.join(folder, "Basketball", "index.yaml"), "a") as fid:
+            fid.write("\n# changed\n")
+        self.load()
+        self.assertEqual(len(self.snapshots()), 2)
+        other = snapshot.sports_folder_path("unittests", other_folder)
+        key = snapshot.folder_key(other)
+        self.assertEqual(len([x for x in self.snapshots() if key in x]), 1)
+
+    def test_broken_snapshot(self):
+        self.load()
+        path = os.path.join(self.snapshot_folder, self.snapshots()[0])
+        with open(path, "wb") as fid:
+            fid.write(b"garbage")
+        self.assertIn("Basketball", self.load())
+        self.assertIn("Basketball", snapshot.load_snapshot(path))
@@ -0,0 +1,286 @@
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+from peerplaysbase.operationids import operations
+from bookied_sync.lookup import Lookup
+from bookied_sync.chainstate import ChainState
+from bookied_sync.stream import OperationStream, read_blocks, record_blocks
+from bookied_sync.sport import LookupSport
+
+from .fixtures import fixture_data, lookup_new_event
+
+fee = {"amount": 0, "asset_id": "1.3.0"}
+
+
+def block(*ops, **kwargs):
+    """ Block with one transaction that carries ``ops`` as
+        ``(name, data, created_id)`` tuples
+    """
+    return {
+        "block_num": kwargs.get("block_num", 1001),
+        "timestamp": kwargs.get("timestamp", "2018-05-29T10:00:03"),
+        "transactions": [
+            {
+                "operations": [[operations[name], data] for name, data, _ in ops],
+                "operation_results": [
+                    [1, created] if created else [0, {}] for _, _, created in ops
+                ],
+            }
+        ],
+    }
+
+
+def chain_proposal(pid, op, required=("1.2.1",)):
+    """ Proposal object as returned by the node
+    """
+    return {
+        "id": pid,
+        "proposer": "1.2.7",
+        "expiration_time": "2018-05-29T11:00:00",
+        "proposed_transaction": {
+            "expiration": "2018-05-29T11:00:00",
+            "extensions": [],
+            "operations": [op],
+            "ref_block_num": 0,
+            "ref_block_prefix": 0,
+        },
+        "available_active_approvals": [],
+        "available_key_approvals": [],
+        "available_owner_approvals": [],
+        "required_active_approvals": list(required),
+        "required_owner_approvals": [],
+    }
+
+
+def proposal_update(pid, account):
+    return (
+        "proposal_update",
+        {
+            "fee": fee,
+            "proposal": pid,
+            "fee_paying_account": account,
+            "active_approvals_to_add": [account],
+            "extensions": [],
+        },
+        None,
+    )
+
+
+def event_create():
+    return (
+        "event_create",
+        {
+            "fee": fee,
+            "name": [["en", "New Orleans Pelicans @ Miami Heat"]],
+            "season": [["en", "2017-00-00"]],
+            "start_time": "2022-10-16T00:00:00",
+            "event_group_id": "1.21.12",
+            "extensions": [],
+        },
+        "1.22.2243",
+    )
+
+
+def sport_update(sport_id, names):
+    return (
+        "sport_update",
+        {"fee": fee, "sport_id": sport_id, "new_name": names, "extensions": []},
+        None,
+    )
+
+
+american_football = [
+    ["de", "Amerikanisches Football"],
+    ["en", "American Football"],
+    ["identifier", "AmericanFootball"],
+]
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+        self.chain_state = ChainState()
+        Lookup.chain_state = self.chain_state
+        self.stream = OperationStream(self.chain_state)
+        self.stream.track_proposals()
+
+    def tearDown(self):
+        Lookup.chain_state = None
+
+    def test_create(self):
+        event = lookup_new_event()
+        self.assertFalse(event.find_id())
+
+        bmg = {
+            "fee": fee,
+            "description": [["en", "Moneyline"]],
+            "event_id": "0.0.0",
+            "rules_id": "1.23.11",
+            "asset_id": "1.3.0",
+            "never_in_play": False,
+            "delay_before_settling": 0,
+            "extensions": [],
+        }
+        self.stream.apply_block(
+            block(event_create(), ("betting_market_group_create", bmg, "1.24.300"))
+        )
+        self.assertEqual(self.stream.block_num, 1001)
+        self.assertEqual(self.stream.applied, 2)
+        self.assertEqual(event.find_id(), "1.22.2243")
+        self.assertEqual(self.chain_state.get("1.22.2243")["status"], "upcoming")
+
+        # Relative id resolved, children of the new event do not need a
+        # request
+        self.assertEqual(
+            self.chain_state.objects("bettingmarketgroup", "1.22.2243"),
+            [self.chain_state.get("1.24.300")],
+        )
+        self.assertEqual(self.chain_state.get("1.24.300")["event_id"], "1.22.2243")
+
+    def test_update(self):
+        sport = LookupSport("AmericanFootball")
+        self.assertEqual(sport.find_id(), "1.20.0")
+        self.assertFalse(sport.is_synced())
+
+        self.stream.apply_block(block(sport_update("1.20.0", american_football)))
+        self.assertTrue(sport.is_synced())
+        self.assertEqual(
+            self.chain_state.find("sport", "AmericanFootball")[0]["id"], "1.20.0"
+        )
+
+        # Resolves
+        self.chain_state.objects("bettingmarketgroup", "1.22.2242")
+        self.stream.apply_block(
+            block(
+                (
+                    "betting_market_group_resolve",
+                    {
+                        "fee": fee,
+                        "betting_market_group_id": "1.24.212",
+                        "resolutions": [["1.25.2950", "win"]],
+                        "extensions": [],
+                    },
+                    None,
+                )
+            )
+        )
+        self.assertEqual(self.chain_state.get("1.24.212")["status"], "graded")
+
+        # Empty values are applied as well
+        self.chain_state.objects("event", "1.21.12")
+
+        def event_update_status(status, scores):
+            data = dict(fee=fee, event_id="1.22.2242", status=status, scores=scores)
+            return "event_update_status", dict(data, extensions=[]), None
+
+        self.stream.apply_block(block(event_update_status("in_progress", ["1", "0"])))
+        self.stream.apply_block(block(event_update_status("frozen", [])))
+        event = self.chain_state.get("1.22.2242")
+        self.assertEqual((event["status"], event["scores"]), ("frozen", []))
+
+    def test_proposals(self):
+        sport = LookupSport("AmericanFootball")
+        pending = list(sport.has_pending_update(require_witness=False))
+        self.assertEqual([x["pid"] for x in pending], ["1.10.1"])
+
+        self.stream.apply_block(
+            block(("proposal_delete", {"fee": fee, "proposal": "1.10.1"}, None))
+        )
+        self.assertEqual(list(sport.has_pending_update(require_witness=False)), [])
+
+        op = [operations["sport_update"], sport_update("1.20.0", american_football)[1]]
+        proposal = {
+            "fee": fee,
+            "fee_paying_account": "1.2.7",
+            "expiration_time": "2018-05-29T11:00:00",
+            "proposed_ops": [{"op": op}],
+            "extensions": [],
+        }
+        on_chain = {
+            "1.10.5": chain_proposal("1.10.5", op),
+            "1.10.6": chain_proposal("1.10.6", op, required=["1.2.9"]),
+        }
+        rpc = self.stream.peerplays.rpc
+        with mock.patch.object(
+            rpc,
+            "get_objects",
+            create=True,
+            side_effect=lambda ids: [on_chain.get(x) for x in ids],
+        ):
+            self.stream.apply_block(
+                block(
+                    ("proposal_create", proposal, "1.10.5"),
+                    ("proposal_create", proposal, "1.10.6"),
+                    # Executed (or removed) right away
+                    ("proposal_create", proposal, "1.10.7"),
+                )
+            )
+        # Only proposals that require the approval of the tracked account
+        pending = list(sport.has_pending_update(require_witness=False))
+        self.assertEqual([x["pid"] for x in pending], ["1.10.5"])
+
+        self.stream.apply_block(block(proposal_update("1.10.5", "1.2.7")))
+        self.assertEqual(
+            self.chain_state.proposals["1.2.1"]["1.10.5"]["available_active_approvals"],
+            ["1.2.7"],
+        )
+
+        # Expiration
+        self.stream.apply_block(block(timestamp="2018-05-29T11:00:00"))
+        self.assertEqual(self.chain_state.pending_proposals("witness-account"), [])
+
+        # Not maintained for other accounts
+        self.assertIsNone(self.chain_state.pending_proposals("init0"))
+
+    def test_approved_proposals(self):
+        self.assertIn("1.10.1", self.chain_state.proposals["1.2.1"])
+
+        # Approved by the witness account itself
+        self.stream.apply_block(block(proposal_update("1.10.1", "1.2.1")))
+        self.assertNotIn("1.10.1", self.chain_state.proposals["1.2.1"])
+
+        # Approved by the accounts of its authority
+        authority = dict(
+            weight_threshold=2,
+            account_auths=[["1.2.7", 1], ["1.2.8", 1]],
+            key_auths=[],
+        )
+        proposal = self.chain_state.proposals["1.2.1"]["1.10.2413"]
+        with mock.patch(
+            "bookied_sync.stream.Account", return_value=dict(active=authority)
+        ):
+            self.assertFalse(self.stream.approved(proposal))
+            self.stream.apply_block(block(proposal_update("1.10.2413", "1.2.7")))
+            self.assertIn("1.10.2413", self.chain_state.proposals["1.2.1"])
+            self.stream.apply_block(block(proposal_update("1.10.2413", "1.2.8")))
+            self.assertNotIn("1.10.2413", self.chain_state.proposals["1.2.1"])
+
+        # Execution reported by a stand-in
+        self.stream.track_proposals()
+        self.assertIn("1.10.1", self.chain_state.proposals["1.2.1"])
+        executed = block(sport_update("1.20.0", american_football))
+        executed["transactions"][0]["proposal"] = "1.10.1"
+        self.stream.apply_block(executed)
+        self.assertNotIn("1.10.1", self.chain_state.proposals["1.2.1"])
+
+    def test_recorded_blocks(self):
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, "blocks.json")
+            record_blocks(
+                [
+                    block(event_create(), block_num=1001),
+                    block(sport_update("1.20.0", american_football), block_num=1002),
+                ],
+                path,
+            )
+            self.chain_state.objects("sport")
+            self.chain_state.objects("event", "1.21.12")
+            self.stream.run(read_blocks(path))
+        finally:
+            shutil.rmtree(folder)
+        self.assertEqual(self.stream.block_num, 1002)
+        self.assertEqual(lookup_new_event().find_id(), "1.22.2243")
+        self.assertTrue(LookupSport("AmericanFootball").is_synced())
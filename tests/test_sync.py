@@ -0,0 +1,82 @@
+import time
+import mock
+import threading
+import unittest
+from bookied_sync.lookup import Lookup
+from bookied_sync.sport import LookupSport
+from bookied_sync.eventgroup import LookupEventGroup
+from bookied_sync.rule import LookupRule
+
+from .fixtures import fixture_data
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        fixture_data()
+        self.lookup = Lookup()
+        self.threads = set()
+        self.calls = list()
+
+    def is_synced(self, obj):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(0.01)
+        # Only the NBA event group and the first rule are in sync
+        return obj["identifier"] in ["NBA Regular Season", "R_NBA_ML_1"]
+
+    def update(self, obj, **kwargs):
+        self.calls.append(obj["identifier"])
+
+    def patched(self):
+        patches = list()
+        for cls in [LookupSport, LookupEventGroup, LookupRule]:
+            patches.append(
+                mock.patch.object(
+                    cls,
+                    "is_synced",
+                    autospec=True,
+                    side_effect=lambda obj: self.is_synced(obj),
+                )
+            )
+            patches.append(
+                mock.patch.object(
+                    cls,
+                    "update",
+                    autospec=True,
+                    side_effect=lambda obj, **kw: self.update(obj, **kw),
+                )
+            )
+        return patches
+
+    def sync(self, workers):
+        patches = self.patched()
+        for p in patches:
+            p.start()
+        try:
+            self.assertFalse(self.lookup.is_bookiesports_in_sync(workers=workers))
+            self.lookup.sync_bookiesports(workers=workers)
+        finally:
+            for p in patches:
+                p.stop()
+        return self.calls
+
+    def test_objects(self):
+        objects = [(k, x["identifier"]) for k, x in self.lookup.bookiesports_objects()]
+        self.assertEqual(objects[0][0], "sport")
+        self.assertIn(("eventgroup", "NBA Regular Season"), objects)
+        self.assertIn(("rule", "R_NBA_ML_1"), objects)
+
+    def test_concurrent_same_order(self):
+        sequential = list(self.sync(1))
+        self.assertEqual(len(self.threads), 1)
+        self.assertNotIn("NBA Regular Season", sequential)
+        self.assertNotIn("R_NBA_ML_1", sequential)
+
+        self.calls = list()
+        self.threads = set()
+        self.assertEqual(self.sync(4), sequential)
+        self.assertGreater(len(self.threads), 1)
+
+    def test_default_workers(self):
+        with mock.patch.object(Lookup, "sync_workers", 3):
+            self.sync(None)
+        self.assertGreater(len(self.threads), 1)
@@ -8,3 +8,32 @@ class Testcases(unittest.TestCase):
 
     def test_dict2dlist(self):
         self.assertEqual(utils.dict2dList(dict(a="b")), [["a", "b"]])
+
+    def test_canonical(self):
+        self.assertEqual(
+            utils.canonical([["en", "Basketball"], ["de", "Basketball"]]),
+            utils.canonical({"de": "Basketball", "en": "Basketball"}),
+        )
+        self.assertEqual(utils.canonical(None), ())
+        self.assertEqual(
+            {utils.canonical([["en", "A"], ["de", "B"]]): 1}[
+                (("de", "B"), ("en", "A"))
+            ],
+            1,
+        )
+
+        obj = dict(new_name=[["en", "Basketball"]])
+        form = utils.canonical_of(obj, "name")
+        self.assertEqual(form, ((("en", "Basketball"),), {"en": "Basketball"}))
+        self.assertEqual(utils.canonical_of(obj, "description"), ((), {}))
+
+    def test_canonicalize(self):
+        obj = utils.canonicalize(dict(new_name=[["en", "Basketball"]]))
+        self.assertIsInstance(obj, utils.CanonicalDict)
+        self.assertIs(utils.canonicalize(obj), obj)
+        form = utils.canonical_of(obj, "name")
+        self.assertEqual(form, ((("en", "Basketball"),), {"en": "Basketball"}))
+        self.assertIs(utils.canonical_of(obj, "name")[0], form[0])
+        # A new value is picked up
+        obj["new_name"] = [["en", "Soccer"]]
+        self.assertEqual(utils.canonical_of(obj, "name")[1], {"en": "Soccer"})